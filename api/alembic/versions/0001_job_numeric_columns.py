@@ -0,0 +1,71 @@
+"""Numeric shadow columns for job value, weight, distance and duration
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.jobs import NUMERIC_SHADOWS, parse_quantity
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "jobs" not in inspector.get_table_names():
+        # Fresh database: create_all builds the table with the new columns
+        return
+    existing = {column["name"] for column in inspector.get_columns("jobs")}
+    for shadow, _ in NUMERIC_SHADOWS.values():
+        if shadow not in existing:
+            op.add_column("jobs", sa.Column(shadow, sa.Float(), nullable=True))
+
+    # Backfill by parsing the string columns, one primary-key range at a time
+    columns = [name for source, (shadow, _) in NUMERIC_SHADOWS.items() for name in (source, shadow)]
+    jobs = sa.table("jobs", sa.column("id"), *(sa.column(name) for name in columns))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(jobs).where(jobs.c.id > last_id).order_by(jobs.c.id).limit(BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        updates = [
+            {"_id": row["id"], **{f"_{shadow}": parse_quantity(row[source], units) for source, (shadow, units) in NUMERIC_SHADOWS.items()}}
+            for row in rows
+        ]
+        bind.execute(
+            jobs.update().where(jobs.c.id == sa.bindparam("_id")).values(
+                {shadow: sa.bindparam(f"_{shadow}") for shadow, _ in NUMERIC_SHADOWS.values()}
+            ),
+            updates,
+        )
+        last_id = rows[-1]["id"]
+
+    existing_indexes = {index["name"] for index in inspector.get_indexes("jobs")}
+    for shadow, _ in NUMERIC_SHADOWS.values():
+        name = op.f(f"ix_jobs_{shadow}")
+        if name not in existing_indexes:
+            op.create_index(name, "jobs", [shadow], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("jobs") as batch_op:
+        for shadow, _ in NUMERIC_SHADOWS.values():
+            batch_op.drop_index(batch_op.f(f"ix_jobs_{shadow}"))
+            batch_op.drop_column(shadow)
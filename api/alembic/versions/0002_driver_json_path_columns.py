@@ -0,0 +1,50 @@
+"""Indexed generated columns for hot driver JSON paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# column name -> (type, JSON column, path)
+JSON_PATH_COLUMNS = {
+    "performance_safety_rating": (sa.Float(), "performance", "safety_rating"),
+    "employment_status": (sa.String(), "employment", "status"),
+    "current_assignment_status": (sa.String(), "current_assignment", "status"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "drivers" not in inspector.get_table_names():
+        return
+    existing = {column["name"] for column in inspector.get_columns("drivers")}
+    existing_indexes = {index["name"] for index in inspector.get_indexes("drivers")}
+    for name, (type_, source, path) in JSON_PATH_COLUMNS.items():
+        if name not in existing:
+            # SQLite can add VIRTUAL (not STORED) generated columns in place
+            op.add_column(
+                "drivers",
+                sa.Column(name, type_, sa.Computed(f"json_extract({source}, '$.{path}')", persisted=False)),
+            )
+        if op.f(f"ix_drivers_{name}") not in existing_indexes:
+            op.create_index(op.f(f"ix_drivers_{name}"), "drivers", [name], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in JSON_PATH_COLUMNS:
+        op.drop_index(op.f(f"ix_drivers_{name}"), table_name="drivers")
+        op.execute(f"ALTER TABLE drivers DROP COLUMN {name}")
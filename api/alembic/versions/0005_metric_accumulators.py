@@ -0,0 +1,40 @@
+"""Running parts of incrementally maintained metrics
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "metric_accumulators" in inspector.get_table_names():
+        return
+    op.create_table(
+        "metric_accumulators",
+        sa.Column("metric_id", sa.Integer(), sa.ForeignKey("metric.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("numerator", sa.Float(), nullable=False),
+        sa.Column("denominator", sa.Float(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The triggers feeding the accumulators are recreated by the app at startup
+    bind = op.get_bind()
+    for (name,) in bind.execute(sa.text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'metric\\_%' ESCAPE '\\'")):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table("metric_accumulators")
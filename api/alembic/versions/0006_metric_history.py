@@ -0,0 +1,53 @@
+"""Metric history points and their 1m/1h/1d rollups
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if "metric_history" not in tables:
+        op.create_table(
+            "metric_history",
+            sa.Column("metric_id", sa.Integer(), sa.ForeignKey("metric.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("ts", sa.Integer(), primary_key=True),
+            sa.Column("value", sa.Float(), nullable=False),
+            sqlite_with_rowid=False,
+        )
+        op.create_index("ix_metric_history_ts", "metric_history", ["ts"])
+    if "metric_rollups" not in tables:
+        op.create_table(
+            "metric_rollups",
+            sa.Column("metric_id", sa.Integer(), sa.ForeignKey("metric.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("step", sa.Integer(), primary_key=True),
+            sa.Column("bucket", sa.Integer(), primary_key=True),
+            sa.Column("samples", sa.Integer(), nullable=False),
+            sa.Column("total", sa.Float(), nullable=False),
+            sa.Column("minimum", sa.Float(), nullable=False),
+            sa.Column("maximum", sa.Float(), nullable=False),
+            sqlite_with_rowid=False,
+        )
+        op.create_index("ix_metric_rollups_step_bucket", "metric_rollups", ["step", "bucket"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_metric_rollups_step_bucket", table_name="metric_rollups")
+    op.drop_table("metric_rollups")
+    op.drop_index("ix_metric_history_ts", table_name="metric_history")
+    op.drop_table("metric_history")
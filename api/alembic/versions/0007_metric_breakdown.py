@@ -0,0 +1,35 @@
+"""Bucket -> value map of grouped metrics
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "metric" not in inspector.get_table_names():
+        # Fresh database: create_all builds the table with the new columns
+        return
+    columns = {column["name"] for column in inspector.get_columns("metric")}
+    if "breakdown" not in columns:
+        op.add_column("metric", sa.Column("breakdown", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("metric") as batch_op:
+        batch_op.drop_column("breakdown")
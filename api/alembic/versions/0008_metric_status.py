@@ -0,0 +1,44 @@
+"""Run status of custom SQL metrics
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUS_COLUMNS = (
+    sa.Column("status", sa.String(), nullable=True),
+    sa.Column("last_error", sa.Text(), nullable=True),
+    sa.Column("last_run_ms", sa.Float(), nullable=True),
+    sa.Column("failure_count", sa.Integer(), nullable=False, server_default="0"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "metric" not in inspector.get_table_names():
+        # Fresh database: create_all builds the table with the new columns
+        return
+    columns = {column["name"] for column in inspector.get_columns("metric")}
+    for column in STATUS_COLUMNS:
+        if column.name not in columns:
+            op.add_column("metric", column.copy())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("metric") as batch_op:
+        for column in reversed(STATUS_COLUMNS):
+            batch_op.drop_column(column.name)
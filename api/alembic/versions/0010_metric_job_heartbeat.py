@@ -0,0 +1,35 @@
+"""Heartbeat of queued and running metric jobs, to detect orphaned ones
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "metric_jobs" not in inspector.get_table_names():
+        # Fresh database: create_all builds the table with the new column
+        return
+    columns = {column["name"] for column in inspector.get_columns("metric_jobs")}
+    if "heartbeat_at" not in columns:
+        op.add_column("metric_jobs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("metric_jobs") as batch_op:
+        batch_op.drop_column("heartbeat_at")
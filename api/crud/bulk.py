@@ -0,0 +1,162 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from crud.writes import row_values
+from schemas.base import partial_model
+from schemas.bulk import BulkItemResult, BulkResult
+
+logger = logging.getLogger(__name__)
+
+
+def _result(results: List[BulkItemResult]) -> BulkResult:
+    succeeded = sum(item.status not in ("invalid", "not_found") for item in results)
+    return BulkResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+def missing_references(db: Session, entity_model, rows: Sequence[Dict[str, Any]]) -> Dict[str, set]:
+    """Foreign key values in `rows` with no parent row, one query per foreign key"""
+    missing = {}
+    for foreign_key in entity_model.__table__.foreign_keys:
+        name = foreign_key.parent.key
+        wanted = {row[name] for row in rows if row.get(name) is not None}
+        if not wanted:
+            continue
+        target = foreign_key.column
+        found = set(db.execute(select(target).where(target.in_(wanted))).scalars())
+        if wanted - found:
+            missing[name] = wanted - found
+    return missing
+
+
+def _check_references(db, entity_model, rows, indexes, results):
+    """Mark rows pointing at missing parents as invalid; returns the rows still to write"""
+    missing = missing_references(db, entity_model, rows)
+    if not missing:
+        return rows, indexes
+    kept_rows, kept_indexes = [], []
+    for row, index in zip(rows, indexes):
+        errors = [f"{name} {row[name]} does not exist" for name, values in missing.items() if row.get(name) in values]
+        if errors:
+            results[index] = BulkItemResult(index=index, id=row.get("id"), status="invalid", errors=errors)
+        else:
+            kept_rows.append(row)
+            kept_indexes.append(index)
+    return kept_rows, kept_indexes
+
+
+def _validate(schema: Type[BaseModel], item: Any, index: int):
+    """Validated payload, or the invalid item result"""
+    try:
+        return schema.model_validate(item), None
+    except ValidationError as e:
+        errors = e.errors(include_url=False, include_context=False)
+        return None, BulkItemResult(index=index, status="invalid", errors=errors)
+
+
+def _commit(db: Session):
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise ValueError(f"Bulk write rejected by the database: {e.orig}")
+
+
+def bulk_create(db: Session, entity_model, schema: Type[BaseModel], items: List[Any]) -> BulkResult:
+    """Validate each item with `schema` and insert the valid ones in one transaction.
+
+    Rows go out as a single executemany INSERT ... RETURNING id, so N items cost
+    one round trip per batch instead of add/commit/refresh per row.
+    """
+    results: List[Optional[BulkItemResult]] = [None] * len(items)
+    rows, indexes = [], []
+    for index, item in enumerate(items):
+        payload, error = _validate(schema, item, index)
+        if error:
+            results[index] = error
+            continue
+        rows.append(row_values(entity_model, payload.model_dump()))
+        indexes.append(index)
+
+    rows, indexes = _check_references(db, entity_model, rows, indexes, results)
+    if rows:
+        statement = insert(entity_model).returning(entity_model.id, sort_by_parameter_order=True)
+        ids = db.execute(statement, rows).scalars().all()
+        _commit(db)
+        for index, new_id in zip(indexes, ids):
+            results[index] = BulkItemResult(index=index, id=new_id, status="created")
+    logger.info(f"Bulk created {len(rows)} of {len(items)} {entity_model.__tablename__}")
+    return _result(results)
+
+
+def bulk_update(db: Session, entity_model, schema: Type[BaseModel], items: List[Any]) -> BulkResult:
+    """Apply partial updates, each item carrying its `id` plus the fields to change.
+
+    Fields are validated against `schema` but may be omitted. Rows are updated
+    by primary key with executemany UPDATE statements in one transaction.
+    """
+    patch_schema = partial_model(schema)
+    results: List[Optional[BulkItemResult]] = [None] * len(items)
+    rows, indexes = [], []
+    for index, item in enumerate(items):
+        item_id = item.get("id") if isinstance(item, dict) else None
+        if not isinstance(item_id, int) or isinstance(item_id, bool):
+            results[index] = BulkItemResult(index=index, status="invalid", errors=["id is required"])
+            continue
+        payload, error = _validate(patch_schema, {k: v for k, v in item.items() if k != "id"}, index)
+        if error:
+            error.id = item_id
+            results[index] = error
+            continue
+        rows.append({"id": item_id, **row_values(entity_model, payload.model_dump(exclude_unset=True))})
+        indexes.append(index)
+
+    existing = set()
+    if rows:
+        ids = {row["id"] for row in rows}
+        existing = set(db.execute(select(entity_model.id).where(entity_model.id.in_(ids))).scalars())
+    found_rows, found_indexes = [], []
+    for row, index in zip(rows, indexes):
+        if row["id"] in existing:
+            found_rows.append(row)
+            found_indexes.append(index)
+        else:
+            results[index] = BulkItemResult(index=index, id=row["id"], status="not_found")
+
+    found_rows, found_indexes = _check_references(db, entity_model, found_rows, found_indexes, results)
+    # Items that change nothing still count as updated but need no statement
+    changed = [row for row in found_rows if len(row) > 1]
+    if changed:
+        db.execute(update(entity_model), changed)
+        _commit(db)
+    for row, index in zip(found_rows, found_indexes):
+        results[index] = BulkItemResult(index=index, id=row["id"], status="updated")
+    logger.info(f"Bulk updated {len(found_rows)} of {len(items)} {entity_model.__tablename__}")
+    return _result(results)
+
+
+def bulk_delete(db: Session, entity_model, ids: List[int], children: Sequence = ()) -> BulkResult:
+    """Delete rows by id in one statement, reporting ids that did not exist.
+
+    `children` are foreign key columns of dependent rows to delete first,
+    e.g. Maintenance.truck_id for trucks. A repeated id is deleted once; its
+    later items report not_found, as if the items were applied in order.
+    """
+    wanted = set(ids)
+    for foreign_key in children:
+        db.execute(delete(foreign_key.class_).where(foreign_key.in_(wanted)))
+    statement = delete(entity_model).where(entity_model.id.in_(wanted)).returning(entity_model.id)
+    deleted = set(db.execute(statement).scalars()) if wanted else set()
+    _commit(db)
+    pending = set(deleted)
+    results = []
+    for index, item_id in enumerate(ids):
+        status = "deleted" if item_id in pending else "not_found"
+        pending.discard(item_id)
+        results.append(BulkItemResult(index=index, id=item_id, status=status))
+    logger.info(f"Bulk deleted {len(deleted)} of {len(ids)} {entity_model.__tablename__}")
+    return _result(results)
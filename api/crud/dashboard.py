@@ -0,0 +1,156 @@
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from crud.filters import field_expression
+from db.session import async_variant
+from models.drivers import Driver
+from models.jobs import Job
+from models.metric import Metric
+from models.trucks import Truck
+
+# Alert thresholds, matching what the dashboard used to compute client-side
+LICENSE_EXPIRY_DAYS = 30
+HIGH_MILEAGE = 200000
+HIGH_SAFETY_RATING = 4.5
+
+ACTIVE_DRIVERS_LIMIT = 6
+RECENT_LIMIT = 5
+
+# Dashboard value -> stored metric that already holds it
+CARD_METRICS = {
+    "total_drivers": "drivers_counter",
+    "active_drivers": "active_drivers",
+    "inactive_drivers": "inactive_drivers",
+    "high_safety_drivers": "drivers_safety_rating",
+    "total_jobs": "jobs_counter",
+    "in_progress_jobs": "in_progress_jobs",
+    "completed_jobs": "completed_jobs",
+    "pending_jobs": "pending_jobs",
+    "cancelled_jobs": "cancelled_jobs",
+    "fleet_size": "trucks_counter",
+}
+
+JOB_STATUSES = {
+    "completed": "completed_jobs",
+    "in-progress": "in_progress_jobs",
+    "pending": "pending_jobs",
+    "cancelled": "cancelled_jobs",
+}
+
+
+def _count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _driver_counts(db: Session) -> Dict[str, int]:
+    cutoff = (date.today() + timedelta(days=LICENSE_EXPIRY_DAYS)).isoformat()
+    license_valid = field_expression(Driver, "license.is_valid")  # JSON booleans extract as 1/0
+    license_expiration = field_expression(Driver, "license.license_expiration")
+    row = db.execute(
+        select(
+            func.count().label("total_drivers"),
+            _count_where(Driver.is_active).label("active_drivers"),
+            _count_where(~Driver.is_active).label("inactive_drivers"),
+            _count_where(Driver.performance_safety_rating >= HIGH_SAFETY_RATING).label("high_safety_drivers"),
+            _count_where((license_valid == 0) | (license_expiration < cutoff)).label("expiring_licenses"),
+        )
+    ).one()
+    return row._asdict()
+
+
+def _truck_counts(db: Session) -> Dict[str, int]:
+    row = db.execute(
+        select(
+            func.count().label("fleet_size"),
+            _count_where(Truck.mileage > HIGH_MILEAGE).label("high_mileage_trucks"),
+        )
+    ).one()
+    return row._asdict()
+
+
+def _job_counts(db: Session) -> Dict[str, int]:
+    by_status = dict(db.execute(select(Job.job_status, func.count()).group_by(Job.job_status)).all())
+    counts = {key: by_status.get(status, 0) for status, key in JOB_STATUSES.items()}
+    counts["total_jobs"] = sum(by_status.values())
+    return counts
+
+
+# Grouped aggregate per table, and the dashboard values it yields
+AGGREGATES: List[Tuple[Callable[[Session], Dict[str, int]], Set[str]]] = [
+    (_driver_counts, {"total_drivers", "active_drivers", "inactive_drivers", "high_safety_drivers", "expiring_licenses"}),
+    (_truck_counts, {"fleet_size", "high_mileage_trucks"}),
+    (_job_counts, {"total_jobs", *JOB_STATUSES.values()}),
+]
+
+
+def dashboard_values(db: Session) -> Dict[str, int]:
+    """Every dashboard number, from stored metrics where they exist.
+
+    A table is only aggregated when one of its values has no stored metric
+    (the alert counts never do), and then in a single grouped query.
+    """
+    stored = dict(db.execute(select(Metric.name, Metric.value).where(Metric.name.in_(CARD_METRICS.values()))).all())
+    values = {key: int(stored[name]) for key, name in CARD_METRICS.items() if stored.get(name) is not None}
+    for aggregate, keys in AGGREGATES:
+        if not keys <= values.keys():
+            values = {**aggregate(db), **values}
+    return values
+
+
+def _rows(db: Session, statement) -> List[Dict[str, Any]]:
+    return [row._asdict() for row in db.execute(statement)]
+
+
+def get_dashboard(db: Session) -> Dict[str, Any]:
+    """Card values, chart series, alerts and short lists for the dashboard.
+
+    Everything is aggregated or limited in SQL, so the payload has the same
+    size whatever the size of the fleet.
+    """
+    values = dashboard_values(db)
+    alerts = []
+    if values["expiring_licenses"]:
+        alerts.append({
+            "type": "license", "entity": "drivers", "count": values["expiring_licenses"],
+            "message": f"{values['expiring_licenses']} driver license(s) expiring soon",
+        })
+    if values["high_mileage_trucks"]:
+        alerts.append({
+            "type": "mileage", "entity": "trucks", "count": values["high_mileage_trucks"],
+            "message": f"{values['high_mileage_trucks']} truck(s) with high mileage",
+        })
+    if values["cancelled_jobs"]:
+        alerts.append({
+            "type": "cancelled", "entity": "jobs", "count": values["cancelled_jobs"],
+            "message": f"{values['cancelled_jobs']} cancelled job(s) need attention",
+        })
+
+    drivers = select(
+        Driver.id, Driver.first_name, Driver.last_name, Driver.employment_status,
+        Driver.current_assignment, Driver.performance,
+    )
+    jobs = select(Job.id, Job.job_number, Job.job_status)
+    return {
+        "cards": values,
+        "job_status": [{"name": status, "value": values[key]} for status, key in JOB_STATUSES.items()],
+        "driver_status": [
+            {"name": "active", "value": values["active_drivers"]},
+            {"name": "inactive", "value": values["inactive_drivers"]},
+        ],
+        "alerts": alerts,
+        "active_drivers": _rows(
+            db,
+            drivers.where(Driver.is_active, Driver.employment_status == "active")
+            .order_by(Driver.id)
+            .limit(ACTIVE_DRIVERS_LIMIT),
+        ),
+        "recent_jobs": _rows(db, jobs.order_by(Job.id.desc()).limit(RECENT_LIMIT)),
+        "recent_drivers": _rows(db, drivers.order_by(Driver.id.desc()).limit(RECENT_LIMIT)),
+    }
+
+
+# Async variants for `async def` endpoints
+get_dashboard_async = async_variant(get_dashboard)
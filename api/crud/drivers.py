@@ -1,38 +1,41 @@
+from typing import Dict, List, Optional, Sequence, Union
 from sqlalchemy.orm import Session
+from crud.bulk import bulk_create, bulk_delete, bulk_update
+from crud.fieldsets import query_fields
+from crud.listing import list_entities
+from crud.pagination import Page
+from crud.writes import insert_row, update_row
+from db.session import async_variant
 from models.drivers import Driver
-from schemas.drivers import DriverCreate, DriverUpdate
+from schemas.bulk import BulkResult
+from schemas.drivers import DriverCreate, DriverPatch, DriverUpdate
 
-# GET all trucks
-def get_drivers(db: Session):
-    return db.query(Driver).all()
+# GET all drivers, one keyset page at a time
+def get_drivers(
+    db: Session,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    filters: Optional[List[Dict]] = None,
+    sort: Optional[str] = None,
+) -> Page:
+    return list_entities(db, Driver, limit=limit, after=after, fields=fields, filters=filters, sort=sort)
 
 # GET one truck by ID
-def get_driver(db: Session, driver_id: int):
-    driver = db.query(Driver).filter(Driver.id == driver_id).first()
+def get_driver(db: Session, driver_id: int, fields: Optional[Sequence[str]] = None):
+    driver = query_fields(db, Driver, fields).filter(Driver.id == driver_id).first()
     if not driver:
         raise ValueError("Driver not found")
     return driver
 
-# POST: Create new truck
+# POST: Create new driver
 def create_driver(db: Session, driver: DriverCreate):
-    print('testsssssssssssssssssssssssssssssssssssssssssssssssssssss')
-    db_driver = Driver(**driver.model_dump())
-    print('test')
-    db.add(db_driver)
-    db.commit()
-    db.refresh(db_driver)
-    return db_driver
+    return insert_row(db, Driver, driver.model_dump())
 
 
-# PUT: Update truck by ID
-def update_driver(db: Session, driver_id: int, updated: DriverUpdate):
-    db_driver = db.query(Driver).filter(Driver.id == driver_id).first()
-    if db_driver:
-        for key, value in updated.model_dump().items():
-            setattr(db_driver, key, value)
-        db.commit()
-        db.refresh(db_driver)
-    return db_driver
+# PUT/PATCH: Update driver by ID, writing only the fields sent
+def update_driver(db: Session, driver_id: int, updated: Union[DriverUpdate, DriverPatch]):
+    return update_row(db, Driver, driver_id, updated.model_dump(exclude_unset=True))
 
 # DELETE: Remove truck
 def delete_driver(db: Session, driver_id: int):
@@ -43,4 +46,26 @@ def delete_driver(db: Session, driver_id: int):
     if db_driver:
         db.delete(db_driver)
         db.commit()
-    return db_driver
\ No newline at end of file
+    return db_driver
+
+
+# Bulk writes: each list is validated per item and written in one transaction
+def bulk_create_drivers(db: Session, items: List[Dict]) -> BulkResult:
+    return bulk_create(db, Driver, DriverCreate, items)
+
+def bulk_update_drivers(db: Session, items: List[Dict]) -> BulkResult:
+    return bulk_update(db, Driver, DriverUpdate, items)
+
+def bulk_delete_drivers(db: Session, ids: List[int]) -> BulkResult:
+    return bulk_delete(db, Driver, ids)
+
+
+# Async variants for `async def` endpoints
+get_drivers_async = async_variant(get_drivers)
+get_driver_async = async_variant(get_driver)
+create_driver_async = async_variant(create_driver)
+update_driver_async = async_variant(update_driver)
+delete_driver_async = async_variant(delete_driver)
+bulk_create_drivers_async = async_variant(bulk_create_drivers)
+bulk_update_drivers_async = async_variant(bulk_update_drivers)
+bulk_delete_drivers_async = async_variant(bulk_delete_drivers)
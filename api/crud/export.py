@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+
+from crud.filters import apply_filters, numeric_shadows, sort_keys
+from crud.pagination import keyset_query
+from db.session import SessionLocal
+from models.drivers import Driver
+from models.jobs import Job
+from models.maintenance import Maintenance
+from models.trucks import Truck
+from schemas.drivers import DriverOut
+from schemas.jobs import JobOut
+from schemas.maintenance import MaintenanceOut
+from schemas.trucks import TruckOut
+
+logger = logging.getLogger(__name__)
+
+# Exportable entities: model and the Out schema whose fields are exported
+EXPORTS = {
+    "trucks": (Truck, TruckOut),
+    "drivers": (Driver, DriverOut),
+    "jobs": (Job, JobOut),
+    "maintenance": (Maintenance, MaintenanceOut),
+}
+
+# Rows fetched from the cursor, and encoded into one response chunk, at a time
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_statement(
+    entity_model,
+    schema: Type[BaseModel],
+    fields: Optional[Sequence[str]] = None,
+    filters: Optional[List[Dict]] = None,
+    sort: Optional[str] = None,
+) -> Select:
+    """Column SELECT for an export, with the list endpoints' filter and sort semantics.
+
+    Built before the response starts so bad filters fail with a 400, not a
+    truncated stream. Only the schema's columns are selected: no ORM objects,
+    and numeric shadows (e.g. Job.weightLbs) only when `fields` names them.
+    """
+    shadows = set(numeric_shadows(entity_model).values())
+    names = fields or [
+        name for name in schema.model_fields if name in entity_model.__table__.columns and name not in shadows
+    ]
+    statement = select(*(entity_model.__table__.columns[name] for name in names))
+    if filters:
+        statement = apply_filters(statement, entity_model, filters)
+    return keyset_query(statement, sort_keys(entity_model, sort))
+
+
+def stream_rows(statement: Select, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+    """Yield the statement's rows in batches from a server-side cursor.
+
+    The session lives inside the generator, so it stays open for the whole
+    response body rather than closing with the request's dependencies.
+    """
+    with SessionLocal() as db:
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+        count = 0
+        for batch in result.partitions():
+            count += len(batch)
+            yield batch
+    logger.info(f"Exported {count} rows")
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def ndjson_chunks(statement: Select, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """One JSON object per line"""
+    for batch in stream_rows(statement, batch_size):
+        yield "".join(
+            json.dumps(row._asdict(), default=_json_default, separators=(",", ":")) + "\n" for row in batch
+        )
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(statement: Select, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Header row, then the rows; JSON columns are written as JSON text"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column.key for column in statement.selected_columns)
+    # The header goes out before the query runs
+    yield _drain(buffer)
+    for batch in stream_rows(statement, batch_size):
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield _drain(buffer)
+
+
+def _drain(buffer: io.StringIO) -> str:
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
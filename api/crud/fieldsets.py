@@ -0,0 +1,20 @@
+from typing import Optional, Sequence
+from sqlalchemy.orm import Session, load_only
+
+
+def query_fields(db: Session, model, fields: Optional[Sequence[str]] = None, options: Sequence = ()):
+    """Query whole entities, or only the requested columns as plain rows.
+
+    Narrowing the column list keeps SQLite from reading, and SQLAlchemy from
+    decoding, JSON columns the client did not ask for. Loader `options` (e.g.
+    selectinload for ?include=) need entities, so with options the narrowing
+    is done with load_only instead.
+    """
+    if options:
+        query = db.query(model).options(*options)
+        if fields is not None:
+            query = query.options(load_only(*(getattr(model, name) for name in fields)))
+        return query
+    if fields is None:
+        return db.query(model)
+    return db.query(*(getattr(model, name) for name in fields))
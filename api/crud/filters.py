@@ -0,0 +1,239 @@
+import json
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import JSON, func
+
+from crud.pagination import SortKey, column_value
+
+logger = logging.getLogger(__name__)
+
+OPERATORS = {
+    "==": "eq", "eq": "eq",
+    "!=": "ne", "ne": "ne",
+    ">": "gt", "gt": "gt",
+    ">=": "gte", "gte": "gte",
+    "<": "lt", "lt": "lt",
+    "<=": "lte", "lte": "lte",
+    "in": "in",
+    "not_in": "not_in",
+    "like": "like",
+    "is_null": "is_null",
+    "is_not_null": "is_not_null",
+}
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def json_columns(entity_model) -> frozenset:
+    """Names of the JSON columns of a model"""
+    return frozenset(column.key for column in entity_model.__table__.columns if isinstance(column.type, JSON))
+
+
+@lru_cache(maxsize=None)
+def numeric_shadows(entity_model) -> Dict[str, str]:
+    """String column -> numeric column declared for it with info={"numeric_of": ...}"""
+    return {
+        column.info["numeric_of"]: column.key
+        for column in entity_model.__table__.columns
+        if "numeric_of" in column.info
+    }
+
+
+@lru_cache(maxsize=None)
+def json_path_columns(entity_model) -> Dict[str, str]:
+    """JSON path -> indexed generated column registered with models.base.json_path_column"""
+    return {
+        column.info["json_path"]: column.key
+        for column in entity_model.__table__.columns
+        if "json_path" in column.info
+    }
+
+
+def _is_number(value) -> bool:
+    if isinstance(value, list):
+        return bool(value) and all(_is_number(item) for item in value)
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _column(entity_model, name: str):
+    if name not in entity_model.__table__.columns:
+        raise InvalidFilter(f"Unknown field: {name}")
+    return getattr(entity_model, name)
+
+
+def field_expression(entity_model, field: str, numeric: bool = False):
+    """SQL expression for a field, extracting JSON paths like "performance.safety_rating".
+
+    With numeric=True, free-text quantity columns (e.g. Job.weight "500 lbs")
+    resolve to their parsed numeric column so they can be aggregated and compared.
+    """
+    if numeric and field in numeric_shadows(entity_model):
+        return getattr(entity_model, numeric_shadows(entity_model)[field])
+    indexed_path = json_path_columns(entity_model).get(field.replace('json:', '', 1))
+    if indexed_path:
+        return getattr(entity_model, indexed_path)
+    if field.startswith('json:'):
+        json_field, json_path = field.replace('json:', '').split('.', 1)
+        return func.json_extract(_column(entity_model, json_field), f'$.{json_path}')
+    if '.' in field:
+        root, json_path = field.split('.', 1)
+        if root in json_columns(entity_model):
+            return func.json_extract(getattr(entity_model, root), f'$.{json_path}')
+    return _column(entity_model, field)
+
+
+def _coerce(expression, value):
+    """Convert string values for date columns, which SQLite only binds as date objects"""
+    try:
+        return column_value(expression, value)
+    except ValueError:
+        raise InvalidFilter(f"Invalid date value: {value}")
+
+
+def filter_condition(entity_model, filter_config: Dict):
+    """Build the SQL condition for one filter, or None when it names no field"""
+    field = filter_config.get('field')
+    if not field:
+        return None
+    operator = OPERATORS.get(str(filter_config.get('operator', '==')).lower())
+    if not operator:
+        raise InvalidFilter(f"Unsupported operator: {filter_config.get('operator')}")
+    value = filter_config.get('value')
+    expression = field_expression(entity_model, field, numeric=_is_number(value))
+    if isinstance(value, list):
+        value = [_coerce(expression, item) for item in value]
+    else:
+        value = _coerce(expression, value)
+
+    match operator:
+        case 'eq':
+            return expression == value
+        case 'ne':
+            return expression != value
+        case 'gt':
+            return expression > value
+        case 'gte':
+            return expression >= value
+        case 'lt':
+            return expression < value
+        case 'lte':
+            return expression <= value
+        case 'in':
+            return expression.in_(value)
+        case 'not_in':
+            return ~expression.in_(value)
+        case 'like':
+            return expression.like(f'%{value}%')
+        case 'is_null':
+            return expression.is_(None)
+        case 'is_not_null':
+            return expression.isnot(None)
+
+
+def apply_filters(query, entity_model, filters: List[Dict]):
+    """Apply filters in the calculation_config format to a query"""
+    for filter_config in filters:
+        condition = filter_condition(entity_model, filter_config)
+        if condition is not None:
+            query = query.filter(condition)
+    return query
+
+
+def _parse_value(raw: str):
+    """JSON scalars (numbers, true/false, null) keep their type, anything else is a string"""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def parse_filter(spec: str) -> Dict:
+    """Parse a `field:operator:value` query parameter into a filter config.
+
+    `in`/`not_in` take comma-separated values; `is_null`/`is_not_null` take none.
+    The field may carry a `json:` prefix and the value may contain colons.
+    """
+    prefix = 'json:' if spec.startswith('json:') else ''
+    parts = spec[len(prefix):].split(':', 2)
+    if len(parts) < 2 or not parts[0]:
+        raise InvalidFilter(f"Invalid filter '{spec}', expected field:operator:value")
+    field, operator = prefix + parts[0], parts[1].lower()
+    if operator not in OPERATORS:
+        raise InvalidFilter(f"Unsupported operator: {operator}")
+    if OPERATORS[operator] in ('is_null', 'is_not_null'):
+        return {"field": field, "operator": operator}
+    if len(parts) != 3:
+        raise InvalidFilter(f"Filter '{spec}' needs a value")
+    raw = parts[2]
+    if OPERATORS[operator] in ('in', 'not_in'):
+        value = [_parse_value(item) for item in raw.split(',')]
+    else:
+        value = raw if OPERATORS[operator] == 'like' else _parse_value(raw)
+    return {"field": field, "operator": operator, "value": value}
+
+
+def sort_keys(entity_model, sort: Optional[str]) -> List[SortKey]:
+    """Keyset ordering for `?sort=-mileage,year`, always ending with the primary key.
+
+    An explicit `id` key keeps its direction and ends the ordering, since
+    nothing after a unique key can change it. Otherwise the id tiebreaker
+    follows the direction of the first key so a single-key sort can be served
+    by one index scan. Whole JSON columns have no useful order and are
+    rejected; sort by a path inside them instead.
+    """
+    keys = []
+    for item in (sort or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        descending = item.startswith('-')
+        field = item.lstrip('+-').replace('json:', '')
+        if field == 'id':
+            keys.append(SortKey(entity_model.id, "id", descending))
+            return keys
+        if field in json_columns(entity_model):
+            raise InvalidFilter(f"Cannot sort by JSON field {field}, sort by a path such as {field}.<key>")
+        expression = field_expression(entity_model, field)
+        keys.append(SortKey(expression, field, descending, nullable=getattr(expression, 'nullable', True)))
+    descending = keys[0].descending if keys else False
+    keys.append(SortKey(entity_model.id, "id", descending))
+    return keys
+
+
+# Query shapes already checked with EXPLAIN QUERY PLAN in this process, oldest
+# first; shapes come from the query string, so only the latest are kept
+CHECKED_PLANS_SIZE = 1024
+_checked_plans: "OrderedDict[Tuple, None]" = OrderedDict()
+
+
+def check_query_plan(db, query, shape) -> List[str]:
+    """Warn when a filtered or sorted list query cannot be answered from an index.
+
+    Runs EXPLAIN QUERY PLAN once per query shape (entity, filter fields and
+    operators, sort) and logs full scans and temp B-tree sorts.
+    """
+    if shape in _checked_plans or db.bind.dialect.name != 'sqlite':
+        return []
+    _checked_plans[shape] = None
+    if len(_checked_plans) > CHECKED_PLANS_SIZE:
+        _checked_plans.popitem(last=False)
+
+    compiled = query.statement.compile(dialect=db.bind.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled.string}", params).all()
+
+    warnings = []
+    for row in plan:
+        detail = row[-1]
+        full_scan = detail.startswith('SCAN') and 'USING' not in detail
+        if full_scan or 'USE TEMP B-TREE' in detail:
+            warnings.append(detail)
+    if warnings:
+        logger.warning(f"Query on {shape[0]} cannot use an index ({'; '.join(warnings)}) for {shape[1:]}")
+    return warnings
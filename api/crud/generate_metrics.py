@@ -1,21 +1,41 @@
 # crud/generate_metrics.py
 import logging
 from datetime import datetime
+import os
 from typing import Dict
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
-from db.session import SessionLocal
-from crud.metric import calculate_all_metrics, calculate_driver_metrics_by_property
+from db.session import IS_SQLITE, TRACK_TABLE_VERSIONS, SessionLocal
+from crud.incremental_metrics import incremental_metric_ids, reconcile_incremental_metrics
+from crud.metric_history import prune_metric_history
+from crud.metric_jobs import fail_orphaned_metric_jobs
+from crud.metric import MetricChangeTracker, calculate_all_metrics, calculate_driver_metrics_by_property
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How often the incremental metrics are rebuilt from scratch
+METRIC_RECONCILE_MINUTES = int(os.getenv("METRIC_RECONCILE_MINUTES", "15"))
+
+# Metrics evaluated by the change-aware jobs, and their source table versions
+metric_changes = MetricChangeTracker()
+
+# Per-scope ("all" or an entity) counts of metric evaluations run and skipped
+job_stats: Dict[str, Dict] = {}
+
 def start_metrics_scheduler() -> AsyncIOScheduler:
     """Initialize and start the metrics scheduler"""
     scheduler = AsyncIOScheduler()
     
+    # Count/sum/avg/percentage metrics are then kept current by triggers
+    if IS_SQLITE:
+        reconcile_metrics_job()
+    
+    # Fail metric jobs left queued or running by a previous worker
+    recover_metric_jobs_job()
+    
     # Add default jobs
     add_default_metric_jobs(scheduler)
     
@@ -36,7 +56,38 @@ def add_default_metric_jobs(scheduler: AsyncIOScheduler):
         name="Calculate all metrics - 5 minutes",
         max_instances=1,
         coalesce=True,
-        kwargs={"entity": None}
+        kwargs={"entity": None, "skip_incremental": True, "only_changed": True}
+    )
+    
+    # Full rebuild of the incrementally maintained metrics, to repair any drift
+    if IS_SQLITE:
+        scheduler.add_job(
+            func=reconcile_metrics_job,
+            trigger=IntervalTrigger(minutes=METRIC_RECONCILE_MINUTES),
+            id="metric_reconciliation",
+            name="Reconcile incremental metrics",
+            max_instances=1,
+            coalesce=True,
+        )
+    
+    # Drop metric history past its retention
+    scheduler.add_job(
+        func=prune_metric_history_job,
+        trigger=CronTrigger(minute=30),
+        id="metric_history_retention",
+        name="Prune metric history - hourly",
+        max_instances=1,
+        coalesce=True,
+    )
+    
+    # Fail metric jobs whose worker stopped heartbeating
+    scheduler.add_job(
+        func=recover_metric_jobs_job,
+        trigger=IntervalTrigger(minutes=1),
+        id="metric_job_recovery",
+        name="Fail orphaned metric jobs",
+        max_instances=1,
+        coalesce=True,
     )
     
     # Job 2: Calculate driver metrics every hour
@@ -85,16 +136,31 @@ def add_default_metric_jobs(scheduler: AsyncIOScheduler):
     
     logger.info("Default metric calculation jobs added to scheduler")
 
-def calculate_all_metrics_job(entity: str = None):
-    """Job function to calculate metrics - must be synchronous for APScheduler"""
+def calculate_all_metrics_job(entity: str = None, skip_incremental: bool = False, only_changed: bool = False):
+    """Job function to calculate metrics - must be synchronous for APScheduler.
+
+    With only_changed, metrics whose source tables were not written since
+    their last evaluation are skipped; the other jobs stay full recomputes,
+    which also catches custom SQL that depends on the clock.
+    """
     try:
         logger.info(f"Starting metric calculation job for entity: {entity or 'all'}")
         
         # Create database session
         db = SessionLocal()
         try:
+            # Read from the database, since any worker may have reinstalled the triggers
+            skip_ids = incremental_metric_ids(db) if skip_incremental else None
             # Calculate metrics
-            updated_metrics = calculate_all_metrics(db, entity=entity)
+            # Without table versions every metric would look unchanged forever
+            tracker = metric_changes if only_changed and TRACK_TABLE_VERSIONS else None
+            before = metric_changes.counts()
+            updated_metrics = calculate_all_metrics(db, entity=entity, skip_ids=skip_ids, tracker=tracker)
+            if tracker:
+                evaluated, skipped, failed = (after - start for after, start in zip(metric_changes.counts(), before))
+            else:
+                evaluated, skipped, failed = len(updated_metrics), 0, 0
+            _record_job_stats(entity or "all", evaluated, skipped, failed)
             
             logger.info(
                 f"Completed metric calculation for entity: {entity or 'all'}. "
@@ -111,6 +177,49 @@ def calculate_all_metrics_job(entity: str = None):
     except Exception as e:
         logger.error(f"Error in metric calculation job for entity {entity}: {str(e)}")
 
+def _record_job_stats(scope: str, evaluated: int, skipped: int, failed: int):
+    stats = job_stats.setdefault(scope, {"runs": 0, "idle_runs": 0, "evaluated": 0, "skipped": 0, "failed": 0})
+    stats["runs"] += 1
+    stats["idle_runs"] += not evaluated and not failed
+    stats["evaluated"] += evaluated
+    stats["skipped"] += skipped
+    stats["failed"] += failed
+    stats["last_run"] = {"at": datetime.now(), "evaluated": evaluated, "skipped": skipped, "failed": failed}
+
+def metric_job_stats() -> Dict[str, Dict]:
+    """Metric evaluations run and skipped by the scheduler, per scope"""
+    return job_stats
+
+def reconcile_metrics_job():
+    """Job function to reinstall the metric triggers and rebuild their accumulators"""
+    try:
+        reconcile_incremental_metrics()
+    except Exception as e:
+        logger.error(f"Error reconciling incremental metrics: {str(e)}")
+
+def prune_metric_history_job():
+    """Job function to apply the metric history retention policy"""
+    try:
+        db = SessionLocal()
+        try:
+            deleted = prune_metric_history(db)
+            logger.info(f"Pruned {deleted} metric history rows")
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Error pruning metric history: {str(e)}")
+
+def recover_metric_jobs_job():
+    """Job function to fail metric jobs orphaned by a stopped worker"""
+    try:
+        db = SessionLocal()
+        try:
+            fail_orphaned_metric_jobs(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Error recovering metric jobs: {str(e)}")
+
 def add_custom_metric_job(
     scheduler: AsyncIOScheduler,
     job_id: str,
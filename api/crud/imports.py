@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+import logging
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from crud.bulk import missing_references
+from crud.writes import row_values
+from db.session import async_variant
+from models.drivers import Driver
+from models.imports import ImportRun
+from models.jobs import Job
+from models.maintenance import Maintenance
+from models.trucks import Truck
+from schemas.drivers import DriverCreate
+from schemas.jobs import JobCreate
+from schemas.maintenance import MaintenanceCreate
+from schemas.trucks import TruckCreate
+
+logger = logging.getLogger(__name__)
+
+# Importable entities: model and the schema every row is validated against
+IMPORTS = {
+    "trucks": (Truck, TruckCreate),
+    "drivers": (Driver, DriverCreate),
+    "jobs": (Job, JobCreate),
+    "maintenance": (Maintenance, MaintenanceCreate),
+}
+
+# Rows per transaction; each commit also checkpoints the run
+IMPORT_BATCH_SIZE = 2000
+
+# Row errors kept on the run; later ones are only counted in rows_failed
+MAX_REPORTED_ERRORS = 1000
+
+
+class InvalidRecord(ValueError):
+    """A line of the upload that could not be parsed into a record"""
+
+
+def _csv_cell(value: str):
+    """JSON-encoded cells (lists, nested objects) are decoded, like the CSV export writes them"""
+    if value[:1] in ('[', '{'):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def parse_csv(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Records from a CSV with a header row; cells missing from short rows are left out"""
+    for record in csv.DictReader(stream):
+        yield {key: _csv_cell(value) for key, value in record.items() if key and value is not None}
+
+
+def parse_ndjson(stream: IO[str]) -> Iterator[Any]:
+    """Records from one JSON object per line; blank lines are skipped"""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield InvalidRecord(f"Invalid JSON: {e}")
+
+
+PARSERS = {"csv": parse_csv, "ndjson": parse_ndjson}
+
+
+def read_records(binary: IO[bytes], format: str) -> Iterator[Any]:
+    """Stream-parse an upload without reading it into memory"""
+    return PARSERS[format](io.TextIOWrapper(binary, encoding="utf-8-sig", newline=""))
+
+
+def create_import(db: Session, entity: str, format: str, filename: Optional[str] = None) -> ImportRun:
+    run = ImportRun(entity=entity, format=format, filename=filename, status="running", errors=[])
+    db.add(run)
+    db.commit()
+    return run
+
+
+def get_import(db: Session, import_id: int) -> Optional[ImportRun]:
+    return db.query(ImportRun).filter(ImportRun.id == import_id).first()
+
+
+def resume_import(db: Session, import_id: int, entity: str) -> ImportRun:
+    """Reopen an unfinished run; its committed rows will be skipped"""
+    run = get_import(db, import_id)
+    if not run:
+        raise ValueError("Import not found")
+    if run.entity != entity:
+        raise ValueError(f"Import {import_id} is for {run.entity}, not {entity}")
+    if run.status == "completed":
+        raise ValueError(f"Import {import_id} already completed")
+    run.status, run.message = "running", None
+    db.commit()
+    return run
+
+
+def _validate(entity_model, schema, batch: List[Tuple[int, Any]]):
+    """Split a batch into insertable rows and per-row errors"""
+    rows, errors = [], []
+    for row_number, record in batch:
+        if isinstance(record, InvalidRecord):
+            errors.append({"row": row_number, "errors": [str(record)]})
+            continue
+        try:
+            payload = schema.model_validate(record)
+        except ValidationError as e:
+            errors.append({"row": row_number, "errors": e.errors(include_url=False, include_context=False, include_input=False)})
+            continue
+        rows.append((row_number, row_values(entity_model, payload.model_dump())))
+    return rows, errors
+
+
+def _check_references(db: Session, entity_model, rows, errors):
+    missing = missing_references(db, entity_model, [values for _, values in rows])
+    if not missing:
+        return rows
+    kept = []
+    for row_number, values in rows:
+        problems = [f"{name} {values[name]} does not exist" for name, ids in missing.items() if values.get(name) in ids]
+        if problems:
+            errors.append({"row": row_number, "errors": problems})
+        else:
+            kept.append((row_number, values))
+    return kept
+
+
+def _insert_rows(db: Session, entity_model, rows, errors) -> int:
+    """Insert the batch with one executemany; on a constraint error, retry row by row to report the culprits.
+
+    Each attempt runs in a savepoint, so a failed statement is undone on its
+    own and the transaction stays usable (PostgreSQL aborts it otherwise).
+    """
+    try:
+        with db.begin_nested():
+            db.execute(insert(entity_model), [values for _, values in rows])
+        return len(rows)
+    except IntegrityError:
+        pass
+    inserted = 0
+    for row_number, values in rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(entity_model.__table__), values)
+            inserted += 1
+        except IntegrityError as e:
+            errors.append({"row": row_number, "errors": [str(e.orig)]})
+    return inserted
+
+
+def _import_batch(db: Session, run: ImportRun, batch: List[Tuple[int, Any]]):
+    entity_model, schema = IMPORTS[run.entity]
+    rows, errors = _validate(entity_model, schema, batch)
+    rows = _check_references(db, entity_model, rows, errors)
+    inserted = _insert_rows(db, entity_model, rows, errors) if rows else 0
+
+    # The checkpoint commits in the same transaction as the rows it covers
+    run.rows_read += len(batch)
+    run.rows_imported += inserted
+    run.rows_failed += len(errors)
+    if errors and len(run.errors) < MAX_REPORTED_ERRORS:
+        run.errors = [*run.errors, *sorted(errors, key=lambda error: error["row"])][:MAX_REPORTED_ERRORS]
+    run.last_row = batch[-1][0]
+    db.commit()
+
+
+def run_import(db: Session, run: ImportRun, records: Iterable[Any], batch_size: int = IMPORT_BATCH_SIZE) -> ImportRun:
+    """Validate and insert `records` in batched transactions, checkpointing after each.
+
+    Rows up to run.last_row were committed by an earlier attempt and are
+    skipped, so a failed import resumes by running it again on the same file.
+    """
+    skip = run.last_row
+    batch: List[Tuple[int, Any]] = []
+    try:
+        for row_number, record in enumerate(records, start=1):
+            if row_number <= skip:
+                continue
+            batch.append((row_number, record))
+            if len(batch) >= batch_size:
+                _import_batch(db, run, batch)
+                batch = []
+        if batch:
+            _import_batch(db, run, batch)
+    except Exception as e:
+        db.rollback()
+        run.status, run.message = "failed", str(e)
+        db.commit()
+        logger.error(f"Import {run.id} failed after row {run.last_row}: {e}")
+        return run
+    run.status = "completed"
+    db.commit()
+    logger.info(f"Import {run.id} of {run.entity}: {run.rows_imported} rows imported, {run.rows_failed} failed")
+    return run
+
+
+# Async variants for `async def` endpoints
+create_import_async = async_variant(create_import)
+get_import_async = async_variant(get_import)
+resume_import_async = async_variant(resume_import)
+run_import_async = async_variant(run_import)
@@ -0,0 +1,206 @@
+"""Incremental maintenance of count, sum, avg and percentage metrics.
+
+Every write path (ORM, bulk statements, imports) issues statements rather than
+flushing ORM objects, so instead of mapper events each entity table gets
+AFTER INSERT/UPDATE/DELETE triggers generated from the metric definitions.
+For every changed row they add the row's contribution (see
+MetricCalculator.contributions) to metric_accumulators and refresh the metric
+value, in the same transaction as the write. Min, max, distinct count and
+custom metrics still need the scheduler's full recompute, and a periodic
+reconciliation rebuilds the accumulators from scratch.
+"""
+import logging
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import Column, delete, func, insert, select, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.visitors import iterate, replacement_traverse
+
+from crud.metric import ENTITY_MODELS, INCREMENTAL_TYPES, MetricCalculator, on_metric_definitions_changed
+from db.session import IS_SQLITE, SessionLocal
+from models.metric import Metric
+from models.metric_accumulators import MetricAccumulator
+
+logger = logging.getLogger(__name__)
+
+# Trigger event -> the row images it applies, and with which sign
+TRIGGER_EVENTS = {
+    "insert": (("new", ""),),
+    "update": (("new", ""), ("old", "-")),
+    "delete": (("old", "-"),),
+}
+
+# A metric's value from its accumulated parts (alias a)
+VALUE_SQL = (
+    "CASE WHEN lower(metric.type) IN ('avg', 'average') "
+    "THEN CASE WHEN a.denominator THEN a.numerator / a.denominator ELSE 0.0 END "
+    "WHEN lower(metric.type) = 'percentage' "
+    "THEN CASE WHEN a.denominator THEN a.numerator * 100.0 / a.denominator ELSE 0.0 END "
+    "ELSE a.numerator END"
+)
+
+REFRESH_SQL = (
+    "UPDATE metric SET value = (SELECT {value} FROM metric_accumulators a WHERE a.metric_id = metric.id) "
+    "WHERE id IN ({ids})"
+)
+
+def trigger_name(table: str, event: str) -> str:
+    return f"metric_{table}_{event}"
+
+
+def incremental_metric_ids(db: Session) -> Set[int]:
+    """Metrics the triggers in the database maintain, whichever process installed them.
+
+    install_metric_triggers writes an entity's triggers and the accumulator
+    rows of exactly the metrics they maintain in one transaction, so a metric
+    counts when it has an accumulator row, its entity's triggers exist and its
+    type is still incremental (a redefinition whose reinstall failed is not).
+    """
+    if not IS_SQLITE:
+        return set()
+    triggers = set(db.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+    entities = [
+        name for name, entity_model in ENTITY_MODELS.items()
+        if trigger_name(entity_model.__tablename__, "insert") in triggers
+    ]
+    rows = db.execute(
+        select(Metric.id, Metric.type)
+        .join(MetricAccumulator, MetricAccumulator.metric_id == Metric.id)
+        .where(Metric.entity.in_(entities))
+    )
+    return {metric_id for metric_id, metric_type in rows if (metric_type or '').lower() in INCREMENTAL_TYPES}
+
+
+def _render(expression, table, row: str) -> str:
+    """SQL for `expression` evaluated against the trigger's NEW or OLD row"""
+    image = table.alias(row)
+
+    def replace(element):
+        if isinstance(element, Column) and element.table is table:
+            return image.c[element.key]
+        return None
+
+    compiled = replacement_traverse(expression, {}, replace).compile(
+        dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    return str(compiled)
+
+
+def _source_columns(table, expressions) -> List[str]:
+    """Columns whose update can change the expressions; JSON path columns map to their source"""
+    names = set()
+    for expression in expressions:
+        for element in iterate(expression):
+            if isinstance(element, Column) and element.table is table:
+                json_path = element.info.get("json_path")
+                names.add(json_path.split(".", 1)[0] if json_path else element.name)
+    return sorted(names)
+
+
+def _delta(parts, index: int, table, rows) -> str:
+    whens = " ".join(
+        f"WHEN {metric.id} THEN "
+        + " + ".join(f"{sign}({_render(expressions[index], table, row)})" for row, sign in rows)
+        for metric, *expressions in parts
+    )
+    return f"CASE metric_id {whens} ELSE 0 END"
+
+
+def _trigger_sql(table, event: str, parts, columns: List[str]) -> str:
+    rows = TRIGGER_EVENTS[event]
+    ids = ", ".join(str(metric.id) for metric, *_ in parts)
+    timing = f"UPDATE OF {', '.join(columns)}" if event == "update" else event.upper()
+    return (
+        f"CREATE TRIGGER {trigger_name(table.name, event)} AFTER {timing} ON {table.name} BEGIN "
+        f"UPDATE metric_accumulators SET numerator = numerator + {_delta(parts, 0, table, rows)}, "
+        f"denominator = denominator + {_delta(parts, 1, table, rows)} WHERE metric_id IN ({ids}); "
+        f"{REFRESH_SQL.format(value=VALUE_SQL, ids=ids)}; "
+        "END"
+    )
+
+
+def _rebuild(db: Session, entity_model, parts) -> None:
+    """Accumulators and values of the entity's incremental metrics, from one pass over its table"""
+    sums = []
+    for _, numerator, denominator in parts:
+        sums += [func.coalesce(func.sum(numerator), 0), func.coalesce(func.sum(denominator), 0)]
+    totals = db.execute(select(*sums).select_from(entity_model)).one()
+    db.execute(
+        insert(MetricAccumulator),
+        [
+            {"metric_id": metric.id, "numerator": totals[2 * i], "denominator": totals[2 * i + 1]}
+            for i, (metric, *_) in enumerate(parts)
+        ],
+    )
+    ids = ", ".join(str(metric.id) for metric, *_ in parts)
+    db.execute(text(REFRESH_SQL.format(value=VALUE_SQL, ids=ids)))
+
+
+def _incremental_parts(db: Session, entity: str) -> List[Tuple]:
+    calculator = MetricCalculator(db)
+    parts = []
+    for metric in db.query(Metric).filter(Metric.entity == entity).order_by(Metric.id):
+        if (metric.type or '').lower() not in INCREMENTAL_TYPES:
+            continue
+        try:
+            parts.append((metric, *calculator.contributions(metric)))
+        except Exception as e:
+            logger.warning(f"Metric {metric.name} is not maintained incrementally: {e}")
+    return parts
+
+
+def install_metric_triggers(db: Session, entity: Optional[str] = None) -> int:
+    """(Re)create the triggers of one or all entities and rebuild their accumulators.
+
+    Runs in one transaction, so no write lands between the rebuild and the
+    triggers taking over. Returns the number of incrementally maintained metrics.
+    """
+    entities = [entity] if entity else list(ENTITY_MODELS)
+    count = 0
+    try:
+        for name in entities:
+            entity_model = ENTITY_MODELS[name]
+            table = entity_model.__table__
+            # Raw DDL: rendered literals may contain colons that text() would take for binds
+            connection = db.connection()
+            for event in TRIGGER_EVENTS:
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger_name(table.name, event)}")
+            db.execute(
+                delete(MetricAccumulator).where(
+                    MetricAccumulator.metric_id.in_(select(Metric.id).where(Metric.entity == name))
+                    | MetricAccumulator.metric_id.not_in(select(Metric.id))
+                )
+            )
+            parts = _incremental_parts(db, name)
+            if parts:
+                columns = _source_columns(table, [expression for _, *expressions in parts for expression in expressions])
+                for event in TRIGGER_EVENTS:
+                    # Without referenced columns (e.g. an unfiltered count) updates change nothing
+                    if event != "update" or columns:
+                        connection.exec_driver_sql(_trigger_sql(table, event, parts, columns))
+                _rebuild(db, entity_model, parts)
+            count += len(parts)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return count
+
+
+def reconcile_incremental_metrics() -> int:
+    """Rebuild every accumulator from the tables; the scheduler runs it periodically"""
+    with SessionLocal() as db:
+        count = install_metric_triggers(db)
+    logger.info(f"Reconciled {count} incremental metrics")
+    return count
+
+
+@on_metric_definitions_changed
+def _reinstall(db: Session, entity: str) -> None:
+    if not IS_SQLITE:
+        return
+    try:
+        install_metric_triggers(db, entity)
+    except Exception as e:
+        logger.error(f"Failed to install incremental metric triggers for {entity}: {e}")
@@ -1,28 +1,33 @@
+from typing import Dict, List, Optional, Sequence, Union
 from sqlalchemy.orm import Session
+from crud.bulk import bulk_create, bulk_delete, bulk_update
+from crud.fieldsets import query_fields
+from crud.listing import list_entities
+from crud.pagination import Page
+from crud.writes import insert_row, update_row
+from db.session import async_variant
 from models.jobs import Job
-from schemas.jobs import JobCreate, JobUpdate
+from schemas.bulk import BulkResult
+from schemas.jobs import JobCreate, JobPatch, JobUpdate
 
-def get_jobs(db: Session):
-    return db.query(Job).all()
+def get_jobs(
+    db: Session,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    filters: Optional[List[Dict]] = None,
+    sort: Optional[str] = None,
+) -> Page:
+    return list_entities(db, Job, limit=limit, after=after, fields=fields, filters=filters, sort=sort)
 
-def get_job(db: Session, job_id: int):
-    return db.query(Job).filter(Job.id == job_id).first()
+def get_job(db: Session, job_id: int, fields: Optional[Sequence[str]] = None):
+    return query_fields(db, Job, fields).filter(Job.id == job_id).first()
 
 def create_job(db: Session, job: JobCreate):
-    db_job = Job(**job.model_dump())
-    db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
-    return db_job
+    return insert_row(db, Job, job.model_dump())
 
-def update_job(db: Session, job_id: int, updated: JobUpdate):
-    db_job = db.query(Job).filter(Job.id == job_id).first()
-    if db_job:
-        for key, value in updated.model_dump().items():
-            setattr(db_job, key, value)
-        db.commit()
-        db.refresh(db_job)
-    return db_job
+def update_job(db: Session, job_id: int, updated: Union[JobUpdate, JobPatch]):
+    return update_row(db, Job, job_id, updated.model_dump(exclude_unset=True))
 
 def delete_job(db: Session, job_id: int):
     db_job = db.query(Job).filter(Job.id == job_id).first()
@@ -30,3 +35,25 @@ def delete_job(db: Session, job_id: int):
         db.delete(db_job)
         db.commit()
     return db_job
+
+
+# Bulk writes: each list is validated per item and written in one transaction
+def bulk_create_jobs(db: Session, items: List[Dict]) -> BulkResult:
+    return bulk_create(db, Job, JobCreate, items)
+
+def bulk_update_jobs(db: Session, items: List[Dict]) -> BulkResult:
+    return bulk_update(db, Job, JobUpdate, items)
+
+def bulk_delete_jobs(db: Session, ids: List[int]) -> BulkResult:
+    return bulk_delete(db, Job, ids)
+
+
+# Async variants for `async def` endpoints
+get_jobs_async = async_variant(get_jobs)
+get_job_async = async_variant(get_job)
+create_job_async = async_variant(create_job)
+update_job_async = async_variant(update_job)
+delete_job_async = async_variant(delete_job)
+bulk_create_jobs_async = async_variant(bulk_create_jobs)
+bulk_update_jobs_async = async_variant(bulk_update_jobs)
+bulk_delete_jobs_async = async_variant(bulk_delete_jobs)
@@ -0,0 +1,41 @@
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+
+from crud.fieldsets import query_fields
+from crud.filters import apply_filters, check_query_plan, sort_keys
+from crud.pagination import Page, fetch_page, keyset_query
+
+
+def list_entities(
+    db: Session,
+    entity_model,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    filters: Optional[List[Dict]] = None,
+    sort: Optional[str] = None,
+    conditions: Sequence = (),
+    options: Sequence = (),
+) -> Page:
+    """Shared list path: column selection, filters, sort and keyset pagination.
+
+    `conditions` are extra SQL criteria fixed by the caller, e.g. the truck
+    whose maintenances are listed; `options` are ORM loader options such as
+    selectinload for related rows.
+    """
+    keys = sort_keys(entity_model, sort)
+    if fields is not None:
+        # Sort values must be on the row to build the next cursor
+        fields = list(dict.fromkeys([*fields, *(key.path.split('.')[0] for key in keys)]))
+    query = query_fields(db, entity_model, fields, options).filter(*conditions)
+    if filters:
+        query = apply_filters(query, entity_model, filters)
+    query = keyset_query(query, keys, after)
+    if filters or sort:
+        shape = (
+            entity_model.__tablename__,
+            tuple((f.get('field'), f.get('operator', '==')) for f in filters or ()),
+            sort,
+        )
+        check_query_plan(db, query, shape)
+    return fetch_page(query, keys, limit)
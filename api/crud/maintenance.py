@@ -1,41 +1,51 @@
+from typing import Dict, List, Optional, Sequence, Union
 from sqlalchemy.orm import Session
+from crud.bulk import bulk_create, bulk_delete, bulk_update
+from crud.fieldsets import query_fields
+from crud.listing import list_entities
+from crud.pagination import Page
+from crud.writes import insert_row, update_row
+from db.session import async_variant
 from models.maintenance import Maintenance
 from models.trucks import Truck
-from schemas.maintenance import MaintenanceCreate, MaintenanceUpdate
-from datetime import timedelta
+from schemas.bulk import BulkResult
+from schemas.maintenance import MaintenanceCreate, MaintenancePatch, MaintenanceUpdate
 
-def get_maintenances(db: Session, truck_id: int = None, limit: int = 100):
-    if truck_id:
-        # Validate truck exists
-        if not db.query(Truck).filter(Truck.id == truck_id).first():
+def get_maintenances(
+    db: Session,
+    truck_id: int = None,
+    limit: Optional[int] = 100,
+    after: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    filters: Optional[List[Dict]] = None,
+    sort: Optional[str] = None,
+) -> Page:
+    conditions = [Maintenance.truck_id == truck_id] if truck_id else []
+    page = list_entities(
+        db, Maintenance, limit=limit, after=after, fields=fields, filters=filters, sort=sort, conditions=conditions
+    )
+    # Only an empty first page needs to know whether the truck exists at all
+    if truck_id and not page.items and not after and not filters:
+        if not db.query(Truck.id).filter(Truck.id == truck_id).first():
             raise ValueError("Truck does not exist")
-        return db.query(Maintenance).filter(Maintenance.truck_id == truck_id).limit(limit).all()
-    return db.query(Maintenance).limit(limit).all()
+    return page
 
-def get_maintenance(db: Session, maintenance_id: int):
-    return db.query(Maintenance).filter(Maintenance.id == maintenance_id).first()
+def get_maintenance(db: Session, maintenance_id: int, fields: Optional[Sequence[str]] = None):
+    return query_fields(db, Maintenance, fields).filter(Maintenance.id == maintenance_id).first()
 
-def create_maintenance(db: Session, maintenance: MaintenanceCreate):
-    # Validate truck exists
-    if not db.query(Truck).filter(Truck.id == maintenance.truck_id).first():
+def _check_truck(db: Session, truck_id: int):
+    if not db.query(Truck.id).filter(Truck.id == truck_id).first():
         raise ValueError("Truck does not exist")
-    db_maintenance = Maintenance(**maintenance.model_dump())
-    db.add(db_maintenance)
-    db.commit()
-    db.refresh(db_maintenance)
-    # Auto-schedule next maintenance (e.g., 6 months)
-    db_maintenance.maintenance_next_scheduled = db_maintenance.date + timedelta(days=180)
-    db.commit()
-    return db_maintenance
 
-def update_maintenance(db: Session, maintenance_id: int, maintenance: MaintenanceUpdate):
-    db_maintenance = db.query(Maintenance).filter(Maintenance.id == maintenance_id).first()
-    if db_maintenance:
-        for key, value in maintenance.model_dump(exclude_unset=True).items():
-            setattr(db_maintenance, key, value)
-        db.commit()
-        db.refresh(db_maintenance)
-    return db_maintenance
+def create_maintenance(db: Session, maintenance: MaintenanceCreate):
+    _check_truck(db, maintenance.truck_id)
+    return insert_row(db, Maintenance, maintenance.model_dump())
+
+def update_maintenance(db: Session, maintenance_id: int, maintenance: Union[MaintenanceUpdate, MaintenancePatch]):
+    values = maintenance.model_dump(exclude_unset=True)
+    if "truck_id" in values:
+        _check_truck(db, values["truck_id"])
+    return update_row(db, Maintenance, maintenance_id, values)
 
 def delete_maintenance(db: Session, maintenance_id: int):
     db_maintenance = db.query(Maintenance).filter(Maintenance.id == maintenance_id).first()
@@ -44,3 +54,24 @@ def delete_maintenance(db: Session, maintenance_id: int):
         db.commit()
     return db_maintenance
 
+
+# Bulk writes: each list is validated per item and written in one transaction
+def bulk_create_maintenances(db: Session, items: List[Dict]) -> BulkResult:
+    return bulk_create(db, Maintenance, MaintenanceCreate, items)
+
+def bulk_update_maintenances(db: Session, items: List[Dict]) -> BulkResult:
+    return bulk_update(db, Maintenance, MaintenanceUpdate, items)
+
+def bulk_delete_maintenances(db: Session, ids: List[int]) -> BulkResult:
+    return bulk_delete(db, Maintenance, ids)
+
+
+# Async variants for `async def` endpoints
+get_maintenances_async = async_variant(get_maintenances)
+get_maintenance_async = async_variant(get_maintenance)
+create_maintenance_async = async_variant(create_maintenance)
+update_maintenance_async = async_variant(update_maintenance)
+delete_maintenance_async = async_variant(delete_maintenance)
+bulk_create_maintenances_async = async_variant(bulk_create_maintenances)
+bulk_update_maintenances_async = async_variant(bulk_update_maintenances)
+bulk_delete_maintenances_async = async_variant(bulk_delete_maintenances)
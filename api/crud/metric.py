@@ -1,9 +1,26 @@
-from sqlalchemy import func, text
+from collections import defaultdict
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from decimal import Decimal
+from sqlalchemy import Column, and_, case, func, literal, select, text
+from sqlalchemy.sql.functions import Function
+from sqlalchemy.sql.visitors import replacement_traverse
 from sqlalchemy.orm import Session
+from db.sandbox import CUSTOM_METRIC_MAX_ROWS, SandboxError, SandboxTimeout, run_readonly, sandbox_path
+from db.session import async_variant, read_only_session
+from db.versions import version_map, versions_query
 from fastapi import HTTPException
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
 
+from crud.filters import field_expression, filter_condition
+from crud.metric_history import record_metric_history
+from crud.sketches import FixedHistogram, TDigest
 from models.base import Base
 from schemas.metric import MetricCreate, MetricUpdate, MetricOut
 from models.metric import Metric
@@ -12,6 +29,8 @@ from models.drivers import Driver
 from models.jobs import Job
 from models.maintenance import Maintenance
 
+logger = logging.getLogger(__name__)
+
 # Entity mapping for dynamic queries
 ENTITY_MODELS = {
     "trucks": Truck,
@@ -20,221 +39,578 @@ ENTITY_MODELS = {
     "maintenance": Maintenance,
 }
 
+# Metric types that need a 'field', with the name used in their error message
+FIELD_METRICS = {
+    'sum': 'Sum',
+    'avg': 'Average',
+    'average': 'Average',
+    'min': 'Min',
+    'max': 'Max',
+    'distinct_count': 'Distinct count',
+    'percentile': 'Percentile',
+    'median': 'Median',
+    'histogram': 'Histogram',
+}
+
+# Metric types streamed through a sketch instead of aggregated in SQL
+DISTRIBUTION_METRICS = {'percentile', 'median', 'histogram'}
+
+# Rows fetched from the cursor, and fed to a sketch, at a time
+SKETCH_CHUNK_SIZE = 5000
+
+# Metric types whose value can be kept up to date from per-row deltas
+# (see crud/incremental_metrics.py); the rest need a full recompute
+INCREMENTAL_TYPES = {'count', 'sum', 'avg', 'average', 'percentage'}
+
+# Consecutive failed or timed-out runs after which a custom metric is disabled
+CUSTOM_METRIC_MAX_FAILURES = int(os.getenv("CUSTOM_METRIC_MAX_FAILURES", "3"))
+
+# Columns a custom metric's run updates, carried back from pool workers
+STATUS_FIELDS = ('status', 'last_error', 'last_run_ms', 'failure_count')
+
+# Metric groups evaluated at once by recalculate_metrics, on threads or (for
+# CPU-bound sketches, which hold the GIL) processes; 1 evaluates in the caller
+METRIC_WORKERS = int(os.getenv("METRIC_WORKERS", str(min(4, os.cpu_count() or 1))))
+METRIC_POOL = os.getenv("METRIC_POOL", "thread")
+
+@dataclass(frozen=True, eq=False)
+class MetricPlan:
+    """A metric definition compiled once.
+
+    expressions are the metric's aggregates (none for custom SQL, grouped
+    and distribution metrics), finish turns their results into the metric
+    value, and statement is the ready-to-run SELECT for the metric on its own.
+    Grouped plans return one row per bucket; streamed plans return the raw
+    values, read in chunks after the optional bounds SELECT. Both finish into
+    (value, breakdown). Sandboxed plans (custom SQL) run on the read-only
+    connection of db/sandbox.py.
+    """
+    entity: str
+    expressions: Tuple
+    finish: Callable
+    statement: Any
+    grouped: bool = False
+    streamed: bool = False
+    bounds: Any = None
+    sandboxed: bool = False
+
+
+# metric id -> (definition key, plan); compiled on first use, dropped by
+# update_metric/delete_metric and recompiled whenever the definition changes
+METRIC_PLANS: Dict[int, Tuple[int, MetricPlan]] = {}
+
+# entity -> (the plans fused, in order, and the SELECT of their aggregates)
+FUSED_STATEMENTS: Dict[str, Tuple[Tuple[MetricPlan, ...], Any]] = {}
+
+
+def _definition_key(metric: Metric) -> int:
+    config = metric.calculation_config
+    if config is not None and not isinstance(config, str):
+        config = json.dumps(config, sort_keys=True)
+    return hash((metric.entity, metric.type, config))
+
+
+def forget_metric_plan(metric_id: int) -> None:
+    """Drop the compiled plan of a changed or deleted metric"""
+    METRIC_PLANS.pop(metric_id, None)
+    FUSED_STATEMENTS.clear()
+
+
+# Called with (db, entity) after metric definitions of that entity are committed
+_definition_listeners: List[Callable[[Session, str], None]] = []
+
+
+def on_metric_definitions_changed(callback: Callable[[Session, str], None]):
+    """Register a callback for created, changed or deleted metric definitions"""
+    _definition_listeners.append(callback)
+    return callback
+
+
+def _definitions_changed(db: Session, entities) -> None:
+    for entity in {entity for entity in entities if entity in ENTITY_MODELS}:
+        for callback in _definition_listeners:
+            callback(db, entity)
+
+
+class MetricChangeTracker:
+    """Skips metrics whose source tables did not change since they were last evaluated.
+
+    Remembers, per metric, the definition and the table_versions of its
+    source table it was computed against; custom SQL may read any table, so
+    it depends on all of them. Counters feed the scheduler stats.
+    """
+    
+    def __init__(self):
+        self._evaluated_at: Dict[int, Tuple[int, Tuple]] = {}
+        self._pending: Dict[int, Tuple[int, Tuple]] = {}
+        self.evaluated = 0
+        self.skipped = 0
+        self.failed = 0
+    
+    def stale(self, db: Session, metrics: List[Metric]) -> List[Metric]:
+        """The metrics that need evaluating"""
+        tables = [model.__tablename__ for model in ENTITY_MODELS.values()]
+        versions = version_map(db.execute(versions_query(tables)))
+        stale = []
+        for metric in metrics:
+            if (metric.type or '').lower() == 'custom':
+                sources = tables
+            else:
+                sources = [ENTITY_MODELS[metric.entity].__tablename__] if metric.entity in ENTITY_MODELS else []
+            state = (_definition_key(metric), tuple(versions.get(table, (0,))[0] for table in sources))
+            if self._evaluated_at.get(metric.id) != state:
+                self._pending[metric.id] = state
+                stale.append(metric)
+        self.skipped += len(metrics) - len(stale)
+        return stale
+    
+    def counts(self) -> Tuple[int, int, int]:
+        """(evaluated, skipped, failed) so far"""
+        return self.evaluated, self.skipped, self.failed
+    
+    def done(self, metric: Metric, failed: bool = False) -> None:
+        """Record an evaluation; failed ones are retried on the next run"""
+        state = self._pending.pop(metric.id, None)
+        if failed:
+            self.failed += 1
+        else:
+            self.evaluated += 1
+            if state:
+                self._evaluated_at[metric.id] = state
+
+
 class MetricCalculator:
     """Generic metric calculator that can handle different metric types and entities"""
     
     def __init__(self, db: Session):
         self.db = db
     
-    def calculate_metric(self, metric: Metric) -> Union[float, int]:
-        """Calculate metric value based on metric configuration"""
+    def calculate_metric(self, metric: Metric) -> Union[float, int, Tuple[float, Dict[str, Any]]]:
+        """Calculate metric value based on metric configuration; metrics with a breakdown give (value, breakdown)"""
         try:
-            entity_model = ENTITY_MODELS.get(metric.entity)
-            if not entity_model:
-                raise ValueError(f"Unknown entity: {metric.entity}")
+            plan = self.plan(metric)
+            if plan.sandboxed:
+                return plan.finish(self._run_sandboxed(metric, plan.statement))
+            if plan.grouped:
+                return plan.finish(self.db.execute(plan.statement).all())
+            if plan.streamed:
+                bounds = self.db.execute(plan.bounds).one() if plan.bounds is not None else None
+                # Core result: the ORM result layer would cost more than the sketch itself
+                result = self.db.connection().execute(plan.statement.execution_options(yield_per=SKETCH_CHUNK_SIZE))
+                return plan.finish(result.scalars().partitions(), bounds)
+            if not plan.expressions:
+                return plan.finish(self.db.execute(plan.statement).scalar())
+            return plan.finish(*self.db.execute(plan.statement).one())
             
-            # Parse calculation config if it exists
-            calc_config = {}
-            if hasattr(metric, 'calculation_config') and metric.calculation_config:
-                import json
-                if isinstance(metric.calculation_config, str):
-                    calc_config = json.loads(metric.calculation_config)
-                else:
-                    calc_config = metric.calculation_config
+        except SandboxError as e:
+            # Keep the type, so callers can tell a rejected custom query apart
+            raise type(e)(f"Failed to calculate metric {metric.name}: {str(e)}") from e
+        except Exception as e:
+            raise ValueError(f"Failed to calculate metric {metric.name}: {str(e)}")
+    
+    def _run_sandboxed(self, metric: Metric, sql: str) -> Any:
+        """First column of the first row of a custom query, recording the run on the metric's status.
+        
+        Runs on a separate read-only connection with a time budget and a row
+        cap, so it sees committed data only. After CUSTOM_METRIC_MAX_FAILURES
+        failures in a row the metric is disabled until its definition changes.
+        """
+        if metric.status == 'disabled':
+            raise SandboxError(f"Disabled after {metric.failure_count} failed runs: {metric.last_error}")
+        path = sandbox_path(self.db.get_bind().url)
+        start = time.perf_counter()
+        try:
+            if path:
+                rows, elapsed = run_readonly(path, sql)
+            else:
+                # No separate file to open read-only (e.g. in-memory SQLite): only the row cap applies
+                rows = self.db.execute(text(sql)).fetchmany(CUSTOM_METRIC_MAX_ROWS + 1)
+                elapsed = (time.perf_counter() - start) * 1000
+                if len(rows) > CUSTOM_METRIC_MAX_ROWS:
+                    raise SandboxError(f"Query returned more than {CUSTOM_METRIC_MAX_ROWS} rows")
+        except Exception as e:
+            metric.last_run_ms = (time.perf_counter() - start) * 1000
+            metric.last_error = str(e)
+            metric.failure_count = (metric.failure_count or 0) + 1
+            if metric.failure_count >= CUSTOM_METRIC_MAX_FAILURES:
+                metric.status = 'disabled'
+                logger.warning(f"Disabled custom metric {metric.name} after {metric.failure_count} failed runs: {e}")
+            else:
+                metric.status = 'timeout' if isinstance(e, SandboxTimeout) else 'failed'
+            raise e if isinstance(e, SandboxError) else SandboxError(str(e))
+        metric.status, metric.last_error, metric.last_run_ms, metric.failure_count = 'ok', None, elapsed, 0
+        return rows[0][0] if rows else None
+    
+    def calculate_metrics(self, metrics: List[Metric]) -> Dict[int, Union[float, int, Exception]]:
+        """Calculate many metrics with one multi-aggregate SELECT per entity.
+
+        Returns metric id -> value, or the error that metric raised. Values
+        match calculate_metric; custom SQL metrics are still run one by one.
+        """
+        by_entity = defaultdict(list)
+        for metric in metrics:
+            by_entity[metric.entity].append(metric)
+        results = {}
+        for entity, entity_metrics in by_entity.items():
+            results.update(self._calculate_entity(entity, entity_metrics))
+        return results
+    
+    def plan(self, metric: Metric) -> MetricPlan:
+        """The metric's compiled plan, reused until its definition changes"""
+        key = _definition_key(metric)
+        cached = METRIC_PLANS.get(metric.id)
+        if cached and cached[0] == key:
+            return cached[1]
+        plan = self._compile_plan(metric)
+        if metric.id is not None:
+            METRIC_PLANS[metric.id] = (key, plan)
+        return plan
+    
+    def _compile_plan(self, metric: Metric) -> MetricPlan:
+        entity_model = ENTITY_MODELS.get(metric.entity)
+        if not entity_model:
+            raise ValueError(f"Unknown entity: {metric.entity}")
+        config = self._calculation_config(metric)
+        
+        if metric.type.lower() == 'custom':
+            custom_query = config.get('query')
+            if not custom_query:
+                raise ValueError("Custom metric requires 'query' in calculation_config")
+            return MetricPlan(
+                metric.entity, (), lambda value: float(value) if value is not None else 0.0, custom_query, sandboxed=True
+            )
+        
+        if metric.type.lower() == 'grouped':
+            return self._compile_grouped(entity_model, metric.entity, config)
+        
+        if metric.type.lower() in DISTRIBUTION_METRICS:
+            return self._compile_distribution(entity_model, metric.entity, metric.type.lower(), config)
+        
+        expressions, finish = self._compile_metric(entity_model, metric.type, config)
+        labeled = [expression.label(f"m{i}") for i, expression in enumerate(expressions)]
+        return MetricPlan(metric.entity, tuple(expressions), finish, self._fused_select(entity_model, labeled))
+    
+    def _compile_grouped(self, entity_model, entity: str, config: Dict) -> MetricPlan:
+        """One GROUP BY query: the `aggregate` (count by default) of each bucket of `group_by`"""
+        group_by = config.get('group_by')
+        if not group_by:
+            raise ValueError("Grouped metric requires 'group_by' in calculation_config")
+        aggregate = (config.get('aggregate') or 'count').lower()
+        if aggregate in ('custom', 'grouped'):
+            raise ValueError(f"Unsupported aggregate for a grouped metric: {aggregate}")
+        
+        # Filters go in WHERE, so buckets without matching rows are left out
+        expressions, finish = self._compile_metric(entity_model, aggregate, {**config, 'filters': []})
+        bucket = field_expression(entity_model, group_by)
+        statement = select(bucket.label('bucket'), *expressions).select_from(entity_model)
+        condition = self._filters_condition(entity_model, config.get('filters') or [])
+        if condition is not None:
+            statement = statement.where(condition)
+        
+        def breakdown(rows) -> Tuple[int, Dict[str, Any]]:
+            buckets = {("null" if row[0] is None else str(row[0])): finish(*row[1:]) for row in rows}
+            return len(buckets), buckets
+        
+        return MetricPlan(entity, (), breakdown, statement.group_by(bucket).order_by(bucket), grouped=True)
+    
+    def _compile_distribution(self, entity_model, entity: str, kind: str, config: Dict) -> MetricPlan:
+        """Stream the field's non-null values into a t-digest (percentile, median) or a fixed-bin histogram"""
+        expression = self._metric_field(entity_model, kind, config)
+        condition = self._filters_condition(entity_model, config.get('filters') or [], expression.isnot(None))
+        statement = select(expression).select_from(entity_model).where(condition)
+        
+        if kind == 'histogram':
+            bins = int(config.get('bins', 10))
+            low, high = config.get('min'), config.get('max')
+            bounds = None
+            if low is None or high is None:
+                bounds = select(func.min(expression), func.max(expression)).select_from(entity_model).where(condition)
             
-            return self._calculate_by_type(entity_model, metric.type, calc_config)
+            def histogram(chunks, found) -> Tuple[int, Dict[str, int]]:
+                sketch = FixedHistogram(
+                    float(low if low is not None else (found[0] or 0)),
+                    float(high if high is not None else (found[1] or 0)),
+                    bins,
+                )
+                for chunk in chunks:
+                    sketch.update(_numbers(chunk))
+                return sketch.count, sketch.as_dict()
             
+            return MetricPlan(entity, (), histogram, statement, streamed=True, bounds=bounds)
+        
+        percentiles = [50] if kind == 'median' else config.get('percentiles') or [config.get('percentile', 50)]
+        percentiles = [float(p) for p in percentiles]
+        if any(not 0 <= p <= 100 for p in percentiles):
+            raise ValueError("Percentiles must be between 0 and 100")
+        compression = float(config.get('compression', 100))
+        
+        def quantiles(chunks, _) -> Tuple[float, Dict[str, float]]:
+            sketch = TDigest(compression)
+            for chunk in chunks:
+                sketch.update(_numbers(chunk))
+            values = {f"p{p:g}": sketch.quantile(p / 100) for p in percentiles}
+            if sketch.count == 0:
+                return 0.0, {}
+            return values[f"p{percentiles[0]:g}"], values
+        
+        return MetricPlan(entity, (), quantiles, statement, streamed=True)
+    
+    def _calculate_entity(self, entity: str, metrics: List[Metric]) -> Dict[int, Union[float, int, Exception]]:
+        """Fuse the entity's metrics into one SELECT of FILTER (WHERE ...) aggregates"""
+        results = {}
+        fused = []  # (metric, plan)
+        for metric in metrics:
+            try:
+                plan = self.plan(metric)
+            except Exception as e:
+                results[metric.id] = ValueError(f"Failed to calculate metric {metric.name}: {str(e)}")
+                continue
+            if plan.expressions:
+                fused.append((metric, plan))
+            else:
+                results[metric.id] = self._calculate_one(metric)
+        if not fused:
+            return results
+        
+        try:
+            row = self.db.execute(self._fused_statement(entity, fused)).one()
+        except Exception:
+            # One bad definition fails the whole SELECT; run them apart to find it
+            for metric, _ in fused:
+                results[metric.id] = self._calculate_one(metric)
+            return results
+        start = 0
+        for metric, plan in fused:
+            try:
+                results[metric.id] = plan.finish(*row[start:start + len(plan.expressions)])
+            except Exception as e:
+                results[metric.id] = ValueError(f"Failed to calculate metric {metric.name}: {str(e)}")
+            start += len(plan.expressions)
+        return results
+    
+    def _fused_statement(self, entity: str, fused: List[Tuple[Metric, MetricPlan]]):
+        """The fused SELECT for these plans, rebuilt only when the entity's metrics change"""
+        # Plans compare by identity, and a changed metric gets a new plan
+        plans = tuple(plan for _, plan in fused)
+        cached = FUSED_STATEMENTS.get(entity)
+        if cached and cached[0] == plans:
+            return cached[1]
+        expressions = [expression for plan in plans for expression in plan.expressions]
+        statement = self._fused_select(
+            ENTITY_MODELS[entity],
+            [expression.label(f"m{i}") for i, expression in enumerate(expressions)],
+        )
+        FUSED_STATEMENTS[entity] = (plans, statement)
+        return statement
+    
+    def _fused_select(self, entity_model, columns: List):
+        """SELECT of the aggregates, reading each JSON path once per row.
+
+        SQLite evaluates json_extract() again in every aggregate that mentions
+        it, so when a path is shared the paths (and the plain columns used) are
+        extracted once in a subquery that the aggregates read from. LIMIT -1
+        stops SQLite from flattening the subquery back into the outer query.
+        """
+        paths: Dict[Tuple[str, Any], Any] = {}
+        uses: Dict[Tuple[str, Any], int] = defaultdict(int)
+        plain: Dict[str, Column] = {}
+        
+        def collect(element):
+            if isinstance(element, Function) and element.name == 'json_extract':
+                source, path = element.clauses.clauses
+                paths.setdefault((source.key, path.value), element)
+                uses[(source.key, path.value)] += 1
+                return element
+            if isinstance(element, Column) and element.table is entity_model.__table__:
+                plain.setdefault(element.key, element)
+                return element
+            return None
+        
+        for column in columns:
+            replacement_traverse(column, {}, collect)
+        if all(count == 1 for count in uses.values()):
+            return select(*columns).select_from(entity_model)
+        
+        keys = list(paths)
+        inner = select(
+            *plain.values(),
+            *(paths[key].label(f"path_{i}") for i, key in enumerate(keys)),
+        )
+        if self.db.get_bind().dialect.name == 'sqlite':
+            inner = inner.limit(-1)
+        rows = inner.subquery()
+        
+        def swap(element):
+            if isinstance(element, Function) and element.name == 'json_extract':
+                source, path = element.clauses.clauses
+                return rows.c[f"path_{keys.index((source.key, path.value))}"]
+            if isinstance(element, Column) and element.table is entity_model.__table__:
+                return rows.c[element.key]
+            return None
+        
+        return select(*(replacement_traverse(column, {}, swap) for column in columns))
+    
+    def _calculate_one(self, metric: Metric) -> Union[float, int, Exception]:
+        try:
+            return self.calculate_metric(metric)
         except Exception as e:
-            raise ValueError(f"Failed to calculate metric {metric.name}: {str(e)}")
+            return e
+    
+    def _calculation_config(self, metric: Metric) -> Dict:
+        """Parse calculation config if it exists"""
+        if not metric.calculation_config:
+            return {}
+        if isinstance(metric.calculation_config, str):
+            return json.loads(metric.calculation_config)
+        return metric.calculation_config
+    
+    def _filters_condition(self, entity_model, filters: List[Dict], base=None):
+        """AND of the filters (and `base`), or None when there is nothing to filter on"""
+        conditions = [] if base is None else [base]
+        for filter_config in filters:
+            condition = filter_condition(entity_model, filter_config)
+            if condition is not None:
+                conditions.append(condition)
+        return and_(*conditions) if conditions else None
+    
+    def contributions(self, metric: Metric) -> Tuple[Any, Any]:
+        """Per-row (numerator, denominator) expressions of an incremental metric.
+
+        Summed over the entity's table they give the metric: count and sum are
+        the numerator, avg is numerator / denominator and percentage the same
+        times 100. Evaluated against one row, they are that row's delta.
+        """
+        entity_model = ENTITY_MODELS.get(metric.entity)
+        if not entity_model:
+            raise ValueError(f"Unknown entity: {metric.entity}")
+        kind = (metric.type or '').lower()
+        if kind not in INCREMENTAL_TYPES:
+            raise ValueError(f"{metric.type} metrics cannot be maintained incrementally")
+        config = self._calculation_config(metric)
+        condition = self._filters_condition(entity_model, config.get('filters') or [])
+        
+        def when(where, value=None):
+            value = literal(1) if value is None else value
+            return case((where, value), else_=0) if where is not None else value
+        
+        match kind:
+            case 'count':
+                return when(condition), literal(0)
+            
+            case 'sum':
+                expression = self._metric_field(entity_model, kind, config)
+                return when(condition, func.coalesce(expression, 0)), literal(0)
+            
+            case 'avg' | 'average':
+                expression = self._metric_field(entity_model, kind, config)
+                present = expression.isnot(None) if condition is None else and_(condition, expression.isnot(None))
+                return when(present, expression), when(present)
+            
+            case 'percentage':
+                numerator, denominator = self._percentage_conditions(entity_model, config, condition)
+                return when(numerator), when(denominator)
+    
+    def _metric_field(self, entity_model, kind: str, config: Dict):
+        field = config.get('field')
+        if not field:
+            raise ValueError(f"{FIELD_METRICS[kind]} metric requires 'field' in calculation_config")
+        return self._get_field_expression(entity_model, field)
+    
+    def _percentage_conditions(self, entity_model, config: Dict, condition):
+        numerator = self._filters_condition(entity_model, config.get('numerator_filters', []), condition)
+        denominator = condition
+        if config.get('denominator_filters'):
+            denominator = self._filters_condition(entity_model, config['denominator_filters'], condition)
+        return numerator, denominator
     
-    def _calculate_by_type(self, entity_model, metric_type: str, config: Dict) -> Union[float, int]:
-        """Calculate metric based on type"""
-        base_query = self.db.query(entity_model)
+    def _compile_metric(self, entity_model, metric_type: str, config: Dict) -> Tuple[List, Callable]:
+        """Aggregate expressions for one metric and the function turning their results into its value"""
+        condition = self._filters_condition(entity_model, config.get('filters') or [])
         
-        # Apply filters if specified
-        if config.get('filters'):
-            base_query = self._apply_filters(base_query, entity_model, config['filters'])
+        def aggregate(expression, where=condition):
+            return expression.filter(where) if where is not None else expression
         
-        match metric_type.lower():
+        kind = metric_type.lower()
+        if kind in FIELD_METRICS:
+            expression = self._metric_field(entity_model, kind, config)
+        
+        match kind:
             case 'count':
-                return base_query.count()
+                return [aggregate(func.count())], int
             
             case 'sum':
-                field = config.get('field')
-                if not field:
-                    raise ValueError("Sum metric requires 'field' in calculation_config")
-                return self._calculate_sum(base_query, entity_model, field)
+                return [aggregate(func.sum(expression))], lambda value: float(value) if value is not None else 0.0
             
             case 'avg' | 'average':
-                field = config.get('field')
-                if not field:
-                    raise ValueError("Average metric requires 'field' in calculation_config")
-                return self._calculate_average(base_query, entity_model, field)
+                return [aggregate(func.avg(expression))], lambda value: float(value) if value is not None else 0.0
             
             case 'min':
-                field = config.get('field')
-                if not field:
-                    raise ValueError("Min metric requires 'field' in calculation_config")
-                return self._calculate_min(base_query, entity_model, field)
+                return [aggregate(func.min(_numeric(expression, kind)))], _extreme(kind)
             
             case 'max':
-                field = config.get('field')
-                if not field:
-                    raise ValueError("Max metric requires 'field' in calculation_config")
-                return self._calculate_max(base_query, entity_model, field)
+                return [aggregate(func.max(_numeric(expression, kind)))], _extreme(kind)
             
             case 'distinct_count':
-                field = config.get('field')
-                if not field:
-                    raise ValueError("Distinct count metric requires 'field' in calculation_config")
-                return self._calculate_distinct_count(base_query, entity_model, field)
+                return (
+                    [aggregate(func.count(func.distinct(expression)))],
+                    lambda value: int(value) if value is not None else 0,
+                )
             
             case 'percentage':
-                return self._calculate_percentage(base_query, entity_model, config)
-            
-            case 'custom':
-                return self._calculate_custom(entity_model, config)
+                numerator, denominator = self._percentage_conditions(entity_model, config, condition)
+                return (
+                    [aggregate(func.count(), numerator), aggregate(func.count(), denominator)],
+                    lambda num, den: (num / den) * 100.0 if den else 0.0,
+                )
             
             case _:
                 raise ValueError(f"Unsupported metric type: {metric_type}")
     
-    def _apply_filters(self, query, entity_model, filters: List[Dict]):
-        """Apply filters to the query"""
-        # Detect JSON columns in the model
-        json_columns = set()
-        for attr in dir(entity_model):
-            col = getattr(entity_model, attr)
-            if hasattr(col, 'type') and hasattr(col.type, '__class__') and col.type.__class__.__name__ == 'JSON':
-                json_columns.add(attr)
-        for filter_config in filters:
-            field = filter_config.get('field')
-            operator = filter_config.get('operator', '==')
-            value = filter_config.get('value')
-            if not field:
-                continue
-            # Handle JSON field extraction automatically
-            if '.' in field:
-                root, json_path = field.split('.', 1)
-                if root in json_columns:
-                    model_field = getattr(entity_model, root)
-                    expression = func.json_extract(model_field, f'$.{json_path}')
-                else:
-                    expression = getattr(entity_model, field)
-            elif field.startswith('json:'):
-                json_field, json_path = field.replace('json:', '').split('.', 1)
-                model_field = getattr(entity_model, json_field)
-                expression = func.json_extract(model_field, f'$.{json_path}')
-            else:
-                expression = getattr(entity_model, field)
-            match operator.lower():
-                case '==' | 'eq':
-                    query = query.filter(expression == value)
-                case '!=' | 'ne':
-                    query = query.filter(expression != value)
-                case '>' | 'gt':
-                    query = query.filter(expression > value)
-                case '>=' | 'gte':
-                    query = query.filter(expression >= value)
-                case '<' | 'lt':
-                    query = query.filter(expression < value)
-                case '<=' | 'lte':
-                    query = query.filter(expression <= value)
-                case 'in':
-                    query = query.filter(expression.in_(value))
-                case 'not_in':
-                    query = query.filter(~expression.in_(value))
-                case 'like':
-                    query = query.filter(expression.like(f'%{value}%'))
-                case 'is_null':
-                    query = query.filter(expression.is_(None))
-                case 'is_not_null':
-                    query = query.filter(expression.isnot(None))
-        return query
-    
     def _get_field_expression(self, entity_model, field: str):
         """Get field expression, handling JSON fields"""
-        # Detect JSON columns in the model
-        json_columns = set()
-        for attr in dir(entity_model):
-            col = getattr(entity_model, attr)
-            if hasattr(col, 'type') and hasattr(col.type, '__class__') and col.type.__class__.__name__ == 'JSON':
-                json_columns.add(attr)
-        if '.' in field:
-            root, json_path = field.split('.', 1)
-            if root in json_columns:
-                model_field = getattr(entity_model, root)
-                return func.json_extract(model_field, f'$.{json_path}')
-            else:
-                return getattr(entity_model, field)
-        elif field.startswith('json:'):
-            json_field, json_path = field.replace('json:', '').split('.', 1)
-            model_field = getattr(entity_model, json_field)
-            return func.json_extract(model_field, f'$.{json_path}')
-        else:
-            return getattr(entity_model, field)
-    
-    def _calculate_sum(self, query, entity_model, field: str) -> float:
-        """Calculate sum of a field"""
-        expression = self._get_field_expression(entity_model, field)
-        result = query.with_entities(func.sum(expression)).scalar()
-        return float(result) if result is not None else 0.0
-    
-    def _calculate_average(self, query, entity_model, field: str) -> float:
-        """Calculate average of a field"""
-        expression = self._get_field_expression(entity_model, field)
-        result = query.with_entities(func.avg(expression)).scalar()
-        return float(result) if result is not None else 0.0
-    
-    def _calculate_min(self, query, entity_model, field: str) -> Union[float, int]:
-        """Calculate minimum of a field"""
-        expression = self._get_field_expression(entity_model, field)
-        result = query.with_entities(func.min(expression)).scalar()
-        return result if result is not None else 0
-    
-    def _calculate_max(self, query, entity_model, field: str) -> Union[float, int]:
-        """Calculate maximum of a field"""
-        expression = self._get_field_expression(entity_model, field)
-        result = query.with_entities(func.max(expression)).scalar()
-        return result if result is not None else 0
-    
-    def _calculate_distinct_count(self, query, entity_model, field: str) -> int:
-        """Calculate distinct count of a field"""
-        expression = self._get_field_expression(entity_model, field)
-        result = query.with_entities(func.count(func.distinct(expression))).scalar()
-        return int(result) if result is not None else 0
-    
-    def _calculate_percentage(self, query, entity_model, config: Dict) -> float:
-        """Calculate percentage based on configuration"""
-        numerator_filters = config.get('numerator_filters', [])
-        denominator_filters = config.get('denominator_filters', [])
-        
-        # Calculate numerator
-        num_query = self._apply_filters(query, entity_model, numerator_filters)
-        numerator = num_query.count()
-        
-        # Calculate denominator
-        if denominator_filters:
-            den_query = self._apply_filters(query, entity_model, denominator_filters)
-            denominator = den_query.count()
-        else:
-            denominator = query.count()
-        
-        if denominator == 0:
-            return 0.0
-        
-        return (numerator / denominator) * 100.0
-    
-    def _calculate_custom(self, entity_model, config: Dict) -> Union[float, int]:
+        return field_expression(entity_model, field, numeric=True)
 
-        """Execute custom SQL query"""
-        custom_query = config.get('query')
-        if not custom_query:
-            raise ValueError("Custom metric requires 'query' in calculation_config")
-        
-        result = self.db.execute(text(custom_query)).scalar()
-        return float(result) if result is not None else 0.0
+
+def _numeric(expression, kind: str):
+    """The expression, unless its column type is known not to hold numbers (e.g. a status string)"""
+    try:
+        python_type = expression.type.python_type
+    except NotImplementedError:
+        return expression  # JSON paths: checked on the value by _extreme
+    if python_type is bool or not issubclass(python_type, (int, float, Decimal)):
+        raise ValueError(f"{FIELD_METRICS[kind]} metric requires a numeric field")
+    return expression
+
+
+def _extreme(kind: str) -> Callable[[Any], Union[float, int]]:
+    """Finish of min/max: 0 without rows, an error for a non-numeric JSON value"""
+    def finish(value):
+        if value is None:
+            return 0
+        if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+            raise ValueError(f"{FIELD_METRICS[kind]} metric requires a numeric field, got {value!r}")
+        return value
+    return finish
+
+
+def _numbers(values):
+    """The values that are numbers; JSON paths can hold text"""
+    for value in values:
+        try:
+            yield float(value)
+        except (TypeError, ValueError):
+            continue
 
 
+def _store_value(metric: Metric, value) -> None:
+    """Set a computed value; (value, breakdown) results also store the breakdown"""
+    if isinstance(value, tuple):
+        metric.value, metric.breakdown = value
+    else:
+        if metric.breakdown is not None:
+            metric.breakdown = None
+        metric.value = value
+
 
 def add_metric(db: Session, metric: MetricCreate) -> Metric:
     """Create a new metric"""
@@ -251,6 +627,7 @@ def add_metric(db: Session, metric: MetricCreate) -> Metric:
         record = Metric(**metric_data)
         db.add(record)
         db.commit()
+        _definitions_changed(db, [record.entity])
         db.refresh(record)
         return record
     except Exception as err:
@@ -307,6 +684,7 @@ def calculate_driver_metrics_by_property(
             existing_metric = Metric(**metric_data)
             db.add(existing_metric)
             db.commit()
+            _definitions_changed(db, [existing_metric.entity])
             db.refresh(existing_metric)
 
         # Calculate the metric using MetricCalculator
@@ -314,7 +692,8 @@ def calculate_driver_metrics_by_property(
         new_value = calculator.calculate_metric(existing_metric)
 
         # Update the metric value
-        existing_metric.value = new_value
+        _store_value(existing_metric, new_value)
+        record_metric_history(db, [existing_metric.id])
         db.commit()
         db.refresh(existing_metric)
 
@@ -376,6 +755,7 @@ def update_metric(
         record = get_metric(db, metric_id, metric_name)
         
         # Update fields if provided
+        redefined = False
         if metric_update:
             update_data = metric_update.model_dump(exclude_unset=True)
             # Ensure calculation_config is stored as a string
@@ -384,14 +764,22 @@ def update_metric(
                 update_data["calculation_config"] = json.dumps(update_data["calculation_config"])
             for key, value in update_data.items():
                 setattr(record, key, value)
+            forget_metric_plan(record.id)
+            redefined = bool(update_data.keys() & {"type", "calculation_config"})
+            if redefined:
+                # A new definition gets a clean slate, which re-enables a disabled metric
+                record.status, record.last_error, record.last_run_ms, record.failure_count = None, None, None, 0
         
         # Recalculate value if requested
         if recalculate and record.entity:
             calculator = MetricCalculator(db)
             new_value = calculator.calculate_metric(record)
-            record.value = new_value
+            _store_value(record, new_value)
+            record_metric_history(db, [record.id])
         
         db.commit()
+        if redefined:
+            _definitions_changed(db, [record.entity])
         db.refresh(record)
         return record
         
@@ -409,9 +797,15 @@ def calculate_metric_value(db: Session, metric_id: Optional[int] = None, metric_
             raise HTTPException(status_code=400, detail="Cannot calculate metric without entity")
         
         calculator = MetricCalculator(db)
-        new_value = calculator.calculate_metric(record)
+        try:
+            new_value = calculator.calculate_metric(record)
+        except SandboxError:
+            # Keep the failed run on the metric's status
+            db.commit()
+            raise
         
-        record.value = new_value
+        _store_value(record, new_value)
+        record_metric_history(db, [record.id])
         db.commit()
         db.refresh(record)
         
@@ -422,28 +816,166 @@ def calculate_metric_value(db: Session, metric_id: Optional[int] = None, metric_
         raise HTTPException(status_code=400, detail=f"Failed to calculate metric: {err}")
 
 
-def calculate_all_metrics(db: Session, entity: Optional[str] = None) -> List[Metric]:
-    """Calculate all metrics or metrics for a specific entity"""
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def _metric_pool() -> Executor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if METRIC_POOL == "process":
+                # spawn: forking would copy the parent's open connections and scheduler threads
+                _pool = ProcessPoolExecutor(METRIC_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                _pool = ThreadPoolExecutor(METRIC_WORKERS, thread_name_prefix="metric-eval")
+        return _pool
+
+
+def _discard_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def _metric_groups(calculator: MetricCalculator, metrics: List[Metric]) -> List[Tuple[str, List[Metric]]]:
+    """Independent units of work: each entity's fused metrics together, every other metric alone"""
+    fused = defaultdict(list)
+    groups = []
+    for metric in metrics:
+        try:
+            alone = not calculator.plan(metric).expressions
+        except Exception:
+            alone = False  # calculate_metrics reports the error
+        if alone:
+            groups.append((metric.entity, [metric]))
+        else:
+            fused[metric.entity].append(metric)
+    return [*fused.items(), *groups]
+
+
+def _evaluate_group(database: str, metric_ids: List[int]) -> Tuple[Dict[int, Any], Dict[int, Dict[str, Any]], float]:
+    """Pool worker: evaluate metrics on a read-only session within one read transaction.
+
+    All of the group's statements see the same WAL snapshot. Returns the
+    results, the status columns of custom metrics and the time taken in ms.
+    """
+    start = time.perf_counter()
+    with read_only_session(database) as db:
+        db.connection().exec_driver_sql("BEGIN")
+        metrics = db.query(Metric).filter(Metric.id.in_(metric_ids)).all()
+        results = MetricCalculator(db).calculate_metrics(metrics)
+        statuses = {
+            metric.id: {field: getattr(metric, field) for field in STATUS_FIELDS}
+            for metric in metrics
+            if (metric.type or '').lower() == 'custom'
+        }
+    return results, statuses, (time.perf_counter() - start) * 1000
+
+
+def recalculate_metrics(
+    db: Session,
+    metrics: List[Metric],
+    watched_ids: Optional[List[int]] = None,
+    progress: Optional[Callable[[str, Dict[int, Any], float], None]] = None,
+) -> Dict[int, Union[float, int, Exception]]:
+    """Evaluate metrics in independent groups, then store every value and its history in one commit.
+
+    With METRIC_WORKERS > 1 and a SQLite file, the groups run on the metric
+    pool, each on its own read-only session; only the final write uses `db`.
+    Returns metric id -> value, or the error that metric raised. progress is
+    called with (entity, results, ms) after each group, before anything is
+    written. Every metric given gets a history point; watched_ids, metrics
+    not evaluated here (e.g. trigger-maintained ones), get one only when their
+    value changed since their last point.
+    """
+    calculator = MetricCalculator(db)
+    groups = _metric_groups(calculator, metrics)
+    database = sandbox_path(db.get_bind().url)
+    values = {}
+    if METRIC_WORKERS > 1 and len(groups) > 1 and database:
+        by_id = {metric.id: metric for metric in metrics}
+        futures = {
+            _metric_pool().submit(_evaluate_group, database, [metric.id for metric in group]): (entity, group)
+            for entity, group in groups
+        }
+        for future in as_completed(futures):
+            entity, group = futures[future]
+            try:
+                results, statuses, elapsed = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenExecutor):
+                    _discard_pool()  # e.g. a worker process was killed; the next run starts a new pool
+                results, statuses, elapsed = {metric.id: e for metric in group}, {}, 0.0
+            for metric in group:
+                # A metric deleted since it was listed has no result
+                results.setdefault(metric.id, ValueError(f"Metric {metric.name} no longer exists"))
+            for metric_id, status in statuses.items():
+                for field, value in status.items():
+                    setattr(by_id[metric_id], field, value)
+            values.update(results)
+            if progress:
+                progress(entity, results, elapsed)
+    else:
+        for entity, group in groups:
+            start = time.perf_counter()
+            results = calculator.calculate_metrics(group)
+            values.update(results)
+            if progress:
+                progress(entity, results, (time.perf_counter() - start) * 1000)
+    
+    for metric in metrics:
+        if not isinstance(values[metric.id], Exception):
+            _store_value(metric, values[metric.id])
+    record_metric_history(db, [metric.id for metric in metrics])
+    if watched_ids:
+        record_metric_history(db, watched_ids, only_changed=True)
+    db.commit()
+    return values
+
+
+def calculate_all_metrics(
+    db: Session,
+    entity: Optional[str] = None,
+    skip_ids: Optional[Set[int]] = None,
+    tracker: Optional[MetricChangeTracker] = None,
+) -> List[Metric]:
+    """Calculate all metrics or metrics for a specific entity.
+
+    Metrics in skip_ids (those the incremental engine keeps up to date) are
+    left alone and only the others are recomputed. With a tracker, so are
+    metrics whose source tables did not change since its last run.
+    """
     try:
         query = db.query(Metric).filter(Metric.entity.isnot(None))
         
         if entity:
             query = query.filter(Metric.entity == entity)
         
-        metrics = query.all()
-        calculator = MetricCalculator(db)
+        # Disabled custom metrics keep their last value until redefined
+        metrics = [metric for metric in query.all() if metric.status != 'disabled']
+        listed = [metric.id for metric in metrics]
+        if skip_ids:
+            metrics = [metric for metric in metrics if metric.id not in skip_ids]
+        if tracker:
+            metrics = tracker.stale(db, metrics)
+        # Skipped metrics are only recorded when the triggers changed their value,
+        # so an idle run writes nothing
+        evaluated = {metric.id for metric in metrics}
+        watched_ids = [metric_id for metric_id in listed if metric_id not in evaluated]
+        values = recalculate_metrics(db, metrics, watched_ids=watched_ids)
         
         updated_metrics = []
         for metric in metrics:
-            try:
-                new_value = calculator.calculate_metric(metric)
-                metric.value = new_value
-                updated_metrics.append(metric)
-            except Exception as e:
-                print(f"Failed to calculate metric {metric.name}: {e}")
+            if isinstance(values[metric.id], Exception):
+                print(f"Failed to calculate metric {metric.name}: {values[metric.id]}")
                 continue
-        
-        db.commit()
+            updated_metrics.append(metric)
+        if tracker:
+            for metric in metrics:
+                tracker.done(metric, failed=isinstance(values[metric.id], Exception))
         return updated_metrics
         
     except Exception as err:
@@ -457,6 +989,8 @@ def delete_metric(db: Session, metric_id: Optional[int] = None, metric_name: Opt
         record = get_metric(db, metric_id, metric_name)
         db.delete(record)
         db.commit()
+        forget_metric_plan(record.id)
+        _definitions_changed(db, [record.entity])
     except Exception as err:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to delete metric: {err}")
@@ -478,6 +1012,7 @@ def bulk_create_metrics(db: Session, metrics: List[MetricCreate]) -> List[Metric
             db.add(record)
             created_metrics.append(record)
         db.commit()
+        _definitions_changed(db, [record.entity for record in created_metrics])
         # Refresh all records
         for record in created_metrics:
             db.refresh(record)
@@ -515,4 +1050,16 @@ def get_metric_statistics(db: Session, entity: Optional[str] = None) -> Dict[str
         "total_metrics": total_metrics,
         "by_type": {metric_type: count for metric_type, count in type_stats},
         "by_entity": {entity_name: count for entity_name, count in entity_stats}
-    }
\ No newline at end of file
+    }
+
+
+# Async variants for `async def` endpoints
+add_metric_async = async_variant(add_metric)
+get_metric_async = async_variant(get_metric)
+get_all_metrics_async = async_variant(get_all_metrics)
+update_metric_async = async_variant(update_metric)
+calculate_metric_value_async = async_variant(calculate_metric_value)
+calculate_all_metrics_async = async_variant(calculate_all_metrics)
+delete_metric_async = async_variant(delete_metric)
+bulk_create_metrics_async = async_variant(bulk_create_metrics)
+get_metric_statistics_async = async_variant(get_metric_statistics)
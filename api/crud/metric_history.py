@@ -0,0 +1,235 @@
+"""Metric history: raw points, 1m/1h/1d rollups and range queries over them.
+
+Each computation appends one raw point per metric and folds it into the
+rollup bucket of every step in the same transaction. A series is read from
+the coarsest level that divides its step and still covers its start, and the
+step is capped at MAX_SERIES_POINTS buckets, so the rows read do not grow
+with the length of the range.
+"""
+import calendar
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from db.session import async_variant
+from models.metric import Metric
+from models.metric_history import MetricHistory, MetricRollup
+
+# Rollup level -> bucket width in seconds
+ROLLUP_STEPS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# Seconds each level is kept
+RETENTION = {
+    "raw": int(os.getenv("METRIC_HISTORY_RAW_HOURS", "24")) * 3600,
+    "1m": int(os.getenv("METRIC_HISTORY_1M_DAYS", "7")) * 86400,
+    "1h": int(os.getenv("METRIC_HISTORY_1H_DAYS", "90")) * 86400,
+    "1d": int(os.getenv("METRIC_HISTORY_1D_DAYS", "1825")) * 86400,
+}
+
+MAX_SERIES_POINTS = int(os.getenv("METRIC_SERIES_MAX_POINTS", "1000"))
+
+# Steps tried, finest first, when a series request gives none
+AUTO_STEPS = (60, 300, 900, 3600, 6 * 3600, 86400, 7 * 86400)
+
+# Levels from coarsest to finest; raw points divide any step
+LEVELS = (*sorted(ROLLUP_STEPS.items(), key=lambda level: -level[1]), ("raw", 1))
+
+DEFAULT_SERIES_RANGE = 24 * 3600
+
+_STEP_PATTERN = re.compile(r"^(\d+)([smhd]?)$")
+_STEP_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def record_metric_history(
+    db: Session, metric_ids: Iterable[int], ts: Optional[int] = None, only_changed: bool = False
+) -> int:
+    """Append the metrics' current values as points at `ts` and fold them into the rollups.
+
+    A metric already recorded at `ts` (two jobs in the same second) keeps its
+    first point and is not folded again, so every level holds the same
+    samples. With only_changed, metrics whose value equals their latest raw
+    point are left out. Runs in the caller's transaction, which commits it
+    with the values.
+    """
+    ts = int(time.time()) if ts is None else ts
+    db.flush()
+    values = db.execute(
+        select(Metric.id, Metric.value).where(Metric.id.in_(list(metric_ids)), Metric.value.isnot(None))
+    ).all()
+    if only_changed and values:
+        last = _latest_values(db, [metric_id for metric_id, _ in values])
+        values = [(metric_id, value) for metric_id, value in values if last.get(metric_id) != value]
+    if not values:
+        return 0
+
+    inserted = set(db.execute(
+        insert(MetricHistory).on_conflict_do_nothing(index_elements=["metric_id", "ts"]).returning(MetricHistory.metric_id),
+        [{"metric_id": metric_id, "ts": ts, "value": value} for metric_id, value in values],
+    ).scalars())
+    values = [(metric_id, value) for metric_id, value in values if metric_id in inserted]
+    if not values:
+        return 0
+
+    rollup = insert(MetricRollup)
+    db.execute(
+        rollup.on_conflict_do_update(
+            index_elements=["metric_id", "step", "bucket"],
+            set_={
+                "samples": MetricRollup.samples + 1,
+                "total": MetricRollup.total + rollup.excluded.total,
+                "minimum": case((rollup.excluded.minimum < MetricRollup.minimum, rollup.excluded.minimum), else_=MetricRollup.minimum),
+                "maximum": case((rollup.excluded.maximum > MetricRollup.maximum, rollup.excluded.maximum), else_=MetricRollup.maximum),
+            },
+        ),
+        [
+            {
+                "metric_id": metric_id, "step": step, "bucket": ts - ts % step,
+                "samples": 1, "total": value, "minimum": value, "maximum": value,
+            }
+            for metric_id, value in values
+            for step in ROLLUP_STEPS.values()
+        ],
+    )
+    return len(values)
+
+
+def _latest_values(db: Session, metric_ids) -> Dict[int, float]:
+    """Value of each metric's most recent raw point, for metrics that have one"""
+    latest = (
+        select(MetricHistory.metric_id, func.max(MetricHistory.ts).label("ts"))
+        .where(MetricHistory.metric_id.in_(metric_ids))
+        .group_by(MetricHistory.metric_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(MetricHistory.metric_id, MetricHistory.value).join(
+            latest, (MetricHistory.metric_id == latest.c.metric_id) & (MetricHistory.ts == latest.c.ts)
+        )
+    )
+    return dict(rows.all())
+
+
+def prune_metric_history(db: Session, now: Optional[int] = None) -> int:
+    """Delete points and buckets older than their level's retention"""
+    now = int(time.time()) if now is None else now
+    deleted = db.execute(delete(MetricHistory).where(MetricHistory.ts < now - RETENTION["raw"])).rowcount
+    for level, step in ROLLUP_STEPS.items():
+        deleted += db.execute(
+            delete(MetricRollup).where(MetricRollup.step == step, MetricRollup.bucket < now - RETENTION[level])
+        ).rowcount
+    db.commit()
+    return deleted
+
+
+def _epoch(value: datetime) -> int:
+    # Naive datetimes are taken as UTC
+    if value.tzinfo is None:
+        return calendar.timegm(value.timetuple())
+    return int(value.timestamp())
+
+
+def parse_step(step: str) -> int:
+    """Seconds in a step such as "300", "30s", "5m", "1h" or "1d" """
+    match = _STEP_PATTERN.match(step.strip())
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid step: {step}")
+    return int(match.group(1)) * _STEP_UNITS[match.group(2)]
+
+
+def _level(step: int, start: int, now: int) -> Optional[Tuple[str, int]]:
+    """Coarsest level whose buckets divide `step` and which still holds data at `start`"""
+    for level, size in LEVELS:
+        if step % size == 0 and start >= now - RETENTION[level]:
+            return level, size
+    return None
+
+
+def _series_step(span: int, start: int, now: int, step: Optional[str]) -> Tuple[int, str, int]:
+    if step is not None:
+        seconds = parse_step(step)
+        if -(-span // seconds) > MAX_SERIES_POINTS:
+            raise ValueError(f"Step {step} gives more than {MAX_SERIES_POINTS} points over this range")
+        # Past every retention only the coarsest dividing level can have data
+        level = _level(seconds, start, now) or next((level, size) for level, size in LEVELS if seconds % size == 0)
+        return (seconds, *level)
+    for seconds in AUTO_STEPS:
+        level = _level(seconds, start, now)
+        if level and -(-span // seconds) <= MAX_SERIES_POINTS:
+            return (seconds, *level)
+    days = -(-span // (MAX_SERIES_POINTS * 86400))
+    return days * 86400, "1d", 86400
+
+
+def get_metric_series(
+    db: Session,
+    metric_id: Optional[int] = None,
+    metric_name: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    step: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """A metric's values over [start, end) in buckets of `step`, or None if the metric does not exist.
+
+    The range is widened to whole buckets, so every level answers alike.
+    Defaults to the last 24 hours with a step picked to stay under
+    MAX_SERIES_POINTS buckets.
+    """
+    query = select(Metric.id, Metric.name)
+    query = query.where(Metric.id == metric_id) if metric_id is not None else query.where(Metric.name == metric_name)
+    metric = db.execute(query).first()
+    if not metric:
+        return None
+
+    now = int(time.time())
+    end_ts = _epoch(end) if end else now
+    start_ts = _epoch(start) if start else end_ts - DEFAULT_SERIES_RANGE
+    if end_ts <= start_ts:
+        raise ValueError("'from' must be before 'to'")
+    seconds, level, size = _series_step(end_ts - start_ts, start_ts, now, step)
+    first_bucket = start_ts - start_ts % seconds
+    end_ts = -(-end_ts // seconds) * seconds
+
+    if level == "raw":
+        bucket = MetricHistory.ts // seconds * seconds
+        rows = select(
+            bucket.label("bucket"), func.count(), func.sum(MetricHistory.value),
+            func.min(MetricHistory.value), func.max(MetricHistory.value),
+        ).where(MetricHistory.metric_id == metric.id, MetricHistory.ts >= first_bucket, MetricHistory.ts < end_ts)
+    else:
+        bucket = MetricRollup.bucket // seconds * seconds
+        rows = select(
+            bucket.label("bucket"), func.sum(MetricRollup.samples), func.sum(MetricRollup.total),
+            func.min(MetricRollup.minimum), func.max(MetricRollup.maximum),
+        ).where(
+            MetricRollup.metric_id == metric.id, MetricRollup.step == size,
+            MetricRollup.bucket >= first_bucket, MetricRollup.bucket < end_ts,
+        )
+    points = [
+        {
+            "ts": datetime.fromtimestamp(bucket_start, timezone.utc),
+            "value": total / samples,
+            "min": minimum,
+            "max": maximum,
+            "samples": samples,
+        }
+        for bucket_start, samples, total, minimum, maximum in db.execute(rows.group_by(bucket).order_by(bucket))
+    ]
+    return {
+        "metric_id": metric.id,
+        "name": metric.name,
+        "start": datetime.fromtimestamp(first_bucket, timezone.utc),
+        "end": datetime.fromtimestamp(end_ts, timezone.utc),
+        "step": seconds,
+        "level": level,
+        "points": points,
+    }
+
+
+# Async variants for `async def` endpoints
+get_metric_series_async = async_variant(get_metric_series)
@@ -0,0 +1,202 @@
+"""Background metric recomputes requested through the API.
+
+POST /metrics/calculate/all and /metrics/calculate/batch only create a
+metric_jobs row and return its id. The job then runs on a small thread pool:
+crud.metric.recalculate_metrics evaluates its metrics in groups and writes
+every value in a single transaction. Progress is committed to the job row
+from a second session as each group finishes, so GET /metrics/jobs/{id} is
+answered from the table by any worker.
+
+The pool lives in the worker process, so a restart or recycle loses its
+jobs. While a worker holds queued or running jobs it refreshes their
+heartbeat_at, and the scheduler fails jobs whose heartbeat went stale.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from crud.metric import recalculate_metrics
+from db.session import SessionLocal, async_variant
+from models.metric import Metric
+from models.metric_jobs import MetricJob
+
+logger = logging.getLogger(__name__)
+
+# Metric jobs run at the same time in this process
+METRIC_JOB_WORKERS = int(os.getenv("METRIC_JOB_WORKERS", "2"))
+
+# Metric errors kept on a job; later ones are only counted in failed
+MAX_REPORTED_ERRORS = 1000
+
+# Seconds between heartbeats of this process's jobs; a queued or running job
+# whose heartbeat is METRIC_JOB_STALE_BEATS beats old is taken as orphaned
+METRIC_JOB_HEARTBEAT_SECONDS = int(os.getenv("METRIC_JOB_HEARTBEAT_SECONDS", "30"))
+METRIC_JOB_STALE_BEATS = 4
+
+ORPHANED_MESSAGE = "The worker running this job stopped before it finished"
+
+_executor = ThreadPoolExecutor(max_workers=METRIC_JOB_WORKERS, thread_name_prefix="metric-job")
+
+# Jobs submitted to this process's pool and not finished yet
+_active: Set[int] = set()
+_active_lock = threading.Lock()
+_heartbeat: Optional[threading.Thread] = None
+
+
+def create_metric_job(
+    db: Session, kind: str, entity: Optional[str] = None, identifiers: Optional[List[str]] = None
+) -> MetricJob:
+    job = MetricJob(kind=kind, entity=entity, identifiers=identifiers, status="queued", errors=[], timings={})
+    db.add(job)
+    db.commit()
+    db.refresh(job)  # created_at is set by the database
+    return job
+
+
+def get_metric_job(db: Session, job_id: int) -> Optional[MetricJob]:
+    return db.query(MetricJob).filter(MetricJob.id == job_id).first()
+
+
+def submit_metric_job(job_id: int) -> None:
+    """Queue a created job on the pool"""
+    global _heartbeat
+    with _active_lock:
+        _active.add(job_id)
+        if _heartbeat is None:
+            _heartbeat = threading.Thread(target=_beat, name="metric-job-heartbeat", daemon=True)
+            _heartbeat.start()
+    _executor.submit(run_metric_job, job_id, time.perf_counter())
+
+
+def _beat() -> None:
+    """Refresh heartbeat_at of this process's jobs until none is left"""
+    global _heartbeat
+    while True:
+        time.sleep(METRIC_JOB_HEARTBEAT_SECONDS)
+        with _active_lock:
+            job_ids = list(_active)
+            if not job_ids:
+                _heartbeat = None
+                return
+        try:
+            with SessionLocal() as db:
+                db.query(MetricJob).filter(
+                    MetricJob.id.in_(job_ids), MetricJob.status.in_(("queued", "running"))
+                ).update({MetricJob.heartbeat_at: func.now()}, synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Metric job heartbeat failed: {e}")
+
+
+def fail_orphaned_metric_jobs(db: Session) -> int:
+    """Fail queued or running jobs whose worker stopped, e.g. after a restart or recycle"""
+    stale = timedelta(seconds=METRIC_JOB_HEARTBEAT_SECONDS * METRIC_JOB_STALE_BEATS)
+    # func.now() stores UTC on SQLite
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - stale
+    with _active_lock:
+        mine = set(_active)
+    jobs = db.query(MetricJob).filter(
+        MetricJob.status.in_(("queued", "running")),
+        func.coalesce(MetricJob.heartbeat_at, MetricJob.created_at) < cutoff,
+    ).all()
+    orphaned = [job for job in jobs if job.id not in mine]
+    for job in orphaned:
+        job.status, job.message, job.finished_at = "failed", ORPHANED_MESSAGE, func.now()
+    db.commit()
+    if orphaned:
+        logger.warning(f"Failed {len(orphaned)} orphaned metric jobs: {', '.join(str(job.id) for job in orphaned)}")
+    return len(orphaned)
+
+
+def _resolve(db: Session, job: MetricJob) -> Tuple[List[Metric], List[Dict[str, str]]]:
+    """The job's metrics, and an error for every identifier that names none"""
+    query = db.query(Metric).filter(Metric.entity.isnot(None))
+    if job.kind == "all":
+        if job.entity:
+            query = query.filter(Metric.entity == job.entity)
+        return [metric for metric in query.all() if metric.status != "disabled"], []
+
+    identifiers = job.identifiers or []
+    ids = [int(identifier) for identifier in identifiers if identifier.isdigit()]
+    found = query.filter(or_(Metric.id.in_(ids), Metric.name.in_(identifiers))).all()
+    by_identifier = {**{metric.name: metric for metric in found}, **{str(metric.id): metric for metric in found}}
+    metrics, errors, seen = [], [], set()
+    for identifier in identifiers:
+        metric = by_identifier.get(identifier)
+        if metric is None:
+            errors.append({"metric": identifier, "error": f"Metric {identifier} not found or has no entity"})
+        elif metric.id not in seen:
+            seen.add(metric.id)
+            metrics.append(metric)
+    return metrics, errors
+
+
+def run_metric_job(job_id: int, submitted: Optional[float] = None) -> None:
+    """Run a queued job to completion, recording progress, timings and per-metric errors on its row"""
+    try:
+        _run_metric_job(job_id, submitted)
+    finally:
+        with _active_lock:
+            _active.discard(job_id)
+
+
+def _run_metric_job(job_id: int, submitted: Optional[float]) -> None:
+    with SessionLocal() as progress_db, SessionLocal() as db:
+        job = get_metric_job(progress_db, job_id)
+        if not job or job.status != "queued":
+            return
+        start = time.perf_counter()
+        job.status, job.started_at = "running", func.now()
+        job.timings = {"queued_ms": round((start - submitted) * 1000, 1)} if submitted else {}
+        progress_db.commit()
+
+        try:
+            metrics, errors = _resolve(db, job)
+            job.total, job.failed, job.errors = len(metrics) + len(errors), len(errors), errors
+            progress_db.commit()
+
+            compute = {}
+            computed_at = time.perf_counter()
+
+            def progress(entity: str, results: Dict, elapsed: float) -> None:
+                nonlocal computed_at
+                failures = [
+                    {"metric": metric.name, "error": str(results[metric.id])}
+                    for metric in metrics
+                    if metric.id in results and isinstance(results[metric.id], Exception)
+                ]
+                job.calculated += len(results) - len(failures)
+                job.failed += len(failures)
+                if failures and len(job.errors) < MAX_REPORTED_ERRORS:
+                    job.errors = [*job.errors, *failures][:MAX_REPORTED_ERRORS]
+                # Time spent on the entity's groups; they may have run in parallel
+                compute[entity] = round(compute.get(entity, 0) + elapsed, 1)
+                job.timings = {**job.timings, "compute_ms": dict(compute)}
+                progress_db.commit()
+                computed_at = time.perf_counter()
+
+            recalculate_metrics(db, metrics, progress=progress)
+            write_ms = round((time.perf_counter() - computed_at) * 1000, 1)
+        except Exception as e:
+            db.rollback()
+            job.status, job.message = "failed", str(e)
+            logger.error(f"Metric job {job.id} failed: {e}")
+        else:
+            job.status = "completed"
+            job.timings = {**job.timings, "write_ms": write_ms}
+            logger.info(f"Metric job {job.id}: {job.calculated} metrics calculated, {job.failed} failed")
+        job.finished_at = func.now()
+        job.timings = {**job.timings, "total_ms": round((time.perf_counter() - start) * 1000, 1)}
+        progress_db.commit()
+
+
+# Async variants for `async def` endpoints
+create_metric_job_async = async_variant(create_metric_job)
+get_metric_job_async = async_variant(get_metric_job)
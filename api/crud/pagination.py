@@ -0,0 +1,148 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import and_, false, or_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column of a keyset ordering.
+
+    expression is what goes into ORDER BY / WHERE, path is where the value
+    lives on a fetched row (e.g. "id" or "performance.safety_rating").
+    NULLs of a nullable key sort first ascending and last descending.
+    """
+    expression: Any
+    path: str
+    descending: bool = False
+    nullable: bool = False
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the last row of a page"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, checking it matches the ordering"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def column_value(expression, value):
+    """Parse an ISO string back into the date or datetime a column compares against.
+
+    Cursors and query parameters carry dates as strings, which SQLite would
+    compare as text. Raises ValueError for a malformed date.
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        python_type = expression.type.python_type
+    except (AttributeError, NotImplementedError):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def _row_value(row, path: str):
+    root, *rest = path.split(".")
+    value = getattr(row, root)
+    for part in rest:
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _after_clause(keys: Sequence[SortKey], values: Sequence[Any]):
+    """WHERE clause selecting rows strictly after `values` in the key ordering.
+
+    Expands to (a > :a) OR (a = :a AND b > :b) ..., which handles mixed
+    directions and lets the planner use an index on the leading key.
+    """
+    clauses = []
+    for position, key in enumerate(keys):
+        equal = [_equal(keys[i], values[i]) for i in range(position)]
+        clauses.append(and_(*equal, _step(key, values[position])))
+    return or_(*clauses)
+
+
+def _equal(key: SortKey, value):
+    return key.expression.is_(None) if value is None else key.expression == value
+
+
+def _step(key: SortKey, value):
+    """Rows strictly after `value` on one key, NULLs counting as the smallest value"""
+    if value is None:
+        return false() if key.descending else key.expression.isnot(None)
+    if not key.descending:
+        return key.expression > value
+    if key.nullable:
+        return or_(key.expression < value, key.expression.is_(None))
+    return key.expression < value
+
+
+def _order(key: SortKey):
+    if key.descending:
+        return key.expression.desc().nulls_last() if key.nullable else key.expression.desc()
+    return key.expression.asc().nulls_first() if key.nullable else key.expression.asc()
+
+
+def keyset_query(query, keys: Sequence[SortKey], after: Optional[str] = None):
+    """Order by `keys` and resume strictly after the cursor"""
+    if after:
+        values = decode_cursor(after, len(keys))
+        try:
+            values = [column_value(key.expression, value) for key, value in zip(keys, values)]
+        except ValueError:
+            raise InvalidCursor("Invalid cursor")
+        query = query.filter(_after_clause(keys, values))
+    return query.order_by(*(_order(key) for key in keys))
+
+
+def fetch_page(query, keys: Sequence[SortKey], limit: Optional[int] = None) -> Page:
+    """Run a keyset-ordered query, building the cursor from the last row"""
+    if limit is None:
+        return Page(query.all(), None)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return Page(rows, None)
+    rows = rows[:limit]
+    return Page(rows, encode_cursor(_row_value(rows[-1], key.path) for key in keys))
+
+
+def paginate(query, keys: Sequence[SortKey], limit: Optional[int] = None, after: Optional[str] = None) -> Page:
+    """Keyset pagination: order by `keys` and resume strictly after the cursor.
+
+    The last key must be unique (normally the primary key) so the ordering is
+    total. Each page costs one indexed range scan, however deep it is; there
+    is no OFFSET. Without a limit every remaining row is returned.
+    """
+    return fetch_page(keyset_query(query, keys, after), keys, limit)
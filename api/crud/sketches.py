@@ -0,0 +1,160 @@
+"""Mergeable streaming sketches for distribution metrics.
+
+SQLite has no percentile functions, so percentile and histogram metrics
+stream their column through one of these in chunks. Memory is bounded by
+the sketch, not the table, and two sketches of the same kind merge into the
+sketch of both inputs, so partial results (per chunk, per worker, or a
+stored sketch plus new rows) can be combined.
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class TDigest:
+    """Merging t-digest (Dunning & Ertl) with the k1 scale function.
+
+    Keeps at most about `compression` centroids; quantile error is smallest
+    at the tails, which is where p95/p99 live.
+    """
+
+    def __init__(self, compression: float = 100):
+        self.compression = compression
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._centroids: List[Tuple[float, float]] = []  # (mean, weight), sorted by mean
+        self._buffer: List[Tuple[float, float]] = []
+        self._buffer_size = max(1000, int(10 * compression))
+
+    def update(self, values: Iterable[float]) -> "TDigest":
+        """Add unit-weight values"""
+        for value in values:
+            self._buffer.append((value, 1.0))
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+            if len(self._buffer) >= self._buffer_size:
+                self._compress()
+        return self
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest into this one"""
+        other._compress()
+        self._buffer.extend(other._centroids)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _k_to_q(self, k: float) -> float:
+        k = min(k, self.compression / 4)
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _q_to_k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        items = sorted(self._centroids + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in items)
+        merged = []
+        mean, weight = items[0]
+        before = 0.0
+        limit = self._k_to_q(self._q_to_k(0.0) + 1) * total
+        for next_mean, next_weight in items[1:]:
+            if before + weight + next_weight <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                merged.append((mean, weight))
+                before += weight
+                limit = self._k_to_q(self._q_to_k(min(before / total, 1.0)) + 1) * total
+                mean, weight = next_mean, next_weight
+        merged.append((mean, weight))
+        self._centroids = merged
+        self.count = total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q in [0, 1]; None when empty"""
+        self._compress()
+        centroids = self._centroids
+        if not centroids:
+            return None
+        if len(centroids) == 1 or q <= 0:
+            return centroids[0][0] if q > 0 else self.min
+        if q >= 1:
+            return self.max
+        index = q * self.count
+        # Each centroid's weight is centred on its mean; the ends reach min and max
+        first_mean, first_weight = centroids[0]
+        if index < first_weight / 2:
+            return self.min + (first_mean - self.min) * index / (first_weight / 2)
+        cumulative = first_weight / 2
+        for (left_mean, left_weight), (right_mean, right_weight) in zip(centroids, centroids[1:]):
+            step = (left_weight + right_weight) / 2
+            if index < cumulative + step:
+                return left_mean + (right_mean - left_mean) * (index - cumulative) / step
+            cumulative += step
+        last_mean, last_weight = centroids[-1]
+        remaining = self.count - cumulative
+        if remaining <= 0:
+            return self.max
+        return last_mean + (self.max - last_mean) * min((index - cumulative) / remaining, 1.0)
+
+
+class FixedHistogram:
+    """Counts over `bins` equal-width bins spanning [low, high]; values outside are counted apart"""
+
+    def __init__(self, low: float, high: float, bins: int = 10):
+        if bins < 1:
+            raise ValueError("Histogram needs at least one bin")
+        if not high > low:
+            high = low + 1  # a single distinct value still gets a bin
+        self.low, self.high, self.bins = low, high, bins
+        self.counts = [0] * bins
+        self.below = 0
+        self.above = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts) + self.below + self.above
+
+    def update(self, values: Iterable[float]) -> "FixedHistogram":
+        low, high, bins, counts = self.low, self.high, self.bins, self.counts
+        scale = bins / (high - low)
+        for value in values:
+            if value < low:
+                self.below += 1
+            elif value > high:
+                self.above += 1
+            else:
+                counts[min(int((value - low) * scale), bins - 1)] += 1
+        return self
+
+    def merge(self, other: "FixedHistogram") -> "FixedHistogram":
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Only histograms with the same bins can be merged")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.below += other.below
+        self.above += other.above
+        return self
+
+    def edges(self) -> List[float]:
+        width = (self.high - self.low) / self.bins
+        return [self.low + i * width for i in range(self.bins)] + [self.high]
+
+    def as_dict(self) -> Dict[str, int]:
+        """Bin label -> count, e.g. "[0, 0.1)"; the last bin includes `high`"""
+        edges = self.edges()
+        labels = {
+            f"[{edges[i]:g}, {edges[i + 1]:g}{']' if i == self.bins - 1 else ')'}": count
+            for i, count in enumerate(self.counts)
+        }
+        if self.below:
+            labels[f"< {self.low:g}"] = self.below
+        if self.above:
+            labels[f"> {self.high:g}"] = self.above
+        return labels
@@ -1,34 +1,45 @@
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Sequence, Union
+from sqlalchemy.orm import Session, selectinload
+from crud.bulk import bulk_create, bulk_delete, bulk_update
+from crud.fieldsets import query_fields
+from crud.listing import list_entities
+from crud.pagination import Page
+from crud.writes import insert_row, update_row
+from db.session import async_variant
+from models.maintenance import Maintenance
 from models.trucks import Truck
-from schemas.trucks import TruckCreate, TruckUpdate
+from schemas.bulk import BulkResult
+from schemas.trucks import TruckCreate, TruckPatch, TruckUpdate
 
-# GET all trucks
-def get_trucks(db: Session):
-    return db.query(Truck).all()
+def _include_options(include: Sequence[str]):
+    """Loader options for ?include=; children of a whole page come in one extra query"""
+    return [selectinload(Truck.maintenances)] if "maintenances" in include else []
+
+# GET all trucks, one keyset page at a time
+def get_trucks(
+    db: Session,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    filters: Optional[List[Dict]] = None,
+    sort: Optional[str] = None,
+    include: Sequence[str] = (),
+) -> Page:
+    return list_entities(
+        db, Truck, limit=limit, after=after, fields=fields, filters=filters, sort=sort, options=_include_options(include)
+    )
 
 # GET one truck by ID
-def get_truck(db: Session, truck_id: int):
-    return db.query(Truck).filter(Truck.id == truck_id).first()
+def get_truck(db: Session, truck_id: int, fields: Optional[Sequence[str]] = None, include: Sequence[str] = ()):
+    return query_fields(db, Truck, fields, _include_options(include)).filter(Truck.id == truck_id).first()
 
 # POST: Create new truck
 def create_truck(db: Session, truck: TruckCreate):
-    print('test')
-    db_truck = Truck(**truck.model_dump())
-    print('test')
-    db.add(db_truck)
-    db.commit()
-    db.refresh(db_truck)
-    return db_truck
-
-# PUT: Update truck by ID
-def update_truck(db: Session, truck_id: int, updated: TruckUpdate):
-    db_truck = db.query(Truck).filter(Truck.id == truck_id).first()
-    if db_truck:
-        for key, value in updated.model_dump().items():
-            setattr(db_truck, key, value)
-        db.commit()
-        db.refresh(db_truck)
-    return db_truck
+    return insert_row(db, Truck, truck.model_dump())
+
+# PUT/PATCH: Update truck by ID, writing only the fields sent
+def update_truck(db: Session, truck_id: int, updated: Union[TruckUpdate, TruckPatch]):
+    return update_row(db, Truck, truck_id, updated.model_dump(exclude_unset=True))
 
 # DELETE: Remove truck
 def delete_truck(db: Session, truck_id: int):
@@ -45,3 +56,25 @@ def delete_truck(db: Session, truck_id: int):
     except Exception as err:
         print("[xx] sampiss", err)
         raise
+
+
+# Bulk writes: each list is validated per item and written in one transaction
+def bulk_create_trucks(db: Session, items: List[Dict]) -> BulkResult:
+    return bulk_create(db, Truck, TruckCreate, items)
+
+def bulk_update_trucks(db: Session, items: List[Dict]) -> BulkResult:
+    return bulk_update(db, Truck, TruckUpdate, items)
+
+def bulk_delete_trucks(db: Session, ids: List[int]) -> BulkResult:
+    return bulk_delete(db, Truck, ids, children=[Maintenance.truck_id])
+
+
+# Async variants for `async def` endpoints
+get_trucks_async = async_variant(get_trucks)
+get_truck_async = async_variant(get_truck)
+create_truck_async = async_variant(create_truck)
+update_truck_async = async_variant(update_truck)
+delete_truck_async = async_variant(delete_truck)
+bulk_create_trucks_async = async_variant(bulk_create_trucks)
+bulk_update_trucks_async = async_variant(bulk_update_trucks)
+bulk_delete_trucks_async = async_variant(bulk_delete_trucks)
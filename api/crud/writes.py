@@ -0,0 +1,38 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+
+def row_values(entity_model, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for an INSERT/UPDATE statement, including derived columns"""
+    return {**values, **entity_model.derived_values(values)}
+
+
+def insert_row(db: Session, entity_model, values: Dict[str, Any]):
+    """INSERT ... RETURNING the new row, in one round trip instead of add/commit/refresh"""
+    statement = insert(entity_model).values(row_values(entity_model, values))
+    row = db.execute(statement.returning(*entity_model.__table__.columns)).one()
+    db.commit()
+    return row
+
+
+def update_row(db: Session, entity_model, entity_id: int, values: Dict[str, Any]) -> Optional[Any]:
+    """UPDATE ... RETURNING touching only the columns in `values`; None when the row is missing.
+
+    The returned Row has the same attributes as the entity, so it serializes
+    with the entity's Out schema.
+    """
+    columns = entity_model.__table__.columns
+    if not values:
+        return db.execute(select(*columns).where(entity_model.id == entity_id)).one_or_none()
+    statement = (
+        update(entity_model)
+        .where(entity_model.id == entity_id)
+        .values(row_values(entity_model, values))
+        .returning(*columns)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(statement).one_or_none()
+    db.commit()
+    return row
@@ -0,0 +1,89 @@
+"""Read-only, time-limited execution of user-supplied SQL (custom metrics).
+
+Queries run on a dedicated SQLite connection per thread and database file,
+opened with mode=ro and PRAGMA query_only, and an authorizer that only allows
+reads. A progress handler aborts a query once its time budget is spent, and
+at most max_rows rows are fetched. In WAL mode a reader never blocks writers,
+so a slow custom query cannot hold up the API's writes.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+from urllib.parse import quote
+
+CUSTOM_METRIC_TIMEOUT_MS = int(os.getenv("CUSTOM_METRIC_TIMEOUT_MS", "2000"))
+CUSTOM_METRIC_MAX_ROWS = int(os.getenv("CUSTOM_METRIC_MAX_ROWS", "1000"))
+
+# SQLite VM instructions between two deadline checks
+PROGRESS_STEPS = 10000
+
+# Authorizer actions a read-only query needs; everything else (writes,
+# PRAGMA, ATTACH, ...) is denied at prepare time
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+_local = threading.local()
+
+
+class SandboxError(ValueError):
+    """A sandboxed query was rejected or failed"""
+
+
+class SandboxTimeout(SandboxError):
+    """A sandboxed query ran past its time budget"""
+
+
+def _authorize(action, *args):
+    return sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def _connection(path: str) -> sqlite3.Connection:
+    connections = _local.__dict__.setdefault("connections", {})
+    connection = connections.get(path)
+    if connection is None:
+        connection = sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=ro", uri=True)
+        connection.execute("PRAGMA query_only=ON")
+        connection.set_authorizer(_authorize)
+        connections[path] = connection
+    return connection
+
+
+def sandbox_path(url) -> Optional[str]:
+    """Database file behind a SQLAlchemy URL, or None when it cannot be opened separately"""
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    if url.query.get("uri") and url.database.startswith("file:"):
+        return url.database[len("file:"):]  # e.g. the read-only engines of db/session.py
+    return url.database
+
+
+def run_readonly(
+    path: str,
+    sql: str,
+    timeout_ms: int = CUSTOM_METRIC_TIMEOUT_MS,
+    max_rows: int = CUSTOM_METRIC_MAX_ROWS,
+) -> Tuple[List[Tuple[Any, ...]], float]:
+    """Rows of one read-only statement on the database at `path`, and its runtime in ms"""
+    connection = _connection(path)
+    deadline = time.monotonic() + timeout_ms / 1000
+    connection.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+    start = time.perf_counter()
+    cursor = None
+    try:
+        cursor = connection.execute(sql)
+        rows = cursor.fetchmany(max_rows + 1)
+    except sqlite3.OperationalError as e:
+        if str(e) == "interrupted":
+            raise SandboxTimeout(f"Query exceeded its {timeout_ms} ms budget") from e
+        raise SandboxError(str(e)) from e
+    except (sqlite3.DatabaseError, sqlite3.ProgrammingError, sqlite3.Warning) as e:
+        raise SandboxError(str(e)) from e
+    finally:
+        if cursor is not None:
+            cursor.close()
+        connection.set_progress_handler(None, 0)
+    elapsed = (time.perf_counter() - start) * 1000
+    if len(rows) > max_rows:
+        raise SandboxError(f"Query returned more than {max_rows} rows")
+    return rows, elapsed
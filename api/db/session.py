@@ -1,18 +1,156 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import functools
+import os
+import orjson
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from db.versions import track_table_versions
+
+SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL", "sqlite:///./truckfleet.db")
+
+# Pool sizing, overridable per deployment (e.g. one pool per gunicorn worker)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# SQLite storage profile: WAL lets readers keep going while the metrics
+# scheduler writes, synchronous=NORMAL is durable enough in WAL mode
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB, i.e. 64 MiB
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),  # ms
+    "temp_store": "MEMORY",
+}
+
+IS_SQLITE = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "sqlite"
+
+# table_versions is only bumped on SQLite (the bump SQL is SQLite's); elsewhere
+# nothing may rely on it, e.g. the ETag cache or the change-aware metric job
+TRACK_TABLE_VERSIONS = IS_SQLITE
+
+# Async drivers for the backends we deploy on
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def _async_url(url: str) -> str:
+    """Derive the async driver URL from the sync one (sqlite -> sqlite+aiosqlite)"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if not driver:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+SQLALCHEMY_ASYNC_DATABASE_URL = os.getenv("SQLALCHEMY_ASYNC_DATABASE_URL", _async_url(SQLALCHEMY_DATABASE_URL))
+
+
+def _engine_options(url: str) -> dict:
+    """Engine options for the given URL; in-memory SQLite keeps SQLAlchemy's default pool"""
+    # JSON columns (driver details, job stops) are decoded with orjson
+    options = {"json_deserializer": orjson.loads}
+    if IS_SQLITE and make_url(url).database in (None, "", ":memory:"):
+        return options
+    return {
+        **options,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """Apply the SQLite storage profile to a freshly opened DBAPI connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./truckfleet.db"
 
 # Create engine with optimized connection pooling
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
+    **_engine_options(SQLALCHEMY_DATABASE_URL),
 )
 
+if IS_SQLITE:
+    event.listen(engine, "connect", set_sqlite_pragmas)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for `async def` endpoints; shares the storage profile with the sync engine
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    **_engine_options(SQLALCHEMY_ASYNC_DATABASE_URL),
+)
+
+if IS_SQLITE:
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
+if TRACK_TABLE_VERSIONS:
+    # Write counters behind the ETag response cache (endpoints/response_cache.py)
+    track_table_versions(engine)
+    track_table_versions(async_engine.sync_engine)
+
+# expire_on_commit=False: attributes must stay loaded after commit, since lazy
+# refreshes cannot run once the response is being serialized
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Read-only engines per SQLite file, for the parallel metric workers (crud/metric.py)
+_read_only_engines = {}
+
+
+def set_read_only_pragmas(dbapi_connection, connection_record=None):
+    """The read side of the storage profile, and no writes on this connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in ("mmap_size", "cache_size", "busy_timeout", "temp_store"):
+            cursor.execute(f"PRAGMA {pragma}={SQLITE_PRAGMAS[pragma]}")
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def read_only_session(database: str) -> Session:
+    """A session on a read-only (mode=ro) connection to the SQLite file `database`"""
+    engine = _read_only_engines.get(database)
+    if engine is None:
+        url = f"sqlite:///file:{os.path.abspath(database)}?mode=ro&uri=true"
+        engine = create_engine(url, **_engine_options(url))
+        event.listen(engine, "connect", set_read_only_pragmas)
+        engine = _read_only_engines.setdefault(database, engine)
+    return Session(bind=engine, autoflush=False)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def async_variant(func):
+    """Expose a sync CRUD function to AsyncSession callers.
+
+    The function runs through AsyncSession.run_sync, so every statement goes
+    through the async driver and the event loop is free while SQLite works.
+    """
+    @functools.wraps(func)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(func, *args, **kwargs)
+    wrapper.__name__ = f"{func.__name__}_async"
+    wrapper.__qualname__ = wrapper.__name__
+    return wrapper
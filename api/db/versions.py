@@ -0,0 +1,80 @@
+"""Per-table write counters for cache validation.
+
+Every INSERT/UPDATE/DELETE that goes through one of our engines, whether it
+comes from an ORM flush, an ORM bulk statement or Core, records its table on
+the connection. On commit, the matching table_versions rows are bumped in
+that same transaction, so every worker process sees one consistent version.
+Rolled-back writes leave the versions alone.
+"""
+import logging
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.sql.dml import UpdateBase
+
+from models.table_versions import TableVersion
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_TABLE = TableVersion.__tablename__
+
+_BUMP_SQL = (
+    "INSERT INTO table_versions (table_name, version, updated_at) VALUES (?, 1, CURRENT_TIMESTAMP) "
+    "ON CONFLICT(table_name) DO UPDATE SET version = version + 1, updated_at = CURRENT_TIMESTAMP"
+)
+
+# Called with the set of changed table names after they are bumped
+_listeners: List[Callable[[Set[str]], None]] = []
+
+
+def on_tables_changed(callback: Callable[[Set[str]], None]):
+    """Register a callback for committed writes made in this process"""
+    _listeners.append(callback)
+    return callback
+
+
+def _record_write(conn, clauseelement, multiparams, params, execution_options, result):
+    if isinstance(clauseelement, UpdateBase):
+        name = getattr(clauseelement.table, "name", None)
+        if name and name != VERSIONS_TABLE:
+            conn.info.setdefault("changed_tables", set()).add(name)
+
+
+def _bump_versions(conn):
+    changed = conn.info.pop("changed_tables", None)
+    if not changed:
+        return
+    # Raw DBAPI cursor: still inside the transaction being committed, and
+    # invisible to the after_execute hook above
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.executemany(_BUMP_SQL, [(name,) for name in sorted(changed)])
+    finally:
+        cursor.close()
+    for callback in _listeners:
+        try:
+            callback(changed)
+        except Exception as e:
+            logger.error(f"Table change listener failed: {e}")
+
+
+def _discard_writes(conn):
+    conn.info.pop("changed_tables", None)
+
+
+def track_table_versions(engine):
+    """Bump table_versions for every committed write made through `engine` (a sync Engine)"""
+    event.listen(engine, "after_execute", _record_write)
+    event.listen(engine, "commit", _bump_versions)
+    event.listen(engine, "rollback", _discard_writes)
+
+
+def versions_query(tables: Iterable[str]):
+    return select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at).where(
+        TableVersion.table_name.in_(tuple(tables))
+    )
+
+
+def version_map(rows) -> Dict[str, Tuple[int, object]]:
+    """table -> (version, updated_at); tables never written since the table existed are absent"""
+    return {row.table_name: (row.version, row.updated_at) for row in rows}
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.dashboard import get_dashboard_async
+from db.session import get_async_db
+from schemas.dashboard import DashboardOut
+
+dashboard_router = APIRouter()
+
+
+# GET /dashboard - Everything the dashboard page shows, in one response
+@dashboard_router.get("/", response_model=DashboardOut)
+async def read_dashboard(db: AsyncSession = Depends(get_async_db)):
+    """Card values, chart series and alerts, aggregated server-side.
+
+    Counts come from the stored metrics where they exist and from grouped
+    aggregate queries otherwise; lists are capped, so the response size does
+    not depend on the size of the fleet.
+    """
+    return await get_dashboard_async(db)
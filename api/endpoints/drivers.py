@@ -1,30 +1,74 @@
 import asyncio
 import time
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from schemas.drivers import DriverCreate, DriverUpdate, DriverOut
+from typing import Any, Dict, List, Optional, Tuple
+from schemas.drivers import DriverCreate, DriverPatch, DriverUpdate, DriverOut
 import crud.drivers as crud_drivers
-from db.session import get_db
+from crud.filters import InvalidFilter
+from crud.pagination import NEXT_CURSOR_HEADER, InvalidCursor
+from db.session import get_async_db, get_db
+from endpoints.params import bulk_ids, bulk_items, fields_param, filters_param, sort_param
+from endpoints.responses import row_response, rows_response
+from schemas.bulk import BulkResult
 
 
 driver_router = APIRouter()
 
 @driver_router.get("/", response_model=List[DriverOut])
-async def read_driver(db: Session = Depends(get_db)):
+async def read_drivers(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit to return every driver"),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    fields: Tuple[str, ...] = Depends(fields_param(DriverOut)),
+    filters: Optional[List[Dict]] = Depends(filters_param),
+    sort: Optional[str] = Depends(sort_param),
+    db: AsyncSession = Depends(get_async_db),
+):
     try:
-        drivers = crud_drivers.get_drivers(db)
+        page = await crud_drivers.get_drivers_async(db, limit=limit, after=after, fields=fields, filters=filters, sort=sort)
+    except (InvalidCursor, InvalidFilter) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    return drivers
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    return rows_response(request, DriverOut, fields, page.items, headers)
+
+# Bulk routes are registered before /{id} so "bulk" is not read as an ID
+@driver_router.post("/bulk", response_model=BulkResult)
+def bulk_create_drivers(items: List[Dict[str, Any]] = Depends(bulk_items), db: Session = Depends(get_db)):
+    try:
+        return crud_drivers.bulk_create_drivers(db, items)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@driver_router.patch("/bulk", response_model=BulkResult)
+def bulk_update_drivers(items: List[Dict[str, Any]] = Depends(bulk_items), db: Session = Depends(get_db)):
+    try:
+        return crud_drivers.bulk_update_drivers(db, items)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@driver_router.delete("/bulk", response_model=BulkResult)
+def bulk_delete_drivers(ids: List[int] = Depends(bulk_ids), db: Session = Depends(get_db)):
+    try:
+        return crud_drivers.bulk_delete_drivers(db, ids)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @driver_router.get("/{driver_id}", response_model=DriverOut)
-def read_driver(driver_id: str, db: Session = Depends(get_db)):
+def read_driver(
+    driver_id: str,
+    request: Request,
+    fields: Tuple[str, ...] = Depends(fields_param(DriverOut)),
+    db: Session = Depends(get_db),
+):
     try:
-        driver = crud_drivers.get_driver(db, driver_id)
+        driver = crud_drivers.get_driver(db, driver_id, fields=fields)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    return driver
+    return row_response(request, DriverOut, fields, driver)
 
 @driver_router.post("/", response_model=DriverOut)
 def create_driver(driver: DriverCreate, db: Session = Depends(get_db)):
@@ -33,7 +77,13 @@ def create_driver(driver: DriverCreate, db: Session = Depends(get_db)):
 @driver_router.put("/{driver_id}", response_model=DriverOut)
 def update_driver(driver_id: str, driver: DriverUpdate, db: Session = Depends(get_db)):
     updated = crud_drivers.update_driver(db, driver_id, driver)
-    print('testsssssssssssssssssssssssssssssssssssssssssssssssssssss')
+    if not updated:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return updated
+
+@driver_router.patch("/{driver_id}", response_model=DriverOut)
+def patch_driver(driver_id: int, driver: DriverPatch, db: Session = Depends(get_db)):
+    updated = crud_drivers.update_driver(db, driver_id, driver)
     if not updated:
         raise HTTPException(status_code=404, detail="Driver not found")
     return updated
@@ -0,0 +1,39 @@
+from typing import Dict, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from crud.export import EXPORTS, csv_chunks, export_statement, ndjson_chunks
+from crud.filters import InvalidFilter
+from endpoints.params import filters_param, parse_fields, sort_param
+
+export_router = APIRouter()
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+# GET /export/{entity} - Stream a whole table without loading it into memory
+@export_router.get("/{entity}", response_class=StreamingResponse)
+def export_entity(
+    entity: Literal["trucks", "drivers", "jobs", "maintenance"],
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="ndjson: one JSON object per line; csv: header row first"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export"),
+    filters: Optional[List[Dict]] = Depends(filters_param),
+    sort: Optional[str] = Depends(sort_param),
+):
+    """Stream every matching row as NDJSON or CSV.
+
+    Takes the same filter and sort parameters as the list endpoints. Rows are
+    read from a server-side cursor in batches, so memory use does not grow
+    with the table.
+    """
+    entity_model, schema = EXPORTS[entity]
+    try:
+        statement = export_statement(entity_model, schema, parse_fields(schema, fields), filters, sort)
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    chunks = csv_chunks(statement) if format == "csv" else ndjson_chunks(statement)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'},
+    )
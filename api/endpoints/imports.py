@@ -0,0 +1,58 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+
+import crud.imports as crud_imports
+from db.session import get_db
+from schemas.imports import ImportRunOut
+
+import_router = APIRouter()
+
+
+def _format(filename: Optional[str], format: Optional[str]) -> str:
+    if format:
+        return format
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    if extension == "csv":
+        return "csv"
+    raise HTTPException(status_code=400, detail="Cannot tell the file format, pass ?format=csv or ?format=ndjson")
+
+
+# POST /imports/{entity} - Load a CSV/NDJSON file in batched transactions
+@import_router.post("/{entity}", response_model=ImportRunOut)
+def import_file(
+    entity: Literal["trucks", "drivers", "jobs", "maintenance"],
+    file: UploadFile = File(..., description="CSV with a header row, or one JSON object per line"),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults to the file extension"),
+    resume: Optional[int] = Query(None, description="ID of a failed import of the same file to continue"),
+    batch_size: int = Query(crud_imports.IMPORT_BATCH_SIZE, ge=1, le=10000, description="Rows per transaction"),
+    db: Session = Depends(get_db),
+):
+    """Validate every row against the entity's Create schema and insert the valid ones.
+
+    Invalid rows are reported on the returned run and do not stop the import.
+    Each batch commits together with the run's checkpoint, so after a failure
+    the same file can be sent again with ?resume= to skip what is committed.
+    """
+    file_format = _format(file.filename, format)
+    if resume:
+        if not crud_imports.get_import(db, resume):
+            raise HTTPException(status_code=404, detail="Import not found")
+        try:
+            run = crud_imports.resume_import(db, resume, entity)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+    else:
+        run = crud_imports.create_import(db, entity, file_format, file.filename)
+    records = crud_imports.read_records(file.file, file_format)
+    return crud_imports.run_import(db, run, records, batch_size=batch_size)
+
+# GET /imports/{import_id} - Progress and row error report of an import
+@import_router.get("/{import_id}", response_model=ImportRunOut)
+def read_import(import_id: int, db: Session = Depends(get_db)):
+    run = crud_imports.get_import(db, import_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return run
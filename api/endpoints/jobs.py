@@ -1,24 +1,69 @@
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from schemas.jobs import JobCreate, JobUpdate, JobOut
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Any, Dict, List, Optional, Tuple
+from schemas.jobs import JobCreate, JobPatch, JobUpdate, JobOut
 import crud.jobs as crud_jobs
+from crud.filters import InvalidFilter
+from crud.pagination import NEXT_CURSOR_HEADER, InvalidCursor
 from db.session import get_db
+from endpoints.params import bulk_ids, bulk_items, fields_param, filters_param, sort_param
+from endpoints.responses import row_response, rows_response
+from schemas.bulk import BulkResult
 from sqlalchemy.orm import Session
 
 
 job_router = APIRouter()
 
 @job_router.get("/", response_model=List[JobOut])
-def read_jobs(db: Session = Depends(get_db)):
-    return crud_jobs.get_jobs(db)
+def read_jobs(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit to return every job"),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    fields: Tuple[str, ...] = Depends(fields_param(JobOut)),
+    filters: Optional[List[Dict]] = Depends(filters_param),
+    sort: Optional[str] = Depends(sort_param),
+    db: Session = Depends(get_db),
+):
+    try:
+        page = crud_jobs.get_jobs(db, limit=limit, after=after, fields=fields, filters=filters, sort=sort)
+    except (InvalidCursor, InvalidFilter) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    return rows_response(request, JobOut, fields, page.items, headers)
+
+# Bulk routes are registered before /{id} so "bulk" is not read as an ID
+@job_router.post("/bulk", response_model=BulkResult)
+def bulk_create_jobs(items: List[Dict[str, Any]] = Depends(bulk_items), db: Session = Depends(get_db)):
+    try:
+        return crud_jobs.bulk_create_jobs(db, items)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@job_router.patch("/bulk", response_model=BulkResult)
+def bulk_update_jobs(items: List[Dict[str, Any]] = Depends(bulk_items), db: Session = Depends(get_db)):
+    try:
+        return crud_jobs.bulk_update_jobs(db, items)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@job_router.delete("/bulk", response_model=BulkResult)
+def bulk_delete_jobs(ids: List[int] = Depends(bulk_ids), db: Session = Depends(get_db)):
+    try:
+        return crud_jobs.bulk_delete_jobs(db, ids)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @job_router.get("/{job_id}", response_model=JobOut)
-def read_job(job_id: int, db: Session = Depends(get_db)):
-    job = crud_jobs.get_job(db, job_id)
+def read_job(
+    job_id: int,
+    request: Request,
+    fields: Tuple[str, ...] = Depends(fields_param(JobOut)),
+    db: Session = Depends(get_db),
+):
+    job = crud_jobs.get_job(db, job_id, fields=fields)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    return row_response(request, JobOut, fields, job)
 
 @job_router.post("/", response_model=JobOut)
 def create_job(job: JobCreate, db: Session = Depends(get_db)):
@@ -31,6 +76,13 @@ def update_job(job_id: int, job: JobUpdate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Job not found")
     return updated
 
+@job_router.patch("/{job_id}", response_model=JobOut)
+def patch_job(job_id: int, job: JobPatch, db: Session = Depends(get_db)):
+    updated = crud_jobs.update_job(db, job_id, job)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return updated
+
 @job_router.delete("/{job_id}")
 def delete_job(job_id: int, db: Session = Depends(get_db)):
     deleted = crud_jobs.delete_job(db, job_id)
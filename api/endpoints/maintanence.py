@@ -1,33 +1,94 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from db.session import get_db
+from endpoints.params import bulk_ids, bulk_items, fields_param, filters_param, sort_param
+from endpoints.responses import row_response, rows_response
+from schemas.bulk import BulkResult
 from models import maintenance as Maintenance
-from schemas.maintenance import MaintenanceCreate, MaintenanceOut, MaintenanceUpdate
+from schemas.maintenance import MaintenanceCreate, MaintenanceOut, MaintenancePatch, MaintenanceUpdate
 from sqlalchemy.orm import Session
 import crud.maintenance as crud_maintenance
+from crud.filters import InvalidFilter
+from crud.filters import InvalidFilter
+from crud.pagination import NEXT_CURSOR_HEADER, InvalidCursor
 
 maintenance_router = APIRouter()
 
 # Get all maintenances
 @maintenance_router.get("/", response_model=List[MaintenanceOut])
-def read_maintenances(db: Session = Depends(get_db)):
-    return crud_maintenance.get_maintenances(db)
+def read_maintenances(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    fields: Tuple[str, ...] = Depends(fields_param(MaintenanceOut)),
+    filters: Optional[List[Dict]] = Depends(filters_param),
+    sort: Optional[str] = Depends(sort_param),
+    db: Session = Depends(get_db),
+):
+    try:
+        page = crud_maintenance.get_maintenances(db, limit=limit, after=after, fields=fields, filters=filters, sort=sort)
+    except (InvalidCursor, InvalidFilter) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    return rows_response(request, MaintenanceOut, fields, page.items, headers)
+
+# Bulk routes are registered before /{id} so "bulk" is not read as an ID
+@maintenance_router.post("/bulk", response_model=BulkResult)
+def bulk_create_maintenances(items: List[Dict[str, Any]] = Depends(bulk_items), db: Session = Depends(get_db)):
+    try:
+        return crud_maintenance.bulk_create_maintenances(db, items)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@maintenance_router.patch("/bulk", response_model=BulkResult)
+def bulk_update_maintenances(items: List[Dict[str, Any]] = Depends(bulk_items), db: Session = Depends(get_db)):
+    try:
+        return crud_maintenance.bulk_update_maintenances(db, items)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@maintenance_router.delete("/bulk", response_model=BulkResult)
+def bulk_delete_maintenances(ids: List[int] = Depends(bulk_ids), db: Session = Depends(get_db)):
+    try:
+        return crud_maintenance.bulk_delete_maintenances(db, ids)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 # Get all maintenances for a specific truck
 @maintenance_router.get("/truck/{truck_id}", response_model=List[MaintenanceOut])
-def read_truck_maintenances(truck_id: int, limit: int = 100, db: Session = Depends(get_db)):
-    maintenances = crud_maintenance.get_maintenances(db, truck_id, limit=limit)
-    if not maintenances:
+def read_truck_maintenances(
+    truck_id: int,
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    fields: Tuple[str, ...] = Depends(fields_param(MaintenanceOut)),
+    filters: Optional[List[Dict]] = Depends(filters_param),
+    sort: Optional[str] = Depends(sort_param),
+    db: Session = Depends(get_db),
+):
+    try:
+        page = crud_maintenance.get_maintenances(db, truck_id, limit=limit, after=after, fields=fields, filters=filters, sort=sort)
+    except (InvalidCursor, InvalidFilter) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not page.items:
         raise HTTPException(status_code=404, detail="No maintenances found for this truck")
-    return maintenances
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    return rows_response(request, MaintenanceOut, fields, page.items, headers)
 
 # Get a single maintenance by ID
 @maintenance_router.get("/{maintenance_id}", response_model=MaintenanceOut)
-def read_maintenance(maintenance_id: int, db: Session = Depends(get_db)):
-    maintenance = crud_maintenance.get_maintenance(db, maintenance_id)
+def read_maintenance(
+    maintenance_id: int,
+    request: Request,
+    fields: Tuple[str, ...] = Depends(fields_param(MaintenanceOut)),
+    db: Session = Depends(get_db),
+):
+    maintenance = crud_maintenance.get_maintenance(db, maintenance_id, fields=fields)
     if not maintenance:
         raise HTTPException(status_code=404, detail="Maintenance not found")
-    return maintenance
+    return row_response(request, MaintenanceOut, fields, maintenance)
 
 # Create a new maintenance
 @maintenance_router.post("/", response_model=MaintenanceOut)
@@ -40,10 +101,21 @@ def create_maintenance_endpoint(maintenance: MaintenanceCreate, db: Session = De
 # Update a maintenance by ID
 @maintenance_router.put("/{maintenance_id}", response_model=MaintenanceOut)
 def update_maintenance_endpoint(maintenance_id: int, maintenance: MaintenanceUpdate, db: Session = Depends(get_db)):
-    db_maintenance = crud_maintenance.get_maintenance(db, maintenance_id)
+    return _update_maintenance(db, maintenance_id, maintenance)
+
+# Update only the fields sent
+@maintenance_router.patch("/{maintenance_id}", response_model=MaintenanceOut)
+def patch_maintenance_endpoint(maintenance_id: int, maintenance: MaintenancePatch, db: Session = Depends(get_db)):
+    return _update_maintenance(db, maintenance_id, maintenance)
+
+def _update_maintenance(db: Session, maintenance_id: int, maintenance):
+    try:
+        db_maintenance = crud_maintenance.update_maintenance(db, maintenance_id, maintenance)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not db_maintenance:
         raise HTTPException(status_code=404, detail="Maintenance not found")
-    return crud_maintenance.update_maintenance(db, maintenance_id, maintenance)
+    return db_maintenance
 
 # Delete a maintenance by ID
 @maintenance_router.delete("/{maintenance_id}", response_model=MaintenanceOut)
@@ -1,22 +1,22 @@
 # routes/metrics.py
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
-from db.session import get_db
-from schemas.metric import MetricCreate, MetricUpdate, MetricOut
+from db.session import get_async_db
+from schemas.metric import MetricCreate, MetricUpdate, MetricOut, MetricSeriesOut, MetricJobOut
+from crud.metric_jobs import create_metric_job_async, get_metric_job_async, submit_metric_job
+from crud.metric_history import get_metric_series_async
 from crud.metric import (
-    add_metric,
-    get_metric,
-    get_all_metrics,
-    update_metric,
-    delete_metric,
-    calculate_metric_value,
-    calculate_all_metrics,
-    bulk_create_metrics,
-    get_metric_statistics,
-
+    add_metric_async,
+    get_metric_async,
+    get_all_metrics_async,
+    update_metric_async,
+    delete_metric_async,
+    calculate_metric_value_async,
+    bulk_create_metrics_async,
+    get_metric_statistics_async,
 )
 
 router = APIRouter()
@@ -24,18 +24,18 @@ router = APIRouter()
 @router.post("/", response_model=MetricOut)
 async def create_metric(
     metric: MetricCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new metric. calculation_config can be used to define filters, fields, or custom SQL for the metric calculation."""
-    return add_metric(db, metric)
+    return await add_metric_async(db, metric)
 
 @router.post("/bulk", response_model=List[MetricOut])
 async def create_metrics_bulk(
     metrics: List[MetricCreate],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create multiple metrics at once. Each metric can have its own calculation_config for property-based or config-driven metrics."""
-    return bulk_create_metrics(db, metrics)
+    return await bulk_create_metrics_async(db, metrics)
 
 @router.get("/", response_model=List[MetricOut])
 async def list_metrics(
@@ -43,58 +43,90 @@ async def list_metrics(
     metric_type: Optional[str] = Query(None, description="Filter by metric type"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all metrics with optional filtering"""
-    return get_all_metrics(db, entity=entity, metric_type=metric_type, skip=skip, limit=limit)
+    return await get_all_metrics_async(db, entity=entity, metric_type=metric_type, skip=skip, limit=limit)
 
 @router.get("/statistics", response_model=Dict[str, Any])
 async def get_metrics_statistics(
     entity: Optional[str] = Query(None, description="Filter by entity"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get metrics statistics"""
-    return get_metric_statistics(db, entity=entity)
+    return await get_metric_statistics_async(db, entity=entity)
+
+@router.get("/jobs/{job_id}", response_model=MetricJobOut)
+async def get_metric_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Progress, timings and per-metric errors of a calculation job"""
+    job = await get_metric_job_async(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Metric job not found")
+    return job
 
 @router.get("/{metric_identifier}", response_model=MetricOut)
 async def get_metric_by_identifier(
     metric_identifier: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a metric by ID or name"""
     # Try to parse as integer for ID lookup
     try:
         metric_id = int(metric_identifier)
-        return get_metric(db, metric_id=metric_id)
+        return await get_metric_async(db, metric_id=metric_id)
     except ValueError:
         # If not an integer, treat as name
-        return get_metric(db, metric_name=metric_identifier)
+        return await get_metric_async(db, metric_name=metric_identifier)
+
+@router.get("/{metric_identifier}/series", response_model=MetricSeriesOut)
+async def get_metric_series(
+    metric_identifier: str,
+    start: Optional[datetime] = Query(None, alias="from", description="Range start (default: 24 hours before 'to')"),
+    end: Optional[datetime] = Query(None, alias="to", description="Range end, exclusive (default: now)"),
+    step: Optional[str] = Query(None, description="Bucket width, e.g. 300, 5m, 1h, 1d (default: picked from the range)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Metric history over a time range, read from the coarsest rollup that resolves the step"""
+    try:
+        metric_id, metric_name = int(metric_identifier), None
+    except ValueError:
+        metric_id, metric_name = None, metric_identifier
+    try:
+        series = await get_metric_series_async(db, metric_id=metric_id, metric_name=metric_name, start=start, end=end, step=step)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if series is None:
+        raise HTTPException(status_code=404, detail=f"Metric {metric_identifier} not found")
+    return series
 
 @router.put("/{metric_identifier}", response_model=MetricOut)
 async def update_metric_by_identifier(
     metric_identifier: str,
     metric_update: MetricUpdate,
     recalculate: bool = Query(False, description="Recalculate metric value after update"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a metric by ID or name. calculation_config can be updated to change how the metric is calculated."""
     try:
         metric_id = int(metric_identifier)
-        return update_metric(db, metric_id=metric_id, metric_update=metric_update, recalculate=recalculate)
+        return await update_metric_async(db, metric_id=metric_id, metric_update=metric_update, recalculate=recalculate)
     except ValueError:
-        return update_metric(db, metric_name=metric_identifier, metric_update=metric_update, recalculate=recalculate)
+        return await update_metric_async(db, metric_name=metric_identifier, metric_update=metric_update, recalculate=recalculate)
 
 @router.delete("/{metric_identifier}")
 async def delete_metric_by_identifier(
     metric_identifier: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a metric by ID or name"""
     try:
         metric_id = int(metric_identifier)
-        delete_metric(db, metric_id=metric_id)
+        await delete_metric_async(db, metric_id=metric_id)
     except ValueError:
-        delete_metric(db, metric_name=metric_identifier)
+        await delete_metric_async(db, metric_name=metric_identifier)
     
     return {"message": f"Metric {metric_identifier} deleted successfully"}
 
@@ -102,47 +134,33 @@ async def delete_metric_by_identifier(
 async def calculate_metric_by_identifier(
     metric_identifier: str,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Calculate and update a specific metric value"""
     try:
         metric_id = int(metric_identifier)
-        return calculate_metric_value(db, metric_id=metric_id)
+        return await calculate_metric_value_async(db, metric_id=metric_id)
     except ValueError:
-        return calculate_metric_value(db, metric_name=metric_identifier)
+        return await calculate_metric_value_async(db, metric_name=metric_identifier)
 
-@router.post("/calculate/all", response_model=List[MetricOut])
+@router.post("/calculate/all", response_model=MetricJobOut, status_code=202)
 async def calculate_all_metrics_endpoint(
     entity: Optional[str] = Query(None, description="Calculate metrics for specific entity only"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Calculate all metrics or metrics for a specific entity"""
-    return calculate_all_metrics(db, entity=entity)
+    """Queue a recompute of all metrics, or those of one entity; poll /metrics/jobs/{id} for the outcome"""
+    job = await create_metric_job_async(db, "all", entity=entity)
+    submit_metric_job(job.id)
+    return job
 
-@router.post("/calculate/batch")
+@router.post("/calculate/batch", response_model=MetricJobOut, status_code=202)
 async def calculate_metrics_batch(
     metric_identifiers: List[str],
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Calculate multiple specific metrics"""
-    results = []
-    errors = []
-    
-    for identifier in metric_identifiers:
-        try:
-            try:
-                metric_id = int(identifier)
-                result = calculate_metric_value(db, metric_id=metric_id)
-            except ValueError:
-                result = calculate_metric_value(db, metric_name=identifier)
-            results.append(result)
-        except Exception as e:
-            errors.append({"identifier": identifier, "error": str(e)})
-    
-    return {
-        "calculated": len(results),
-        "errors": len(errors),
-        "results": results,
-        "error_details": errors
-    }
\ No newline at end of file
+    """Queue a recompute of the given metrics (IDs or names), written in one transaction; poll /metrics/jobs/{id}"""
+    if not metric_identifiers:
+        raise HTTPException(status_code=400, detail="No metric identifiers given")
+    job = await create_metric_job_async(db, "batch", identifiers=metric_identifiers)
+    submit_metric_job(job.id)
+    return job
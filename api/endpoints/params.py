@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+from fastapi import Body, HTTPException, Query
+from pydantic import BaseModel
+from crud.filters import InvalidFilter, parse_filter
+
+
+def parse_fields(schema: Type[BaseModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse `a,b,c` against the fields of `schema`; None when absent, else "id" then the fields in schema order.
+
+    The order is canonical, so every permutation of one field set shares a
+    cached serializer (schemas.base.fieldset_model).
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(name for name in requested if name not in schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ("id", *(name for name in schema.model_fields if name in requested and name != "id"))
+
+
+def fields_param(schema: Type[BaseModel]):
+    """Dependency parsing `?fields=a,b,c` against the columns of `schema`.
+
+    Resolves to every field of `schema` when the parameter is absent, so reads
+    always select plain columns rather than ORM entities.
+    """
+    def parse(
+        fields: Optional[str] = Query(None, description=f"Comma-separated {schema.__name__} fields to return"),
+    ) -> Tuple[str, ...]:
+        return parse_fields(schema, fields) or tuple(schema.model_fields)
+    return parse
+
+
+def filters_param(
+    filters: Optional[List[str]] = Query(
+        None,
+        alias="filter",
+        description="Repeatable field:operator:value, e.g. status:eq:active or performance.safety_rating:gte:4",
+    ),
+) -> Optional[List[Dict]]:
+    """Dependency parsing `?filter=` specs into calculation_config-style filters"""
+    if not filters:
+        return None
+    try:
+        return [parse_filter(spec) for spec in filters]
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def sort_param(
+    sort: Optional[str] = Query(None, description="Comma-separated fields, prefix with - for descending, e.g. -mileage"),
+) -> Optional[str]:
+    return sort
+
+
+def include_param(*allowed: str):
+    """Dependency parsing `?include=a,b` against the relations a route can embed"""
+    def parse(
+        include: Optional[str] = Query(None, description=f"Comma-separated relations to embed: {', '.join(allowed)}"),
+    ) -> Tuple[str, ...]:
+        if not include:
+            return ()
+        requested = tuple(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(unknown)}")
+        return requested
+    return parse
+
+
+# Largest list accepted by the /bulk endpoints; keeps one request to one transaction
+BULK_MAX_ITEMS = 10000
+
+
+def bulk_items(
+    items: List[Dict[str, Any]] = Body(..., max_length=BULK_MAX_ITEMS, description="Objects to write; each is validated on its own"),
+) -> List[Dict[str, Any]]:
+    return items
+
+
+def bulk_ids(
+    ids: List[int] = Body(..., max_length=BULK_MAX_ITEMS, description="IDs to delete"),
+) -> List[int]:
+    return ids
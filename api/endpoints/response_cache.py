@@ -0,0 +1,159 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from email.utils import format_datetime
+from datetime import date, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+from db.session import async_engine
+from db.versions import on_tables_changed, version_map, versions_query
+
+# GET routes under these prefixes, and the tables their responses are built from
+CACHED_ROUTES = {
+    "trucks": ("trucks", "maintenances"),  # ?include=maintenances embeds them
+    "drivers": ("drivers",),
+    "jobs": ("jobs",),
+    "maintenance": ("maintenances",),
+    # Triggers update incremental metric values inside entity writes (crud/incremental_metrics.py)
+    "metrics": ("metric", "metric_history", "metric_rollups", "metric_jobs", "trucks", "drivers", "jobs", "maintenances"),
+    "dashboard": ("drivers", "trucks", "jobs", "metric"),
+}
+
+# Routes that also read the clock: their ETags change with the date (e.g. the
+# dashboard's licenses expiring within N days of today)
+DATED_ROUTES = {"dashboard"}
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+# Larger bodies (e.g. a whole unpaginated table) still get an ETag but are not kept
+RESPONSE_CACHE_MAX_BODY = int(os.getenv("RESPONSE_CACHE_MAX_BODY", str(1024 * 1024)))
+
+
+class ResponseLRU:
+    """Serialized GET responses keyed by ETag, dropped when a table they read changes"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: "OrderedDict[str, Tuple[Tuple[str, ...], int, list, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, etag: str, tables: Tuple[str, ...], status: int, headers: list, body: bytes):
+        with self._lock:
+            self._entries[etag] = (tables, status, headers, body)
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tables: Set[str]):
+        with self._lock:
+            for etag in [etag for etag, entry in self._entries.items() if tables.intersection(entry[0])]:
+                del self._entries[etag]
+
+
+response_cache = ResponseLRU(RESPONSE_CACHE_SIZE)
+# Writes committed in this worker free their stale entries right away; other
+# workers' writes are caught by the version check in the ETag
+on_tables_changed(response_cache.invalidate)
+
+
+async def read_versions(tables: Iterable[str]) -> Dict[str, tuple]:
+    async with async_engine.connect() as conn:
+        return version_map(await conn.execute(versions_query(tables)))
+
+
+def _cacheable(scope) -> bool:
+    """False when the response depends on the current time, e.g. a metric series without both 'from' and 'to'"""
+    if scope["path"].rstrip("/").endswith("/series"):
+        params = parse_qs(scope["query_string"].decode())
+        return "from" in params and "to" in params
+    return True
+
+
+def _etag(scope, tables: Tuple[str, ...], versions: Dict[str, tuple], dated: bool = False) -> str:
+    vector = ",".join(f"{table}:{versions.get(table, (0,))[0]}" for table in tables)
+    accept = dict(scope["headers"]).get(b"accept", b"").decode()
+    key = f"{scope['path']}?{scope['query_string'].decode()}|{accept}|{vector}"
+    if dated:
+        key += f"|{date.today().isoformat()}"
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def _last_modified(versions: Dict[str, tuple]) -> Optional[str]:
+    stamps = [updated_at for _, updated_at in versions.values() if updated_at]
+    if not stamps:
+        return None
+    return format_datetime(max(stamps).replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+class ResponseCacheMiddleware:
+    """Conditional GET for the entity and metric read routes.
+
+    The ETag is derived from the URL and the version of every table the route
+    reads, which costs one primary-key lookup in table_versions. A matching
+    If-None-Match is answered with 304, and a cached body is replayed, without
+    running the route or touching the ORM. Routes that read the clock are
+    keyed on the date too, or left uncached when they run up to now.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        prefix = scope["path"].strip("/").split("/", 1)[0]
+        tables = CACHED_ROUTES.get(prefix)
+        if not tables or not _cacheable(scope):
+            return await self.app(scope, receive, send)
+
+        versions = await read_versions(tables)
+        etag = _etag(scope, tables, versions, dated=prefix in DATED_ROUTES)
+        validators = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+        last_modified = _last_modified(versions)
+        if last_modified:
+            validators.append((b"last-modified", last_modified.encode()))
+
+        request_headers = dict(scope["headers"])
+        if_none_match = request_headers.get(b"if-none-match")
+        if if_none_match and _matches(if_none_match.decode(), etag):
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        cached = response_cache.get(etag)
+        if cached:
+            _, status, headers, body = cached
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+            return
+
+        state = {"status": None, "headers": None, "chunks": [], "size": 0}
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                if message["status"] == 200:
+                    message["headers"] = [*message.get("headers", []), *validators]
+                state["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body" and state["status"] == 200 and scope["method"] == "GET":
+                state["size"] += len(message.get("body", b""))
+                if state["size"] <= RESPONSE_CACHE_MAX_BODY:
+                    state["chunks"].append(message.get("body", b""))
+                if not message.get("more_body") and state["size"] <= RESPONSE_CACHE_MAX_BODY:
+                    response_cache.put(etag, tables, 200, state["headers"], b"".join(state["chunks"]))
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
@@ -0,0 +1,38 @@
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from schemas.base import dump_fieldset, dump_fieldset_one, msgpack
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def negotiate(request: Request) -> Tuple[str, str]:
+    """(format, media type) from the Accept header; JSON unless msgpack is asked for and installed"""
+    accept = request.headers.get("accept", "")
+    if msgpack is not None:
+        for media_type in MSGPACK_TYPES:
+            if media_type in accept:
+                return "msgpack", media_type
+    return "json", "application/json"
+
+
+def rows_response(
+    request: Request,
+    schema: Type[BaseModel],
+    fields: Tuple[str, ...],
+    rows: Iterable[Any],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Serialize DB rows straight to the response body, bypassing response_model.
+
+    The route's response_model still documents the shape; returning a
+    Response skips FastAPI's second validation and dict round trip.
+    """
+    format, media_type = negotiate(request)
+    return Response(dump_fieldset(schema, fields, rows, format), media_type=media_type, headers=headers)
+
+
+def row_response(request: Request, schema: Type[BaseModel], fields: Tuple[str, ...], row: Any) -> Response:
+    format, media_type = negotiate(request)
+    return Response(dump_fieldset_one(schema, fields, row, format), media_type=media_type)
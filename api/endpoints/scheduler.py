@@ -7,7 +7,8 @@ from datetime import datetime
 from crud.generate_metrics import (
     add_custom_metric_job,
     remove_metric_job,
-    list_metric_jobs
+    list_metric_jobs,
+    metric_job_stats
 )
 
 scheduler_router = APIRouter()
@@ -79,4 +80,10 @@ async def get_scheduler_status():
             "state": str(scheduler.state)
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@scheduler_router.get("/stats")
+async def get_scheduler_stats():
+    """Metric evaluations run and skipped, per job scope; skipped ones had no source table changes"""
+    get_scheduler()
+    return metric_job_stats()
@@ -1,26 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from schemas.trucks import TruckCreate, TruckUpdate, TruckOut
+from typing import Any, Dict, List, Optional, Tuple
+from schemas.trucks import TruckCreate, TruckPatch, TruckUpdate, TruckOut, TruckWithMaintenances
 import crud.trucks as crud_truck
-from db.session import get_db
+from crud.filters import InvalidFilter
+from crud.pagination import NEXT_CURSOR_HEADER, InvalidCursor
+from db.session import get_async_db, get_db
+from endpoints.params import bulk_ids, bulk_items, fields_param, filters_param, include_param, sort_param
+from endpoints.responses import row_response, rows_response
+from schemas.bulk import BulkResult
 
 truck_router = APIRouter()
 
 
+def _output_shape(fields, include):
+    """Schema and field set a truck read is serialized with"""
+    if not include:
+        return TruckOut, fields
+    return TruckWithMaintenances, (*fields, *include)
+
 
 # GET /trucks - Obtener todos los camiones
 @truck_router.get("/", response_model=List[TruckOut])
-async def read_trucks(db: Session = Depends(get_db)):
-    return crud_truck.get_trucks(db)
+async def read_trucks(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit to return every truck"),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    fields: Tuple[str, ...] = Depends(fields_param(TruckOut)),
+    filters: Optional[List[Dict]] = Depends(filters_param),
+    sort: Optional[str] = Depends(sort_param),
+    include: Tuple[str, ...] = Depends(include_param("maintenances")),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        page = await crud_truck.get_trucks_async(
+            db, limit=limit, after=after, fields=fields, filters=filters, sort=sort, include=include
+        )
+    except (InvalidCursor, InvalidFilter) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    return rows_response(request, *_output_shape(fields, include), page.items, headers)
+
+# Bulk routes are registered before /{id} so "bulk" is not read as an ID
+@truck_router.post("/bulk", response_model=BulkResult)
+def bulk_create_trucks(items: List[Dict[str, Any]] = Depends(bulk_items), db: Session = Depends(get_db)):
+    try:
+        return crud_truck.bulk_create_trucks(db, items)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@truck_router.patch("/bulk", response_model=BulkResult)
+def bulk_update_trucks(items: List[Dict[str, Any]] = Depends(bulk_items), db: Session = Depends(get_db)):
+    try:
+        return crud_truck.bulk_update_trucks(db, items)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@truck_router.delete("/bulk", response_model=BulkResult)
+def bulk_delete_trucks(ids: List[int] = Depends(bulk_ids), db: Session = Depends(get_db)):
+    try:
+        return crud_truck.bulk_delete_trucks(db, ids)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 # GET /trucks/{truck_id} - Obtener un camión por ID
 @truck_router.get("/{truck_id}", response_model=TruckOut)
-def read_truck(truck_id: int, db: Session = Depends(get_db)):
-    truck = crud_truck.get_truck(db, truck_id)
+def read_truck(
+    truck_id: int,
+    request: Request,
+    fields: Tuple[str, ...] = Depends(fields_param(TruckOut)),
+    include: Tuple[str, ...] = Depends(include_param("maintenances")),
+    db: Session = Depends(get_db),
+):
+    truck = crud_truck.get_truck(db, truck_id, fields=fields, include=include)
     if not truck:
         raise HTTPException(status_code=404, detail="Truck not found")
-    return truck
+    return row_response(request, *_output_shape(fields, include), truck)
 
 # POST /trucks - Crear un camión nuevo
 @truck_router.post("/", response_model=TruckOut)
@@ -35,6 +91,14 @@ def update_truck(truck_id: int, truck: TruckUpdate, db: Session = Depends(get_db
         raise HTTPException(status_code=404, detail="Truck not found")
     return updated_truck
 
+# PATCH /trucks/{truck_id} - Actualizar solo los campos enviados
+@truck_router.patch("/{truck_id}", response_model=TruckOut)
+def patch_truck(truck_id: int, truck: TruckPatch, db: Session = Depends(get_db)):
+    updated_truck = crud_truck.update_truck(db, truck_id, truck)
+    if not updated_truck:
+        raise HTTPException(status_code=404, detail="Truck not found")
+    return updated_truck
+
 # DELETE /trucks/{truck_id} - Eliminar un camión
 @truck_router.delete("/{truck_id}")
 def delete_truck(truck_id: int, db: Session = Depends(get_db)):
@@ -3,16 +3,22 @@ from contextlib import asynccontextmanager
 import logging
 import time
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from crud.generate_metrics import start_metrics_scheduler
-from db.session import engine, SessionLocal, get_db
+from db.session import TRACK_TABLE_VERSIONS, engine, SessionLocal, get_db
 from models.base import Base
+from endpoints.dashboard import dashboard_router
 from endpoints.drivers import driver_router
+from endpoints.export import export_router
+from endpoints.imports import import_router
 from endpoints.jobs import job_router
 from endpoints.metric import router
 from endpoints.trucks import truck_router
 from endpoints.maintanence import maintenance_router
+from endpoints.response_cache import ResponseCacheMiddleware
 from endpoints.scheduler import scheduler_router, set_scheduler_instance  # Add this import
 from fastapi.middleware.cors import CORSMiddleware
+from crud.pagination import NEXT_CURSOR_HEADER
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from filelock import FileLock, Timeout
 
@@ -53,7 +59,8 @@ async def lifespan(app: FastAPI):
 # Create FastAPI instance with lifespan
 app = FastAPI(
     title="Truck Fleet Management API",
-    lifespan=lifespan  # Enable the lifespan
+    lifespan=lifespan,  # Enable the lifespan
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -61,11 +68,16 @@ origins = [
     "https://truckfleet.dev",
     "https://www.truckfleet.dev"
 ]
+# Conditional GET / ETag cache; added first so CORS still wraps its 304s.
+# Its ETags come from table_versions, so only where writes bump them
+if TRACK_TABLE_VERSIONS:
+    app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
 )
 
 # Create tables automatically if they don't exist
@@ -77,6 +89,9 @@ app.include_router(driver_router, prefix="/drivers", tags=["Driver"])
 app.include_router(job_router, prefix="/jobs", tags=["Jobs"])
 app.include_router(maintenance_router, prefix="/maintenance", tags=["Maintenance"])
 app.include_router(router, prefix="/metrics", tags=["Metrics"])
+app.include_router(dashboard_router, prefix="/dashboard", tags=["Dashboard"])
+app.include_router(export_router, prefix="/export", tags=["Export"])
+app.include_router(import_router, prefix="/imports", tags=["Import"])
 app.include_router(scheduler_router, prefix="/scheduler", tags=["Scheduler"])  # Add scheduler endpoints
 
 # Health check endpoint
@@ -0,0 +1,12 @@
+# Import every model so relationship() targets resolve whichever module loads first
+from models.base import Base
+from models.drivers import Driver
+from models.imports import ImportRun
+from models.jobs import Job
+from models.maintenance import Maintenance
+from models.metric import Metric
+from models.metric_accumulators import MetricAccumulator
+from models.metric_history import MetricHistory, MetricRollup
+from models.metric_jobs import MetricJob
+from models.table_versions import TableVersion
+from models.trucks import Truck
@@ -1,5 +1,28 @@
+from sqlalchemy import Column, Computed, String
 from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
-    pass
 
+    @classmethod
+    def derived_values(cls, values: dict) -> dict:
+        """Extra column values computed from `values` on write.
+
+        ORM attribute hooks (e.g. @validates) do not run for INSERT/UPDATE
+        statements, so statement-based writers merge this in themselves.
+        """
+        return {}
+
+
+def json_path_column(source: str, path: str, type_=String):
+    """Indexed virtual column mirroring `source.path` inside a JSON column.
+
+    Filters and aggregates on the JSON path are rewritten to this column
+    (see crud.filters.field_expression), so they can seek an index instead
+    of parsing JSON on every row.
+    """
+    return Column(
+        type_,
+        Computed(f"json_extract({source}, '$.{path}')", persisted=False),
+        index=True,
+        info={"json_path": f"{source}.{path}"},
+    )
@@ -1,5 +1,5 @@
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, JSON
-from models.base import Base
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, JSON
+from models.base import Base, json_path_column
 
 
 class Driver(Base):
@@ -16,4 +16,9 @@ class Driver(Base):
     performance = Column(JSON, nullable=False)
     current_assignment = Column(JSON, nullable=False)
     certifications = Column(JSON, nullable=False)
-    emergency_contact = Column(JSON, nullable=False)
\ No newline at end of file
+    emergency_contact = Column(JSON, nullable=False)
+
+    # Hot JSON paths filtered by the metrics scheduler
+    performance_safety_rating = json_path_column("performance", "safety_rating", Float)
+    employment_status = json_path_column("employment", "status")
+    current_assignment_status = json_path_column("current_assignment", "status")
@@ -0,0 +1,21 @@
+from sqlalchemy import JSON, Column, DateTime, Integer, String, func
+from models.base import Base
+
+
+class ImportRun(Base):
+    """One bulk file import, checkpointed after every committed batch so it can resume"""
+    __tablename__ = "import_runs"
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String, nullable=False)
+    format = Column(String, nullable=False)
+    filename = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="running")  # running, completed, failed
+    rows_read = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    # 1-based number of the last data row whose batch was committed
+    last_row = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=list)
+    message = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
@@ -1,6 +1,52 @@
-from sqlalchemy import JSON, Column, Date, Integer, String
+import re
+from sqlalchemy import JSON, Column, Date, Float, Integer, String
+from sqlalchemy.orm import validates
 from models.base import Base
 
+_QUANTITY = re.compile(r'(-?\d[\d,]*(?:\.\d+)?)\s*([a-zA-Z]*)')
+
+# Unit -> factor to the canonical unit, "" is the unit assumed when none is given
+VALUE_UNITS = {"": 1.0, "usd": 1.0}
+WEIGHT_UNITS = {"": 1.0, "lb": 1.0, "lbs": 1.0, "pounds": 1.0, "kg": 2.20462, "kgs": 2.20462, "t": 2204.62, "tons": 2000.0}
+DISTANCE_UNITS = {"": 1.0, "mi": 1.0, "mile": 1.0, "miles": 1.0, "km": 0.621371, "kms": 0.621371}
+DURATION_UNITS = {
+    "": 1.0, "h": 1.0, "hr": 1.0, "hrs": 1.0, "hour": 1.0, "hours": 1.0,
+    "m": 1 / 60, "min": 1 / 60, "mins": 1 / 60, "minutes": 1 / 60,
+    "d": 24.0, "day": 24.0, "days": 24.0,
+}
+
+
+def parse_quantity(text, units):
+    """Parse strings like "$4,200", "500 lbs" or "2 days" into a float in the canonical unit"""
+    if text is None:
+        return None
+    match = _QUANTITY.search(str(text))
+    if not match:
+        return None
+    factor = units.get(match.group(2).lower())
+    if factor is None:
+        return None
+    return float(match.group(1).replace(',', '')) * factor
+
+
+# String column -> (numeric shadow column, units)
+NUMERIC_SHADOWS = {
+    "estimatedValue": ("estimatedValueAmount", VALUE_UNITS),
+    "weight": ("weightLbs", WEIGHT_UNITS),
+    "distance": ("distanceMiles", DISTANCE_UNITS),
+    "estimatedDuration": ("estimatedDurationHours", DURATION_UNITS),
+}
+
+
+def numeric_shadow_values(values: dict) -> dict:
+    """Numeric shadow columns for the string columns present in `values`"""
+    return {
+        shadow: parse_quantity(values[source], units)
+        for source, (shadow, units) in NUMERIC_SHADOWS.items()
+        if source in values
+    }
+
+
 class Job(Base):
     __tablename__ = "jobs"
     id = Column(Integer, primary_key=True, index=True)
@@ -23,4 +69,20 @@ class Job(Base):
     nextCheckpoint =  Column(String, nullable=False) ;
     eta =  Column(String, nullable=False) ;
 
-    #! we need to add a relationship to the driver model
\ No newline at end of file
+    # Numeric shadows of the free-text quantities above, parsed on write
+    estimatedValueAmount = Column(Float, nullable=True, index=True, info={"numeric_of": "estimatedValue"})  # USD
+    weightLbs = Column(Float, nullable=True, index=True, info={"numeric_of": "weight"})
+    distanceMiles = Column(Float, nullable=True, index=True, info={"numeric_of": "distance"})
+    estimatedDurationHours = Column(Float, nullable=True, index=True, info={"numeric_of": "estimatedDuration"})
+
+    @classmethod
+    def derived_values(cls, values: dict) -> dict:
+        return numeric_shadow_values(values)
+
+    @validates("estimatedValue", "weight", "distance", "estimatedDuration")
+    def _parse_numeric_shadow(self, key, value):
+        shadow, units = NUMERIC_SHADOWS[key]
+        setattr(self, shadow, parse_quantity(value, units))
+        return value
+
+    #! we need to add a relationship to the driver model
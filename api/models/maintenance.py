@@ -12,4 +12,6 @@ class Maintenance(Base):
     date = Column(DateTime, nullable=False)
     next_scheduled = Column(DateTime, nullable=True)
 
+    truck = relationship("Truck", back_populates="maintenances")
+
    
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import JSON, Column, Float, Integer, String, Text
 from models.base import Base
 
 
@@ -9,4 +9,10 @@ class Metric(Base):
     name = Column(String, index=True, unique=True)
     value = Column(Float)  # Changed to Float for averages
     type = Column(String)
-    calculation_config = Column(String)  # Store as JSON string
\ No newline at end of file
+    calculation_config = Column(String)  # Store as JSON string
+    breakdown = Column(JSON, nullable=True)  # grouped metrics: bucket -> value
+    # Custom SQL metrics: outcome of the last sandboxed run (crud/metric.py)
+    status = Column(String, nullable=True)  # ok, failed, timeout or disabled
+    last_error = Column(Text, nullable=True)
+    last_run_ms = Column(Float, nullable=True)
+    failure_count = Column(Integer, nullable=False, default=0, server_default="0")  # consecutive
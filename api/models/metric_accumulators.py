@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer
+from models.base import Base
+
+
+class MetricAccumulator(Base):
+    """Running parts of an incrementally maintained metric (see crud/incremental_metrics.py).
+
+    count and sum keep their value in numerator; avg is numerator / denominator
+    and percentage numerator / denominator * 100.
+    """
+    __tablename__ = "metric_accumulators"
+    metric_id = Column(Integer, ForeignKey("metric.id", ondelete="CASCADE"), primary_key=True)
+    numerator = Column(Float, nullable=False, default=0)
+    denominator = Column(Float, nullable=False, default=0)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer
+from models.base import Base
+
+
+class MetricHistory(Base):
+    """Raw metric value per computation; ts is epoch seconds (see crud/metric_history.py)"""
+    __tablename__ = "metric_history"
+    metric_id = Column(Integer, ForeignKey("metric.id", ondelete="CASCADE"), primary_key=True)
+    ts = Column(Integer, primary_key=True)
+    value = Column(Float, nullable=False)
+    __table_args__ = (
+        Index("ix_metric_history_ts", "ts"),  # retention deletes by age across metrics
+        {"sqlite_with_rowid": False},
+    )
+
+
+class MetricRollup(Base):
+    """Metric values folded into buckets of `step` seconds starting at epoch second `bucket`"""
+    __tablename__ = "metric_rollups"
+    metric_id = Column(Integer, ForeignKey("metric.id", ondelete="CASCADE"), primary_key=True)
+    step = Column(Integer, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    samples = Column(Integer, nullable=False)
+    total = Column(Float, nullable=False)
+    minimum = Column(Float, nullable=False)
+    maximum = Column(Float, nullable=False)
+    __table_args__ = (
+        Index("ix_metric_rollups_step_bucket", "step", "bucket"),
+        {"sqlite_with_rowid": False},
+    )
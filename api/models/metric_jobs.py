@@ -0,0 +1,24 @@
+from sqlalchemy import JSON, Column, DateTime, Integer, String, func
+from models.base import Base
+
+
+class MetricJob(Base):
+    """One background recompute of metrics, requested through /metrics/calculate/all or /batch"""
+    __tablename__ = "metric_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # all or batch
+    entity = Column(String, nullable=True)  # kind=all: only this entity's metrics
+    identifiers = Column(JSON, nullable=True)  # kind=batch: metric ids or names as sent
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    total = Column(Integer, nullable=False, default=0)
+    calculated = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=list)  # [{"metric": ..., "error": ...}]
+    # Milliseconds: queued, compute per entity, write, total
+    timings = Column(JSON, nullable=False, default=dict)
+    message = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Refreshed while the job is queued or running in a live worker (crud/metric_jobs.py)
+    heartbeat_at = Column(DateTime, nullable=True)
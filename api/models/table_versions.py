@@ -0,0 +1,10 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from models.base import Base
+
+
+class TableVersion(Base):
+    """Write counter per table, bumped in the same transaction as the write (see db/versions.py)"""
+    __tablename__ = "table_versions"
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
@@ -31,6 +31,8 @@ class Truck(Base):
     features = Column(JSON, nullable=False)
     condition_score = Column(Integer, nullable=False)
 
-
-# Optional: Import Maintenance after class definition
-# from .maintenance import Maintenance  # Comment out to avoid circular import
\ No newline at end of file
+    # Service history; crud.trucks.delete_truck removes it explicitly, so
+    # deleting a truck never has to load the collection first
+    maintenances = relationship(
+        "Maintenance", back_populates="truck", order_by="Maintenance.id", passive_deletes=True
+    )
@@ -0,0 +1,85 @@
+import os
+from functools import lru_cache
+from typing import Any, Iterable, List, Tuple, Type
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from pydantic.fields import FieldInfo
+from typing_extensions import TypedDict
+
+try:
+    import msgpack
+except ImportError:  # msgpack responses are optional
+    msgpack = None
+
+# Field sets whose trimmed model and serializers are kept; ?fields= is client
+# controlled, so the caches are bounded (see endpoints.params.parse_fields)
+FIELDSET_CACHE_SIZE = int(os.getenv("FIELDSET_CACHE_SIZE", "256"))
+
+
+@lru_cache(maxsize=FIELDSET_CACHE_SIZE)
+def fieldset_model(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Trimmed copy of `schema` holding only `fields`, built once per field set"""
+    definitions = {name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=None)
+def partial_model(schema: Type[BaseModel]) -> Type[BaseModel]:
+    """Copy of `schema` where every field may be omitted, for PATCH payloads.
+
+    Fields keep their types, so an explicit null is still rejected for
+    non-nullable columns; use model_dump(exclude_unset=True) to get the change set.
+    """
+    definitions = {
+        name: (field.annotation, FieldInfo.merge_field_infos(field, default=None))
+        for name, field in schema.model_fields.items()
+    }
+    return create_model(f"{schema.__name__.removesuffix('Update')}Patch", **definitions)
+
+
+# One serializer per (trusted, many) variant of a field set
+@lru_cache(maxsize=4 * FIELDSET_CACHE_SIZE)
+def _fieldset_adapter(schema: Type[BaseModel], fields: Tuple[str, ...], trusted: bool, many: bool) -> TypeAdapter:
+    """Precompiled serializer for rows of `fields`.
+
+    Trusted rows are column rows, validated on the way in, so they are encoded
+    from a TypedDict of their values with no model instances built. Untrusted
+    input (ORM entities, e.g. with embedded relationships) goes through the
+    trimmed model.
+    """
+    if trusted:
+        row = TypedDict(f"{schema.__name__}Row", {name: Any for name in fields})
+    else:
+        row = fieldset_model(schema, fields)
+    return TypeAdapter(List[row] if many else row)
+
+
+def _dump(schema: Type[BaseModel], fields: Tuple[str, ...], value: Any, trusted: bool, many: bool, format: str) -> bytes:
+    adapter = _fieldset_adapter(schema, fields, trusted, many)
+    if not trusted:
+        value = adapter.validate_python(value, from_attributes=True)
+    if format == "msgpack":
+        return msgpack.packb(adapter.dump_python(value, mode="json"))
+    return adapter.dump_json(value)
+
+
+def _is_row(row: Any) -> bool:
+    return hasattr(row, "_asdict")
+
+
+def dump_fieldset(schema: Type[BaseModel], fields: Tuple[str, ...], rows: Iterable[Any], format: str = "json") -> bytes:
+    """Serialize rows for `fields` of `schema`, as "json" or "msgpack", skipping
+    FastAPI's response_model pass"""
+    rows = list(rows)
+    if rows and not _is_row(rows[0]):
+        return _dump(schema, fields, rows, False, True, format)
+    return _dump(schema, fields, [row._asdict() for row in rows], True, True, format)
+
+
+def dump_fieldset_one(schema: Type[BaseModel], fields: Tuple[str, ...], row: Any, format: str = "json") -> bytes:
+    if not _is_row(row):
+        return _dump(schema, fields, row, False, False, format)
+    return _dump(schema, fields, row._asdict(), True, False, format)
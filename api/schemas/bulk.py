@@ -0,0 +1,13 @@
+from typing import Any, List, Literal, Optional
+from pydantic import BaseModel
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: Literal["created", "updated", "deleted", "invalid", "not_found"]
+    errors: Optional[List[Any]] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
@@ -0,0 +1,44 @@
+from typing import List, Optional
+from pydantic import BaseModel
+from schemas.drivers import CurrentAssignmentBase, PerformanceBase
+
+class DashboardCards(BaseModel):
+    total_drivers: int
+    active_drivers: int
+    inactive_drivers: int
+    high_safety_drivers: int
+    total_jobs: int
+    in_progress_jobs: int
+    fleet_size: int
+
+class SeriesPoint(BaseModel):
+    name: str
+    value: int
+
+class DashboardAlert(BaseModel):
+    type: str
+    count: int
+    message: str
+    entity: str
+
+class DashboardDriver(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    employment_status: Optional[str] = None
+    current_assignment: CurrentAssignmentBase
+    performance: PerformanceBase
+
+class DashboardJob(BaseModel):
+    id: int
+    job_number: str
+    job_status: str
+
+class DashboardOut(BaseModel):
+    cards: DashboardCards
+    job_status: List[SeriesPoint]
+    driver_status: List[SeriesPoint]
+    alerts: List[DashboardAlert]
+    active_drivers: List[DashboardDriver]
+    recent_jobs: List[DashboardJob]
+    recent_drivers: List[DashboardDriver]
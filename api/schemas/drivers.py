@@ -1,5 +1,6 @@
 from typing import List, Literal
 from pydantic import BaseModel, FutureDate
+from schemas.base import partial_model
 
 class AddressBase(BaseModel):
     street: str
@@ -61,6 +62,9 @@ class DriverCreate(DriverBase):
 class DriverUpdate(DriverBase):
     pass
 
+# PATCH payload: any subset of the DriverUpdate fields
+DriverPatch = partial_model(DriverUpdate)
+
 class DriverOut(DriverBase):
     id: int
     class Config:
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any, List, Optional
+from pydantic import BaseModel
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[Any]
+
+class ImportRunOut(BaseModel):
+    id: int
+    entity: str
+    format: str
+    filename: Optional[str] = None
+    status: str
+    rows_read: int
+    rows_imported: int
+    rows_failed: int
+    last_row: int
+    errors: List[ImportRowError] = []
+    message: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    class Config:
+        from_attributes = True
@@ -1,5 +1,7 @@
+from typing import Optional
 from pydantic import BaseModel
 from datetime import date
+from schemas.base import partial_model
 
 class JobBase(BaseModel):
     job_number: str
@@ -27,8 +29,16 @@ class JobCreate(JobBase):
 class JobUpdate(JobBase):
     pass
 
+# PATCH payload: any subset of the JobUpdate fields
+JobPatch = partial_model(JobUpdate)
+
 class JobOut(JobBase):
     id: int
+    # Parsed from estimatedValue/weight/distance/estimatedDuration on write
+    estimatedValueAmount: Optional[float] = None
+    weightLbs: Optional[float] = None
+    distanceMiles: Optional[float] = None
+    estimatedDurationHours: Optional[float] = None
     class Config:
         from_attributes = True
 
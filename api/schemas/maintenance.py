@@ -1,6 +1,7 @@
+from typing import Optional
 from pydantic import BaseModel, FutureDate
-from datetime import date
-
+from datetime import date, datetime
+from schemas.base import partial_model
 
 
 class MaintenanceBase(BaseModel):
@@ -18,7 +19,13 @@ class MaintenanceCreate(MaintenanceBase):
 class MaintenanceUpdate(MaintenanceBase):
     pass
 
+# PATCH payload: any subset of the MaintenanceUpdate fields
+MaintenancePatch = partial_model(MaintenanceUpdate)
+
 class MaintenanceOut(MaintenanceBase):
     id: int
+    # Stored as DateTime, and past schedules are valid history
+    date: datetime
+    next_scheduled: Optional[datetime] = None
     class Config:
         from_attributes = True
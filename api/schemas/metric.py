@@ -1,4 +1,5 @@
-from typing import Optional, Any
+from datetime import datetime
+from typing import Dict, List, Optional, Any
 from pydantic import BaseModel
 
 class MetricBase(BaseModel):
@@ -24,5 +25,52 @@ class MetricUpdate(BaseModel):
 class MetricOut(MetricBase):
     id: int
     calculation_config: Optional[Any] = None
+    # grouped and distribution metrics; Any so rows stored before min/max were
+    # limited to numeric fields still serialize
+    breakdown: Optional[Dict[str, Any]] = None
+    # custom metrics only
+    status: Optional[str] = None
+    last_error: Optional[str] = None
+    last_run_ms: Optional[float] = None
+    failure_count: Optional[int] = None
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class MetricPoint(BaseModel):
+    ts: datetime  # bucket start
+    value: float  # mean of the bucket's samples
+    min: float
+    max: float
+    samples: int
+
+class MetricSeriesOut(BaseModel):
+    metric_id: int
+    name: str
+    start: datetime
+    end: datetime
+    step: int  # seconds per bucket
+    level: str  # raw, 1m, 1h or 1d: where the buckets were read from
+    points: List[MetricPoint]
+
+class MetricJobError(BaseModel):
+    metric: str  # name, or the identifier as sent when it matched no metric
+    error: str
+
+class MetricJobOut(BaseModel):
+    id: int
+    kind: str  # all or batch
+    entity: Optional[str] = None
+    identifiers: Optional[List[str]] = None
+    status: str  # queued, running, completed or failed
+    total: int
+    calculated: int
+    failed: int
+    errors: List[MetricJobError] = []
+    timings: Dict[str, Any] = {}  # queued_ms, compute_ms per entity, write_ms, total_ms
+    message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None  # last sign of life of a queued or running job
+    class Config:
+        from_attributes = True
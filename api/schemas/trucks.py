@@ -1,5 +1,7 @@
-from typing import Literal
+from typing import List, Literal
 from pydantic import BaseModel
+from schemas.maintenance import MaintenanceOut
+from schemas.base import partial_model
 class TruckBase(BaseModel):
     assign_driver: str
     make: str
@@ -33,7 +35,13 @@ class TruckCreate(TruckBase):
 class TruckUpdate(TruckBase):
     pass
 
+# PATCH payload: any subset of the TruckUpdate fields
+TruckPatch = partial_model(TruckUpdate)
+
 class TruckOut(TruckBase):
     id: int
     class Config:
         from_attributes = True
+
+class TruckWithMaintenances(TruckOut):
+    maintenances: List[MaintenanceOut] = []
@@ -0,0 +1,96 @@
+"""Compare the bulk write path with the single-row create/update/delete loop.
+
+Each run starts from an empty temporary database with the WAL/pragma profile
+from db/session.py and writes N synthetic trucks, first one crud call per row
+(add -> commit -> refresh) and then through crud.bulk.
+
+    python scripts/benchmark_bulk.py --rows 1000 10000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import crud.trucks as crud_truck
+from db.session import _engine_options, set_sqlite_pragmas
+from models import Base
+from schemas.trucks import TruckCreate, TruckUpdate
+
+
+def truck_payload(n: int) -> dict:
+    return {
+        "assign_driver": f"Driver {n}", "make": random.choice(["Volvo", "Kenworth", "Peterbilt"]),
+        "model": "VNL", "year": random.randint(2005, 2024), "color": "white",
+        "mileage": random.randint(0, 900_000), "vin": f"BENCH{n:012d}", "plate": f"TX-{n:06d}",
+        "status": random.choice(["active", "maintenance", "out-of-service", "available"]),
+        "fuel_level": random.randint(0, 100), "last_service_date": "2025-01-01", "next_service_due": 5000,
+        "insurance_expiry": "2026-01-01", "registration_expiry": "2026-01-01",
+        "truck_type": random.choice(["Semi-Truck", "Box Truck", "Tanker", "Flatbed"]),
+        "truckweight": 30000, "volume": 3000, "current_location": "Dallas, TX", "last_updated": "2025-01-01",
+        "fuel_efficiency": 7, "total_trips": 0, "maintenance_cost_ytd": 0, "downtime_hours": 0,
+        "features": ["GPS"], "condition_score": 90,
+    }
+
+
+def make_session(path: str):
+    url = f"sqlite:///{path}"
+    engine = create_engine(url, **_engine_options(url))
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine)()
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    # The single-row crud functions print debug lines on every call
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def run_single(db, payloads) -> dict:
+    ids = []
+    timings = {"create": timed(lambda: ids.extend(crud_truck.create_truck(db, TruckCreate(**p)).id for p in payloads))}
+    updates = [TruckUpdate(**{**p, "mileage": p["mileage"] + 1}) for p in payloads]
+    timings["update"] = timed(lambda: [crud_truck.update_truck(db, i, u) for i, u in zip(ids, updates)])
+    timings["delete"] = timed(lambda: [crud_truck.delete_truck(db, i) for i in ids])
+    return timings
+
+
+def run_bulk(db, payloads) -> dict:
+    ids = []
+    timings = {"create": timed(lambda: ids.extend(r.id for r in crud_truck.bulk_create_trucks(db, payloads).results))}
+    updates = [{"id": i, "mileage": p["mileage"] + 1} for i, p in zip(ids, payloads)]
+    timings["update"] = timed(lambda: crud_truck.bulk_update_trucks(db, updates))
+    timings["delete"] = timed(lambda: crud_truck.bulk_delete_trucks(db, ids))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk truck writes against the single-row loop.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="Batch sizes to test")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        payloads = [truck_payload(n) for n in range(rows)]
+        for label, run in (("single-row", run_single), ("bulk", run_bulk)):
+            with tempfile.TemporaryDirectory() as tmp:
+                engine, db = make_session(os.path.join(tmp, "bench.db"))
+                timings = run(db, payloads)
+                db.close()
+                engine.dispose()
+            summary = "  ".join(f"{op}={seconds:.2f}s ({rows / seconds:,.0f} rows/s)" for op, seconds in timings.items())
+            print(f"{rows:>6} rows  {label:<10}  {summary}")
+
+
+if __name__ == "__main__":
+    main()
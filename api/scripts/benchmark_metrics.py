@@ -0,0 +1,105 @@
+"""Compare the per-metric calculation loop with the fused per-entity query.
+
+Builds a temporary database with --rows trucks and drivers, defines N mixed
+count/sum/avg/min/max/distinct_count/percentage metrics over them, and times
+MetricCalculator.calculate_metric for each metric against one
+MetricCalculator.calculate_metrics call. Both paths must return the same values.
+
+    python scripts/benchmark_metrics.py --rows 20000 --metrics 10 30 60 120
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from crud.bulk import bulk_create
+from crud.metric import MetricCalculator
+from db.session import _engine_options, set_sqlite_pragmas
+from models import Base, Driver, Metric, Truck
+from schemas.drivers import DriverCreate
+from schemas.trucks import TruckCreate
+from scripts.benchmark_bulk import truck_payload
+from scripts.benchmark_serialization import driver_payload
+
+# (entity, type, config) factories; i varies thresholds so every metric differs
+TEMPLATES = [
+    lambda i: ("trucks", "count", {"filters": [{"field": "mileage", "operator": ">", "value": i * 1000}]}),
+    lambda i: ("trucks", "sum", {"field": "mileage", "filters": [{"field": "year", "operator": ">=", "value": 2005 + i % 20}]}),
+    lambda i: ("trucks", "avg", {"field": "fuel_level", "filters": [{"field": "status", "operator": "==", "value": "active"}]}),
+    lambda i: ("trucks", "max", {"field": "mileage", "filters": [{"field": "fuel_level", "operator": "<", "value": i % 100}]}),
+    lambda i: ("trucks", "distinct_count", {"field": "make", "filters": [{"field": "year", "operator": ">", "value": 2000 + i % 25}]}),
+    lambda i: ("trucks", "percentage", {
+        "numerator_filters": [{"field": "status", "operator": "==", "value": "maintenance"}],
+        "denominator_filters": [{"field": "mileage", "operator": ">", "value": i * 500}],
+    }),
+    lambda i: ("drivers", "count", {"filters": [{"field": "performance.safety_rating", "operator": ">=", "value": (i % 40) / 10}]}),
+    lambda i: ("drivers", "avg", {"field": "performance.on_time_delivery_rate", "filters": [{"field": "is_active", "operator": "==", "value": True}]}),
+    lambda i: ("drivers", "min", {"field": "employment.years_experience", "filters": [{"field": "employment.status", "operator": "==", "value": "active"}]}),
+    lambda i: ("drivers", "percentage", {"numerator_filters": [{"field": "performance.total_miles_driven", "operator": ">", "value": i * 5000}]}),
+]
+
+
+def define_metrics(db, count: int):
+    db.query(Metric).delete()
+    for i in range(count):
+        entity, metric_type, config = TEMPLATES[i % len(TEMPLATES)](i)
+        db.add(Metric(entity=entity, name=f"bench_{i}", type=metric_type, value=0, calculation_config=json.dumps(config)))
+    db.commit()
+    return db.query(Metric).all()
+
+
+def same(a, b) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9)
+    return a == b
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fused metric calculation.")
+    parser.add_argument("--rows", type=int, default=20000, help="Trucks and drivers to create")
+    parser.add_argument("--metrics", type=int, nargs="+", default=[10, 30, 60, 120], help="Metric counts to test")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url, **_engine_options(url))
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        random.seed(1)
+        bulk_create(db, Truck, TruckCreate, [truck_payload(n) for n in range(args.rows)])
+        bulk_create(db, Driver, DriverCreate, [driver_payload(n) for n in range(args.rows)])
+
+        calculator = MetricCalculator(db)
+        print(f"{'metrics':>8} {'per-metric':>12} {'fused':>10} {'speedup':>8}")
+        for count in args.metrics:
+            metrics = define_metrics(db, count)
+            # Compile the plans first, as every scheduler tick after the first finds them
+            calculator.calculate_metrics(metrics)
+            per_metric, expected = timed(lambda: {m.id: calculator.calculate_metric(m) for m in metrics})
+            fused, actual = timed(lambda: calculator.calculate_metrics(metrics))
+            mismatched = [m.name for m in metrics if not same(expected[m.id], actual[m.id])]
+            if mismatched:
+                sys.exit(f"Fused values differ for {mismatched}")
+            print(f"{count:>8} {per_metric * 1000:>10.1f}ms {fused * 1000:>8.1f}ms {per_metric / fused:>7.1f}x")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
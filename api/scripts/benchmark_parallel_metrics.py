@@ -0,0 +1,92 @@
+"""Time a full metric recompute with the metric pool at different sizes.
+
+Builds a temporary database with --rows trucks and drivers and defines
+--metrics fused metrics plus --sketches percentile metrics (one group each,
+CPU-bound in Python), then runs recalculate_metrics once per --workers value
+for each --pool kind. Every configuration must return the values of the
+sequential run.
+
+    python scripts/benchmark_parallel_metrics.py --rows 50000 --workers 1 2 4 8 --pool thread process
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import crud.metric as crud_metric
+from crud.bulk import bulk_create
+from db.session import _engine_options, set_sqlite_pragmas
+from models import Base, Driver, Metric, Truck
+from schemas.drivers import DriverCreate
+from schemas.trucks import TruckCreate
+from scripts.benchmark_bulk import truck_payload
+from scripts.benchmark_metrics import define_metrics, same
+from scripts.benchmark_serialization import driver_payload
+
+SKETCH_FIELDS = [("trucks", "mileage"), ("trucks", "fuel_level"), ("drivers", "performance.total_miles_driven")]
+
+
+def define_sketches(db, count: int):
+    for i in range(count):
+        entity, field = SKETCH_FIELDS[i % len(SKETCH_FIELDS)]
+        config = {"field": field, "percentiles": [50, 90 + i % 10]}
+        db.add(Metric(entity=entity, name=f"sketch_{i}", type="percentile", value=0, calculation_config=json.dumps(config)))
+    db.commit()
+    return db.query(Metric).all()
+
+
+def run(db, metrics, pool: str, workers: int):
+    crud_metric._discard_pool()
+    crud_metric.METRIC_POOL, crud_metric.METRIC_WORKERS = pool, workers
+    crud_metric.recalculate_metrics(db, metrics)  # start the pool and compile the plans
+    start = time.perf_counter()
+    values = crud_metric.recalculate_metrics(db, metrics)
+    return time.perf_counter() - start, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel metric evaluation.")
+    parser.add_argument("--rows", type=int, default=50000, help="Trucks and drivers to create")
+    parser.add_argument("--metrics", type=int, default=60, help="Fused count/sum/avg/... metrics")
+    parser.add_argument("--sketches", type=int, default=12, help="Percentile metrics, evaluated one per group")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Pool sizes to test")
+    parser.add_argument("--pool", nargs="+", choices=["thread", "process"], default=["thread", "process"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url, **_engine_options(url))
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        random.seed(1)
+        bulk_create(db, Truck, TruckCreate, [truck_payload(n) for n in range(args.rows)])
+        bulk_create(db, Driver, DriverCreate, [driver_payload(n) for n in range(args.rows)])
+        define_metrics(db, args.metrics)
+        metrics = define_sketches(db, args.sketches)
+
+        baseline, expected = run(db, metrics, "thread", 1)
+        print(f"{len(metrics)} metrics, {os.cpu_count()} cores; sequential {baseline * 1000:.0f}ms")
+        print(f"{'pool':>8} {'workers':>8} {'time':>10} {'speedup':>8}")
+        for pool in args.pool:
+            for workers in args.workers:
+                elapsed, actual = run(db, metrics, pool, workers)
+                mismatched = [m.name for m in metrics if not same(expected[m.id], actual[m.id])]
+                if mismatched:
+                    sys.exit(f"{pool} x{workers} values differ for {mismatched}")
+                print(f"{pool:>8} {workers:>8} {elapsed * 1000:>8.0f}ms {baseline / elapsed:>7.2f}x")
+        crud_metric._discard_pool()
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
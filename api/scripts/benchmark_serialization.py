@@ -0,0 +1,119 @@
+"""Compare read serialization paths for 10k trucks and 10k drivers.
+
+old:     ORM entities -> FastAPI response_model validation -> dicts -> JSONResponse
+json:    column rows -> precompiled TypeAdapter, encoded without re-validation
+msgpack: column rows -> precompiled TypeAdapter -> msgpack
+
+Each path is timed from query to response bytes, best of --repeat runs, on a
+temporary SQLite database filled through the bulk write path.
+
+    python scripts/benchmark_serialization.py --rows 10000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from typing import List
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from crud.bulk import bulk_create
+from crud.fieldsets import query_fields
+from db.session import _engine_options, set_sqlite_pragmas
+from models import Base, Driver, Truck
+from schemas.base import dump_fieldset
+from schemas.drivers import DriverCreate, DriverOut
+from schemas.trucks import TruckCreate, TruckOut
+from scripts.benchmark_bulk import truck_payload
+
+
+def driver_payload(n: int) -> dict:
+    return {
+        "first_name": f"First{n}", "last_name": f"Last{n}", "phone_number": f"555{n:07d}",
+        "email": f"driver{n}@example.com", "is_active": bool(n % 2),
+        "address": {"street": f"{n} Main St", "city": "Dallas", "state": "TX", "zip_code": "75001"},
+        "license": {"number": f"D{n:07d}", "license_expiration": "2030-01-01", "license_class": "A", "is_valid": True},
+        "employment": {"hire_date": "2020-01-01", "years_experience": random.randint(0, 30),
+                       "status": random.choice(["active", "inactive", "on-leave", "suspended"]), "employee_id": f"E{n}"},
+        "performance": {"safety_rating": round(random.uniform(1, 5), 1), "on_time_delivery_rate": round(random.random(), 2),
+                        "total_miles_driven": random.randint(0, 900_000), "accidents_free": random.randint(0, 2000)},
+        "current_assignment": {"truck_number": f"T{n}", "route": "I-35",
+                               "status": random.choice(["available", "on-route", "loading", "maintenance", "off-duty"])},
+        "certifications": {"hazmat_endorsement": bool(n % 3), "drug_test_date": "2025-01-01"},
+        "emergency_contact": {"emergency_contact": f"Contact {n}", "relationship": "spouse", "phone": f"555{n:07d}"},
+    }
+
+
+def old_path(db, entity_model, schema) -> bytes:
+    field = create_model_field("Response", List[schema], mode="serialization")
+    rows = db.query(entity_model).all()
+    content = asyncio.run(serialize_response(field=field, response_content=rows, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def new_path(db, entity_model, schema, format: str) -> bytes:
+    fields = tuple(schema.model_fields)
+    rows = query_fields(db, entity_model, fields).all()
+    return dump_fieldset(schema, fields, rows, format)
+
+
+def in_session(Session, run) -> bytes:
+    # A fresh session per run, like one per request
+    with Session() as db:
+        return run(db)
+
+
+def best_of(repeat: int, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths.")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per entity")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path; the best is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url, **_engine_options(url))
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            bulk_create(db, Truck, TruckCreate, [truck_payload(n) for n in range(args.rows)])
+            bulk_create(db, Driver, DriverCreate, [driver_payload(n) for n in range(args.rows)])
+
+        for entity_model, schema in ((Truck, TruckOut), (Driver, DriverOut)):
+            paths = {
+                "old": lambda db: old_path(db, entity_model, schema),
+                "json": lambda db: new_path(db, entity_model, schema, "json"),
+                "msgpack": lambda db: new_path(db, entity_model, schema, "msgpack"),
+            }
+            results = {}
+            for label, run in paths.items():
+                results[label] = best_of(args.repeat, lambda: in_session(Session, run))
+            baseline = results["old"][0]
+            for label, (seconds, size) in results.items():
+                print(
+                    f"{entity_model.__tablename__:<8} {label:<8} {seconds * 1000:8.1f} ms  "
+                    f"{size / 1024:8.0f} KiB  x{baseline / seconds:.1f}"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
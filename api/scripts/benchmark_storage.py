@@ -0,0 +1,108 @@
+"""Compare SQLite read/write throughput with and without the storage profile.
+
+Simulates several gunicorn workers (one process each, with its own engine and
+pool) reading the trucks table while one worker runs metric-style write
+transactions, first on the stock rollback-journal setup and then with the
+WAL/pragma profile from db/session.py.
+
+    python scripts/benchmark_storage.py --readers 4 --seconds 10
+"""
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, text
+
+from db.session import _engine_options, set_sqlite_pragmas
+
+
+def make_engine(path: str, tuned: bool):
+    url = f"sqlite:///{path}"
+    if not tuned:
+        engine = create_engine(url)
+
+        @event.listens_for(engine, "connect")
+        def _baseline(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA journal_mode=DELETE")
+        return engine
+    engine = create_engine(url, **_engine_options(url))
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+def reader(path: str, tuned: bool, seconds: float, results):
+    engine = make_engine(path, tuned)
+    done = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT * FROM trucks")).fetchall()
+            done += 1
+        except Exception:
+            errors += 1
+    results.put(("read", done, errors))
+
+
+def writer(path: str, tuned: bool, seconds: float, hold: float, results):
+    engine = make_engine(path, tuned)
+    done = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE trucks SET fuel_level = fuel_level WHERE id > 0"))
+                # Keep the write transaction open like a metric recompute does
+                time.sleep(hold)
+            done += 1
+        except Exception:
+            errors += 1
+    results.put(("write", done, errors))
+
+
+def run(path: str, tuned: bool, readers: int, seconds: float, hold: float) -> dict:
+    results = mp.Queue()
+    procs = [mp.Process(target=reader, args=(path, tuned, seconds, results)) for _ in range(readers)]
+    procs.append(mp.Process(target=writer, args=(path, tuned, seconds, hold, results)))
+    for proc in procs:
+        proc.start()
+    totals = {"read": [0, 0], "write": [0, 0]}
+    for _ in procs:
+        kind, done, errors = results.get()
+        totals[kind][0] += done
+        totals[kind][1] += errors
+    for proc in procs:
+        proc.join()
+    return {
+        "reads/s": totals["read"][0] / seconds,
+        "read errors": totals["read"][1],
+        "writes/s": totals["write"][0] / seconds,
+        "write errors": totals["write"][1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite storage profile under concurrent workers.")
+    parser.add_argument("--database", default="truckfleet.db", help="SQLite database to copy for the benchmark")
+    parser.add_argument("--readers", type=int, default=4, help="Number of concurrent reader workers")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    parser.add_argument("--hold", type=float, default=0.05, help="Seconds each write transaction stays open")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for tuned in (False, True):
+            path = os.path.join(tmp, f"bench-{'tuned' if tuned else 'baseline'}.db")
+            shutil.copy(args.database, path)
+            stats = run(path, tuned, args.readers, args.seconds, args.hold)
+            label = "tuned (WAL)" if tuned else "baseline"
+            print(f"{label:>12}: " + ", ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Import a CSV or NDJSON dump into the fleet database.
+
+Uses the same validation, batching and checkpoints as POST /imports/{entity}.
+The file is read as a stream, so it can be larger than memory.
+
+    python scripts/import_data.py jobs legacy_jobs.csv
+    python scripts/import_data.py jobs legacy_jobs.csv --resume 7   # continue a failed run
+
+The database comes from SQLALCHEMY_DATABASE_URL, as for the API.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crud.imports as crud_imports
+from db.session import SessionLocal, engine
+from models import Base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import trucks, drivers, jobs or maintenance from a file.")
+    parser.add_argument("entity", choices=sorted(crud_imports.IMPORTS), help="Table to import into")
+    parser.add_argument("path", help="CSV with a header row, or NDJSON (.ndjson/.jsonl)")
+    parser.add_argument("--format", choices=sorted(crud_imports.PARSERS), help="Defaults to the file extension")
+    parser.add_argument("--resume", type=int, help="ID of a failed import of the same file to continue")
+    parser.add_argument("--batch-size", type=int, default=crud_imports.IMPORT_BATCH_SIZE, help="Rows per transaction")
+    parser.add_argument("--errors", type=int, default=20, help="Row errors to print (all are kept on the run)")
+    args = parser.parse_args()
+
+    file_format = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db, open(args.path, "rb") as binary:
+        if args.resume:
+            run = crud_imports.resume_import(db, args.resume, args.entity)
+            print(f"Resuming import {run.id} after row {run.last_row}")
+        else:
+            run = crud_imports.create_import(db, args.entity, file_format, os.path.basename(args.path))
+        start = time.perf_counter()
+        run = crud_imports.run_import(db, run, crud_imports.read_records(binary, file_format), batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"Import {run.id} {run.status}: {run.rows_imported} imported, {run.rows_failed} failed, "
+            f"{run.rows_read} rows read in {elapsed:.1f}s ({run.rows_read / max(elapsed, 1e-9) * 60:,.0f} rows/min)"
+        )
+        for error in run.errors[:args.errors]:
+            print(f"  row {error['row']}: {json.dumps(error['errors'], default=str)}")
+        if run.status == "failed":
+            print(f"Failed after row {run.last_row}: {run.message}\nRerun with --resume {run.id} to continue")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
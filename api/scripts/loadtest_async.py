@@ -0,0 +1,68 @@
+"""Measure /health latency while a heavy metric recompute is in flight.
+
+Start the API first (e.g. `uvicorn main:app`), then:
+
+    python scripts/loadtest_async.py --url http://localhost:8000 --seconds 10
+
+A blocked event loop shows up as a p99 close to the duration of
+/metrics/calculate/all; with the async data layer it stays in milliseconds.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def hammer_recompute(client: httpx.AsyncClient, deadline: float, counts: dict):
+    while time.perf_counter() < deadline:
+        response = await client.post("/metrics/calculate/all", timeout=None)
+        counts["recomputes"] += 1
+        counts["recompute_errors"] += response.status_code >= 400
+
+
+async def probe_health(client: httpx.AsyncClient, deadline: float, latencies: list, interval: float):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test /health latency during /metrics/calculate/all.")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the running API")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Test duration")
+    parser.add_argument("--recompute-clients", type=int, default=2, help="Concurrent recompute callers")
+    parser.add_argument("--health-clients", type=int, default=10, help="Concurrent /health probes")
+    parser.add_argument("--interval", type=float, default=0.01, help="Pause between probes of one client")
+    args = parser.parse_args()
+
+    latencies: list = []
+    counts = {"recomputes": 0, "recompute_errors": 0}
+    deadline = time.perf_counter() + args.seconds
+    limits = httpx.Limits(max_connections=args.recompute_clients + args.health_clients)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+        await asyncio.gather(
+            *(hammer_recompute(client, deadline, counts) for _ in range(args.recompute_clients)),
+            *(probe_health(client, deadline, latencies, args.interval) for _ in range(args.health_clients)),
+        )
+
+    print(f"recomputes: {counts['recomputes']} ({counts['recompute_errors']} errors)")
+    print(f"/health requests: {len(latencies)}")
+    if latencies:
+        print(
+            f"/health latency ms: p50={statistics.median(latencies):.1f} "
+            f"p95={percentile(latencies, 95):.1f} p99={percentile(latencies, 99):.1f} max={max(latencies):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+import json
+import random
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from db.session import _engine_options, set_sqlite_pragmas
+from models import Base, Driver, Metric, Truck
+
+
+def truck_payload(n: int) -> dict:
+    """A valid TruckCreate payload; the same n always gives the same truck"""
+    rng = random.Random(n)
+    return {
+        "assign_driver": f"Driver {n}", "make": rng.choice(["Volvo", "Kenworth", "Peterbilt"]),
+        "model": "VNL", "year": rng.randint(2005, 2024), "color": "white",
+        "mileage": rng.randint(0, 900_000), "vin": f"TEST{n:013d}", "plate": f"TX-{n:06d}",
+        "status": rng.choice(["active", "maintenance", "out-of-service", "available"]),
+        "fuel_level": rng.randint(0, 100), "last_service_date": "2025-01-01", "next_service_due": 5000,
+        "insurance_expiry": "2026-01-01", "registration_expiry": "2026-01-01",
+        "truck_type": rng.choice(["Semi-Truck", "Box Truck", "Tanker", "Flatbed"]),
+        "truckweight": 30000, "volume": 3000, "current_location": "Dallas, TX", "last_updated": "2025-01-01",
+        "fuel_efficiency": 7, "total_trips": 0, "maintenance_cost_ytd": 0, "downtime_hours": 0,
+        "features": ["GPS"], "condition_score": 90,
+    }
+
+
+def driver_payload(n: int) -> dict:
+    """A valid DriverCreate payload; the same n always gives the same driver"""
+    rng = random.Random(n)
+    return {
+        "first_name": f"First{n}", "last_name": f"Last{n}", "phone_number": f"555{n:07d}",
+        "email": f"driver{n}@example.com", "is_active": bool(n % 2),
+        "address": {"street": f"{n} Main St", "city": "Dallas", "state": "TX", "zip_code": "75001"},
+        "license": {"number": f"D{n:07d}", "license_expiration": "2030-01-01", "license_class": "A", "is_valid": True},
+        "employment": {"hire_date": "2020-01-01", "years_experience": rng.randint(0, 30),
+                       "status": rng.choice(["active", "inactive", "on-leave", "suspended"]), "employee_id": f"E{n}"},
+        "performance": {"safety_rating": round(rng.uniform(1, 5), 1), "on_time_delivery_rate": round(rng.random(), 2),
+                        "total_miles_driven": rng.randint(0, 900_000), "accidents_free": rng.randint(0, 2000)},
+        "current_assignment": {"truck_number": f"T{n}", "route": "I-35",
+                               "status": rng.choice(["available", "on-route", "loading", "maintenance", "off-duty"])},
+        "certifications": {"hazmat_endorsement": bool(n % 3), "drug_test_date": "2025-01-01"},
+        "emergency_contact": {"emergency_contact": f"Contact {n}", "relationship": "spouse", "phone": f"555{n:07d}"},
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Session on an empty SQLite database built from the models"""
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url, **_engine_options(url))
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def truck_record():
+    """truck_payload, for tests that feed payloads to the write paths themselves"""
+    return truck_payload
+
+
+@pytest.fixture
+def add_trucks(db):
+    """Insert `count` trucks and return them"""
+    def add(count: int):
+        trucks = [Truck(**truck_payload(n)) for n in range(count)]
+        db.add_all(trucks)
+        db.commit()
+        return trucks
+    return add
+
+
+@pytest.fixture
+def add_drivers(db):
+    """Insert `count` drivers and return them"""
+    def add(count: int):
+        drivers = [Driver(**driver_payload(n)) for n in range(count)]
+        db.add_all(drivers)
+        db.commit()
+        return drivers
+    return add
+
+
+@pytest.fixture
+def add_metrics(db):
+    """Insert metrics from (entity, type, calculation_config) tuples and return them"""
+    def add(definitions):
+        offset = db.query(Metric).count()
+        metrics = [
+            Metric(entity=entity, name=f"test_{offset + i}", type=metric_type, value=0, calculation_config=json.dumps(config))
+            for i, (entity, metric_type, config) in enumerate(definitions)
+        ]
+        db.add_all(metrics)
+        db.commit()
+        return metrics
+    return add
@@ -0,0 +1,12 @@
+from crud.bulk import bulk_delete
+from models import Maintenance, Truck
+
+
+def test_bulk_delete_reports_each_row_once(db, add_trucks):
+    first, second = (truck.id for truck in add_trucks(2))
+
+    result = bulk_delete(db, Truck, [first, first, second, 999], children=(Maintenance.truck_id,))
+
+    assert [item.status for item in result.results] == ["deleted", "not_found", "deleted", "not_found"]
+    assert (result.succeeded, result.failed) == (2, 2)
+    assert db.query(Truck).count() == 0
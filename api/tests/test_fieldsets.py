@@ -0,0 +1,34 @@
+import json
+from itertools import permutations
+
+import pytest
+from fastapi import HTTPException
+
+from crud.fieldsets import query_fields
+from endpoints.params import parse_fields
+from models import Truck
+from schemas.base import FIELDSET_CACHE_SIZE, _fieldset_adapter, dump_fieldset, fieldset_model
+from schemas.trucks import TruckOut
+
+
+def test_permutations_share_one_field_set():
+    parsed = {parse_fields(TruckOut, ",".join(order)) for order in permutations(["year", "make", "mileage", "id"])}
+    assert parsed == {("id", "make", "year", "mileage")}
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as error:
+        parse_fields(TruckOut, "make,wheels")
+    assert error.value.status_code == 400
+
+
+def test_rows_serialize_in_schema_order(db, add_trucks):
+    add_trucks(2)
+    fields = parse_fields(TruckOut, "mileage,make")
+    rows = query_fields(db, Truck, fields).all()
+    assert [list(row) for row in json.loads(dump_fieldset(TruckOut, fields, rows))] == [["id", "make", "mileage"]] * 2
+
+
+def test_fieldset_caches_are_bounded():
+    assert fieldset_model.cache_info().maxsize == FIELDSET_CACHE_SIZE
+    assert _fieldset_adapter.cache_info().maxsize is not None
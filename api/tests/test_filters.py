@@ -0,0 +1,37 @@
+import pytest
+
+from crud import filters
+from crud.filters import InvalidFilter, apply_filters, parse_filter
+from models import Driver
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("status:eq:active", {"field": "status", "operator": "eq", "value": "active"}),
+    ("json:performance.safety_rating:gte:4", {"field": "json:performance.safety_rating", "operator": "gte", "value": 4}),
+    ("json:performance.safety_rating:is_null", {"field": "json:performance.safety_rating", "operator": "is_null"}),
+    ("date:gt:2025-01-01T08:30:00", {"field": "date", "operator": "gt", "value": "2025-01-01T08:30:00"}),
+    ("status:in:active,available", {"field": "status", "operator": "in", "value": ["active", "available"]}),
+])
+def test_parse_filter(spec, expected):
+    assert parse_filter(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["status", "json:performance.safety_rating", ":eq:1", "status:near:1", "status:eq"])
+def test_parse_filter_rejects(spec):
+    with pytest.raises(InvalidFilter):
+        parse_filter(spec)
+
+
+def test_json_prefixed_filter_applies(db, add_drivers):
+    drivers = add_drivers(10)
+    query = apply_filters(db.query(Driver.id), Driver, [parse_filter("json:performance.safety_rating:gte:4")])
+    expected = {driver.id for driver in drivers if driver.performance["safety_rating"] >= 4}
+    assert {row.id for row in query} == expected
+
+
+def test_checked_plans_are_bounded(db, monkeypatch):
+    monkeypatch.setattr(filters, "CHECKED_PLANS_SIZE", 2)
+    monkeypatch.setattr(filters, "_checked_plans", filters.OrderedDict())
+    for n in range(5):
+        filters.check_query_plan(db, db.query(Driver.id), ("drivers", (), f"shape {n}"))
+    assert list(filters._checked_plans) == [("drivers", (), "shape 3"), ("drivers", (), "shape 4")]
@@ -0,0 +1,18 @@
+from sqlalchemy import text
+
+from crud.imports import create_import, run_import
+from models import Truck
+
+
+def test_rows_failing_a_constraint_are_reported_alone(db, truck_record):
+    db.execute(text("CREATE UNIQUE INDEX ux_trucks_vin ON trucks (vin)"))
+    db.commit()
+    records = [truck_record(n) for n in range(6)]
+    records[4] = {**records[4], "vin": records[1]["vin"]}
+    records[5] = {**records[5], "year": "not a year"}
+    run = run_import(db, create_import(db, "trucks", "ndjson"), records)
+
+    assert (run.status, run.rows_read, run.rows_imported, run.rows_failed) == ("completed", 6, 4, 2)
+    assert [error["row"] for error in run.errors] == [5, 6]
+    assert "UNIQUE" in run.errors[0]["errors"][0]
+    assert db.query(Truck).count() == 4
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import text
+
+from crud.incremental_metrics import incremental_metric_ids, install_metric_triggers
+from crud.metric import MetricCalculator
+
+
+@pytest.fixture
+def metrics(add_trucks, add_metrics):
+    add_trucks(20)
+    return add_metrics([
+        ("trucks", "count", {"filters": [{"field": "status", "operator": "==", "value": "active"}]}),
+        ("trucks", "avg", {"field": "mileage"}),
+        ("trucks", "max", {"field": "mileage"}),
+        ("drivers", "count", {}),
+    ])
+
+
+def test_triggers_keep_values_current(db, metrics, add_trucks):
+    install_metric_triggers(db)
+    add_trucks(10)
+    db.execute(text("DELETE FROM trucks WHERE id % 3 = 0"))
+    db.execute(text("UPDATE trucks SET status = 'active', mileage = mileage + 1 WHERE id % 4 = 0"))
+    db.commit()
+    calculator = MetricCalculator(db)
+    for metric in metrics[:2]:
+        db.refresh(metric)
+        assert metric.value == pytest.approx(calculator.calculate_metric(metric))
+
+
+def test_maintained_ids_come_from_the_database(db, metrics):
+    count, avg, maximum, drivers = metrics
+    assert incremental_metric_ids(db) == set()
+
+    install_metric_triggers(db)
+    assert incremental_metric_ids(db) == {count.id, avg.id, drivers.id}
+
+    # Redefined by another worker: no longer maintained, even before the reinstall
+    avg.type = "min"
+    db.commit()
+    assert incremental_metric_ids(db) == {count.id, drivers.id}
+    install_metric_triggers(db, "trucks")
+    assert incremental_metric_ids(db) == {count.id, drivers.id}
+
+    # Without an entity's triggers none of its metrics are skipped
+    db.connection().exec_driver_sql("DROP TRIGGER metric_trucks_insert")
+    db.commit()
+    assert incremental_metric_ids(db) == {drivers.id}
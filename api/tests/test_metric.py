@@ -0,0 +1,96 @@
+import math
+
+import pytest
+
+import crud.metric as crud_metric
+from crud.metric import MetricCalculator, recalculate_metrics
+from schemas.metric import MetricOut
+
+# (entity, type, config) covering every fused aggregate, JSON paths, and the
+# metrics evaluated on their own (grouped, sketches, custom SQL)
+DEFINITIONS = [
+    ("trucks", "count", {}),
+    ("trucks", "count", {"filters": [{"field": "mileage", "operator": ">", "value": 300000}]}),
+    ("trucks", "sum", {"field": "mileage", "filters": [{"field": "year", "operator": ">=", "value": 2012}]}),
+    ("trucks", "avg", {"field": "fuel_level", "filters": [{"field": "status", "operator": "==", "value": "active"}]}),
+    ("trucks", "min", {"field": "mileage"}),
+    ("trucks", "max", {"field": "mileage", "filters": [{"field": "fuel_level", "operator": "<", "value": 50}]}),
+    ("trucks", "distinct_count", {"field": "make"}),
+    ("trucks", "percentage", {
+        "numerator_filters": [{"field": "status", "operator": "==", "value": "maintenance"}],
+        "denominator_filters": [{"field": "mileage", "operator": ">", "value": 100000}],
+    }),
+    ("trucks", "grouped", {"group_by": "status", "aggregate": "avg", "field": "mileage"}),
+    ("trucks", "percentile", {"field": "mileage", "percentiles": [50, 95]}),
+    ("trucks", "histogram", {"field": "fuel_level", "bins": 5}),
+    ("trucks", "custom", {"query": "SELECT count(*) FROM trucks WHERE year > 2015"}),
+    ("drivers", "count", {"filters": [{"field": "performance.safety_rating", "operator": ">=", "value": 3}]}),
+    ("drivers", "avg", {"field": "performance.safety_rating", "filters": [{"field": "is_active", "operator": "==", "value": True}]}),
+    ("drivers", "min", {"field": "employment.years_experience", "filters": [{"field": "employment.status", "operator": "==", "value": "active"}]}),
+    ("drivers", "percentage", {"numerator_filters": [{"field": "performance.total_miles_driven", "operator": ">", "value": 400000}]}),
+]
+
+
+def same(a, b) -> bool:
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9)
+    return a == b
+
+
+@pytest.fixture
+def metrics(add_trucks, add_drivers, add_metrics):
+    add_trucks(300)
+    add_drivers(200)
+    return add_metrics(DEFINITIONS)
+
+
+def test_fused_matches_single_metric(db, metrics):
+    calculator = MetricCalculator(db)
+    expected = {metric.id: calculator.calculate_metric(metric) for metric in metrics}
+    actual = calculator.calculate_metrics(metrics)
+    assert not [value for value in actual.values() if isinstance(value, Exception)]
+    mismatched = [metric.name for metric in metrics if not same(expected[metric.id], actual[metric.id])]
+    assert mismatched == []
+
+
+def test_fused_isolates_a_bad_definition(db, metrics, add_metrics):
+    bad, = add_metrics([("trucks", "sum", {"field": "no_such_column"})])
+    results = MetricCalculator(db).calculate_metrics([*metrics, bad])
+    assert isinstance(results[bad.id], Exception)
+    assert not [metric.name for metric in metrics if isinstance(results[metric.id], Exception)]
+
+
+def test_pool_matches_sequential(db, metrics, monkeypatch):
+    expected = MetricCalculator(db).calculate_metrics(metrics)
+    monkeypatch.setattr(crud_metric, "METRIC_POOL", "thread")
+    monkeypatch.setattr(crud_metric, "METRIC_WORKERS", 3)
+    crud_metric._discard_pool()
+    try:
+        actual = recalculate_metrics(db, metrics)
+    finally:
+        crud_metric._discard_pool()
+    assert [metric.name for metric in metrics if not same(expected[metric.id], actual[metric.id])] == []
+
+
+@pytest.mark.parametrize("metric_type, config", [
+    ("max", {"field": "status"}),
+    ("grouped", {"group_by": "make", "aggregate": "max", "field": "status"}),
+    ("min", {"field": "employment.status"}),
+])
+def test_min_max_reject_non_numeric_fields(db, metric_type, config, add_trucks, add_drivers, add_metrics):
+    add_trucks(5)
+    add_drivers(5)
+    metric, = add_metrics([("drivers" if "." in config["field"] else "trucks", metric_type, config)])
+    with pytest.raises(ValueError, match="numeric"):
+        MetricCalculator(db).calculate_metric(metric)
+    assert isinstance(MetricCalculator(db).calculate_metrics([metric])[metric.id], ValueError)
+
+
+def test_grouped_metric_serializes(db, metrics):
+    recalculate_metrics(db, metrics)
+    for metric in metrics:
+        MetricOut.model_validate(metric)
@@ -0,0 +1,89 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from crud import metric_history
+from crud.incremental_metrics import incremental_metric_ids, install_metric_triggers
+from crud.metric import MetricChangeTracker, calculate_all_metrics
+from crud.metric_history import ROLLUP_STEPS, get_metric_series, record_metric_history
+from db.versions import track_table_versions, version_map, versions_query
+from models.metric_history import MetricHistory, MetricRollup
+
+# Start of a day, so a few points share every rollup bucket
+TS = 1_760_000_000 - 1_760_000_000 % 86400
+
+
+@pytest.fixture
+def metric(add_metrics):
+    metric, = add_metrics([("trucks", "count", {})])
+    return metric
+
+
+def record(db, metric, value, ts):
+    metric.value = value
+    record_metric_history(db, [metric.id], ts=ts)
+    db.commit()
+
+
+def test_rollups_fold_every_point(db, metric):
+    for offset, value in enumerate([4, 8, 6]):
+        record(db, metric, value, TS + offset * 10)
+    for step in ROLLUP_STEPS.values():
+        samples, total, minimum, maximum = db.execute(
+            select(MetricRollup.samples, MetricRollup.total, MetricRollup.minimum, MetricRollup.maximum)
+            .where(MetricRollup.metric_id == metric.id, MetricRollup.step == step)
+        ).one()
+        assert (samples, total, minimum, maximum) == (3, 18, 4, 8)
+
+
+def test_same_second_is_recorded_once_at_every_level(db, metric):
+    record(db, metric, 5, TS)
+    record(db, metric, 9, TS)
+    raw = db.execute(select(MetricHistory.value).where(MetricHistory.metric_id == metric.id)).scalars().all()
+    rollups = db.execute(
+        select(MetricRollup.samples, MetricRollup.total).where(MetricRollup.metric_id == metric.id)
+    ).all()
+    assert raw == [5]
+    assert rollups == [(1, 5)] * len(ROLLUP_STEPS)
+
+
+def test_series_agree_across_levels(db, metric):
+    base = int(time.time()) - 3600
+    base -= base % 180
+    for offset, value in enumerate([4, 8, 6, 6, 9]):
+        record(db, metric, value, base + offset)
+    record(db, metric, 100, base + 2)  # same second as an earlier point
+    start, end = (datetime.fromtimestamp(ts, timezone.utc) for ts in (base, base + 180))
+    # 90 s buckets are read from the raw points, 180 s ones from the 1m rollup
+    raw = get_metric_series(db, metric.id, start=start, end=end, step="90s")
+    rollup = get_metric_series(db, metric.id, start=start, end=end, step="180s")
+    assert (raw["level"], rollup["level"]) == ("raw", "1m")
+    assert [point["value"] for point in raw["points"]] == [pytest.approx(33 / 5)]
+    assert [point["value"] for point in rollup["points"]] == [pytest.approx(33 / 5)]
+
+
+def test_idle_runs_write_no_history(db, add_trucks, add_metrics, monkeypatch):
+    track_table_versions(db.get_bind())
+    add_trucks(10)
+    count, maximum = add_metrics([("trucks", "count", {}), ("trucks", "max", {"field": "mileage"})])
+    install_metric_triggers(db)
+    tracker = MetricChangeTracker()
+    clock = [TS]
+    monkeypatch.setattr(metric_history.time, "time", lambda: clock[0])
+
+    def run():
+        clock[0] += 20
+        calculate_all_metrics(db, skip_ids=incremental_metric_ids(db), tracker=tracker)
+        versions = version_map(db.execute(versions_query(["metric", "metric_history", "metric_rollups"])))
+        points = db.execute(select(MetricHistory.metric_id, MetricHistory.ts)).all()
+        return {table: version for table, (version, _) in versions.items()}, points
+
+    versions, points = run()
+    assert {metric_id for metric_id, _ in points} == {count.id, maximum.id}
+    assert run() == (versions, points)
+
+    add_trucks(1)
+    _, after_write = run()
+    assert sorted(set(after_write) - set(points)) == [(count.id, clock[0]), (maximum.id, clock[0])]
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from crud import metric_jobs
+from crud.metric_jobs import ORPHANED_MESSAGE, fail_orphaned_metric_jobs
+from models.metric_jobs import MetricJob
+
+
+def ago(seconds: int) -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def add_job(db):
+    def add(status="queued", created=0, heartbeat=None):
+        job = MetricJob(kind="all", status=status, created_at=ago(created),
+                        heartbeat_at=None if heartbeat is None else ago(heartbeat))
+        db.add(job)
+        db.commit()
+        return job
+    return add
+
+
+def test_stale_jobs_are_failed(db, add_job):
+    stale = metric_jobs.METRIC_JOB_HEARTBEAT_SECONDS * metric_jobs.METRIC_JOB_STALE_BEATS + 60
+    never_beat = add_job(created=stale)
+    stopped = add_job(status="running", created=stale * 2, heartbeat=stale)
+    fresh = add_job(status="running", created=stale, heartbeat=0)
+    new = add_job()
+    done = add_job(status="completed", created=stale)
+
+    assert fail_orphaned_metric_jobs(db) == 2
+    for job in (never_beat, stopped, fresh, new, done):
+        db.refresh(job)
+    assert never_beat.status == stopped.status == "failed"
+    assert never_beat.message == ORPHANED_MESSAGE and stopped.finished_at is not None
+    assert (fresh.status, new.status, done.status) == ("running", "queued", "completed")
+
+
+def test_jobs_of_this_worker_are_kept(db, add_job, monkeypatch):
+    stale = metric_jobs.METRIC_JOB_HEARTBEAT_SECONDS * metric_jobs.METRIC_JOB_STALE_BEATS + 60
+    job = add_job(created=stale)
+    monkeypatch.setattr(metric_jobs, "_active", {job.id})
+
+    assert fail_orphaned_metric_jobs(db) == 0
+    db.refresh(job)
+    assert job.status == "queued"
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from crud.filters import InvalidFilter, sort_keys
+from crud.listing import list_entities
+from models import Maintenance, Truck
+
+
+@pytest.fixture
+def maintenances(db, add_trucks):
+    truck, = add_trucks(1)
+    start = datetime(2025, 1, 1, 8, 30)
+    for n in range(22):
+        db.add(Maintenance(
+            truck_id=truck.id, mileage=n * 1000, description=f"Service {n}", type="oil",
+            # Repeated dates so the id tiebreaker is exercised, every third row unscheduled
+            date=start + timedelta(days=n // 2, minutes=n % 2 * 15) if n % 5 else start,
+            next_scheduled=None if n % 3 == 0 else start + timedelta(days=30 - n),
+        ))
+    db.commit()
+    return db.query(Maintenance).all()
+
+
+def walk(db, sort, limit=3):
+    """Ids of every page of a sorted listing, following the cursors"""
+    ids, after = [], None
+    for _ in range(100):
+        page = list_entities(db, Maintenance, limit=limit, after=after, sort=sort)
+        ids += [row.id for row in page.items]
+        if page.next_cursor is None:
+            return ids
+        after = page.next_cursor
+    pytest.fail(f"Pagination on {sort} did not end")
+
+
+@pytest.mark.parametrize("sort", [
+    "date", "-date", "next_scheduled", "-next_scheduled", "-next_scheduled,date", "-id", "date,-id",
+])
+def test_pages_cover_every_row_once(db, maintenances, sort):
+    expected = [row.id for row in list_entities(db, Maintenance, sort=sort).items]
+    assert sorted(expected) == sorted(row.id for row in maintenances)
+    assert walk(db, sort) == expected
+
+
+@pytest.mark.parametrize("sort, expected", [
+    ("-id", [("id", True)]),
+    ("year,-id", [("year", False), ("id", True)]),
+    ("-year", [("year", True), ("id", True)]),
+    ("id,year", [("id", False)]),
+])
+def test_explicit_id_keeps_its_direction(sort, expected):
+    assert [(key.path, key.descending) for key in sort_keys(Truck, sort)] == expected
+
+
+def test_descending_id(db, maintenances):
+    assert walk(db, "-id") == sorted((row.id for row in maintenances), reverse=True)
+
+
+def test_nulls_sort_first_ascending_and_last_descending(db, maintenances):
+    unscheduled = sum(row.next_scheduled is None for row in maintenances)
+    ascending = list_entities(db, Maintenance, sort="next_scheduled").items
+    descending = list_entities(db, Maintenance, sort="-next_scheduled").items
+    assert all(row.next_scheduled is None for row in ascending[:unscheduled])
+    assert all(row.next_scheduled is None for row in descending[-unscheduled:])
+
+
+def test_sorting_by_json_column_is_rejected(db):
+    with pytest.raises(InvalidFilter):
+        list_entities(db, Truck, sort="features")
@@ -0,0 +1,34 @@
+from datetime import date
+
+import pytest
+
+from endpoints import response_cache
+from endpoints.response_cache import _cacheable, _etag
+
+
+def scope(path, query=""):
+    return {"path": path, "query_string": query.encode(), "headers": [(b"accept", b"application/json")]}
+
+
+@pytest.mark.parametrize("path, query, cacheable", [
+    ("/metrics/7/series", "", False),
+    ("/metrics/7/series", "from=2025-01-01T00:00:00&step=1h", False),
+    ("/metrics/7/series", "from=2025-01-01T00:00:00&to=2025-01-02T00:00:00", True),
+    ("/metrics/7", "", True),
+    ("/dashboard/", "", True),
+])
+def test_series_need_a_closed_range(path, query, cacheable):
+    assert _cacheable(scope(path, query)) is cacheable
+
+
+def test_dated_etags_change_with_the_day(monkeypatch):
+    tables, versions = ("drivers",), {"drivers": (3, None)}
+    today = _etag(scope("/dashboard/"), tables, versions, dated=True)
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.fromordinal(date.today().toordinal() + 1)
+
+    monkeypatch.setattr(response_cache, "date", Tomorrow)
+    assert _etag(scope("/dashboard/"), tables, versions, dated=True) != today
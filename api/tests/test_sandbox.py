@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+from db.sandbox import SandboxError, SandboxTimeout, run_readonly
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "sandbox.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE t (x INTEGER)")
+        connection.executemany("INSERT INTO t VALUES (?)", [(n,) for n in range(10)])
+    return path
+
+
+def test_reads(path):
+    rows, elapsed = run_readonly(path, "SELECT sum(x) FROM t")
+    assert rows == [(45,)]
+    assert elapsed >= 0
+
+
+@pytest.mark.parametrize("sql", ["DELETE FROM t", "DROP TABLE t", "PRAGMA query_only=OFF", "ATTACH 'other.db' AS other"])
+def test_rejects_anything_but_reads(path, sql):
+    with pytest.raises(SandboxError):
+        run_readonly(path, sql)
+    assert run_readonly(path, "SELECT count(*) FROM t")[0] == [(10,)]
+
+
+def test_row_cap(path):
+    with pytest.raises(SandboxError):
+        run_readonly(path, "SELECT x FROM t", max_rows=5)
+
+
+def test_timeout(path):
+    endless = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n"
+    with pytest.raises(SandboxTimeout):
+        run_readonly(path, endless, timeout_ms=50)
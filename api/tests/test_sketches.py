@@ -0,0 +1,30 @@
+import bisect
+import random
+
+import pytest
+
+from crud.sketches import FixedHistogram, TDigest
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99, 0.999])
+def test_tdigest_quantiles_are_close(q):
+    rng = random.Random(1)
+    values = sorted(rng.lognormvariate(10, 1) for _ in range(50000))
+    estimate = TDigest().update(values).quantile(q)
+    # Rank error: the share of values at or below the estimate, against q
+    assert bisect.bisect(values, estimate) / len(values) == pytest.approx(q, abs=0.002)
+
+
+def test_tdigest_merge_matches_one_pass():
+    rng = random.Random(2)
+    values = [rng.uniform(0, 1000) for _ in range(20000)]
+    merged = TDigest().update(values[:7000]).merge(TDigest().update(values[7000:]))
+    assert merged.count == len(values)
+    assert merged.quantile(0.95) == pytest.approx(TDigest().update(values).quantile(0.95), rel=0.005)
+
+
+def test_histogram_counts_every_value():
+    values = [0, 1, 2.5, 5, 7.5, 9.99, 10]
+    histogram = FixedHistogram(0, 10, bins=4).update(values)
+    assert histogram.count == len(values)
+    assert sum(histogram.as_dict().values()) == len(values)
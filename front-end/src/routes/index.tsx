@@ -1,7 +1,7 @@
 "use client"
 
 import { apiService } from "../services/api"
-import type { Driver, Job, Metric, Truck } from "../types/index"
+import type { Dashboard as DashboardData } from "../types/index"
 import { createFileRoute, Link } from "@tanstack/react-router"
 import { useEffect, useMemo, useState } from "react"
 import {
@@ -38,26 +38,14 @@ export default function Dashboard() {
   const [loading, setLoading] = useState(true)
 
   // Data states
-  const [drivers, setDrivers] = useState<Driver[]>([])
-  const [trucks, setTrucks] = useState<Truck[]>([])
-  const [jobs, setJobs] = useState<Job[]>([])
-  const [metrics, setMetrics] = useState<Metric[]>([])
+  const [dashboard, setDashboard] = useState<DashboardData | null>(null)
 
-  // Data fetching
+  // Data fetching: one aggregated request, the same size whatever the fleet size
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true)
-        const [driversInfo, trucksInfo, jobsInfo, metricsInfo] = await Promise.all([
-          apiService.get<Driver>("/drivers"),
-          apiService.get<Truck>("/trucks"),
-          apiService.get<Job>("/jobs"),
-          apiService.get<Metric>("/metrics"),
-        ])
-        setDrivers(driversInfo)
-        setTrucks(trucksInfo)
-        setJobs(jobsInfo)
-        setMetrics(metricsInfo)
+        setDashboard(await apiService.getOne<DashboardData>("/dashboard"))
       } catch (error) {
         console.error("Error fetching data:", error)
       } finally {
@@ -67,114 +55,47 @@ export default function Dashboard() {
     fetchData()
   }, [])
 
-  // Helper function to get metric value by name
-  const getMetricValue = (name: string): number => {
-    const metric = metrics.find((m) => m.name === name)
-    return metric ? metric.value : 0
+  const cards = dashboard?.cards ?? {
+    total_drivers: 0,
+    active_drivers: 0,
+    inactive_drivers: 0,
+    high_safety_drivers: 0,
+    total_jobs: 0,
+    in_progress_jobs: 0,
+    fleet_size: 0,
   }
 
-  // Helper: get IDs for filtered sets
-  const highSafetyDriverIds = drivers.filter((d) => d.performance?.safety_rating >= 4.5).map((d) => d.id)
-
   // Computed data for charts
-  const jobStatusData = useMemo(
-    () => [
-      {
-        name: "Completed",
-        value: getMetricValue("completed_jobs"),
-        color: "#059669",
-      },
-      {
-        name: "In Progress",
-        value: getMetricValue("in_progress_jobs"),
-        color: "#3B82F6",
-      },
-      {
-        name: "Pending",
-        value: getMetricValue("pending_jobs"),
-        color: "#F59E0B",
-      },
-      {
-        name: "Cancelled",
-        value: getMetricValue("cancelled_jobs"),
-        color: "#DC2626",
-      },
-    ],
-    [metrics],
-  )
+  const jobStatusData = useMemo(() => {
+    const styles: Record<string, { name: string; color: string }> = {
+      completed: { name: "Completed", color: "#059669" },
+      "in-progress": { name: "In Progress", color: "#3B82F6" },
+      pending: { name: "Pending", color: "#F59E0B" },
+      cancelled: { name: "Cancelled", color: "#DC2626" },
+    }
+    return (dashboard?.job_status ?? []).map((point) => ({ ...styles[point.name], value: point.value }))
+  }, [dashboard])
 
-  const driverStatusData = useMemo(
-    () => [
-      {
-        name: "Active",
-        value: getMetricValue("active_drivers"),
-        color: "#059669",
-      },
-      {
-        name: "Inactive",
-        value: getMetricValue("inactive_drivers"),
-        color: "#6B7280",
-      },
-    ],
-    [metrics],
-  )
+  const driverStatusData = useMemo(() => {
+    const styles: Record<string, { name: string; color: string }> = {
+      active: { name: "Active", color: "#059669" },
+      inactive: { name: "Inactive", color: "#6B7280" },
+    }
+    return (dashboard?.driver_status ?? []).map((point) => ({ ...styles[point.name], value: point.value }))
+  }, [dashboard])
 
   // Active drivers with current assignments
-  const activeDriversWithAssignments = useMemo(() => {
-    return drivers.filter((d) => d.is_active && d.employment.status === "active")
-  }, [drivers])
+  const activeDriversWithAssignments = dashboard?.active_drivers ?? []
 
   // Critical alerts
   const criticalAlerts = useMemo((): Alert[] => {
-    const alerts: Alert[] = []
-
-    // License expiring soon
-    const expiringLicenses = drivers.filter((d) => {
-      const expirationDate = new Date(d.license.license_expiration)
-      const thirtyDaysFromNow = new Date(Date.now() + 30 * 24 * 60 * 60 * 1000)
-      return !d.license.is_valid || expirationDate < thirtyDaysFromNow
-    })
-
-    if (expiringLicenses.length > 0) {
-      alerts.push({
-        type: "license",
-        count: expiringLicenses.length,
-        message: `${expiringLicenses.length} driver license(s) expiring soon`,
-        to: "drivers",
-        search: {
-          id: expiringLicenses.map((d) => d.id).filter((id): id is number => id !== undefined),
-        },
-      })
-    }
-
-    // High mileage trucks
-    const highMileageTrucks = trucks.filter((t) => t.mileage > 200000)
-    if (highMileageTrucks.length > 0) {
-      alerts.push({
-        type: "mileage",
-        count: highMileageTrucks.length,
-        message: `${highMileageTrucks.length} truck(s) with high mileage`,
-        to: "trucks",
-        search: {
-          id: highMileageTrucks.map((d) => d.id).filter((id): id is number => id !== undefined),
-        },
-      })
+    const links: Record<string, Pick<Alert, "to" | "search">> = {
+      license: { to: "drivers" },
+      mileage: { to: "trucks" },
+      cancelled: { to: "/Jobs", search: { job_status: "cancelled" } },
     }
-
-    // Cancelled jobs
-    const cancelledJobs = getMetricValue("cancelled_jobs")
-    if (cancelledJobs > 0) {
-      alerts.push({
-        type: "cancelled",
-        count: cancelledJobs,
-        message: `${cancelledJobs} cancelled job(s) need attention`,
-        to: "/Jobs",
-        search: { job_status: "cancelled" },
-      })
-    }
-
-    return alerts
-  }, [drivers, trucks, metrics])
+    return (dashboard?.alerts ?? []).map((alert) => ({ ...alert, ...links[alert.type] }))
+  }, [dashboard])
 
   function getStatusBadgeClass(status: string): string {
     const classes: Record<string, string> = {
@@ -271,12 +192,12 @@ export default function Dashboard() {
               <div className="space-y-2">
                 <p className="text-sm font-semibold text-gray-600 uppercase tracking-wide">Total Drivers</p>
                 <p className="text-4xl font-bold text-blue-600 group-hover:text-blue-700 transition-colors">
-                  {getMetricValue("drivers_counter")}
+                  {cards.total_drivers}
                 </p>
                 <div className="flex items-center gap-2 text-sm">
                   <div className="flex items-center gap-1 text-emerald-600">
                     <TrendingUp className="w-4 h-4" />
-                    <span className="font-medium">{getMetricValue("active_drivers")} active</span>
+                    <span className="font-medium">{cards.active_drivers} active</span>
                   </div>
                 </div>
               </div>
@@ -295,10 +216,10 @@ export default function Dashboard() {
               <div className="space-y-2">
                 <p className="text-sm font-semibold text-gray-600 uppercase tracking-wide">Active Jobs</p>
                 <p className="text-4xl font-bold text-emerald-600 group-hover:text-emerald-700 transition-colors">
-                  {getMetricValue("in_progress_jobs")}
+                  {cards.in_progress_jobs}
                 </p>
                 <div className="text-sm text-gray-600">
-                  of <span className="font-medium">{getMetricValue("jobs_counter")}</span> total
+                  of <span className="font-medium">{cards.total_jobs}</span> total
                 </div>
               </div>
               <div className="p-4 rounded-2xl bg-gradient-to-br from-emerald-100 to-emerald-200 group-hover:from-emerald-200 group-hover:to-emerald-300 transition-all duration-300">
@@ -316,7 +237,7 @@ export default function Dashboard() {
               <div className="space-y-2">
                 <p className="text-sm font-semibold text-gray-600 uppercase tracking-wide">Fleet Size</p>
                 <p className="text-4xl font-bold text-orange-600 group-hover:text-orange-700 transition-colors">
-                  {getMetricValue("trucks_counter")}
+                  {cards.fleet_size}
                 </p>
                 <div className="text-sm text-gray-600">
                   <span className="font-medium">vehicles</span>
@@ -331,13 +252,13 @@ export default function Dashboard() {
           <Link
             to="/Drivers"
             className="group bg-white/80 backdrop-blur-sm rounded-2xl shadow-lg border border-white/20 p-6 cursor-pointer hover:shadow-xl transition-all duration-300 transform hover:-translate-y-1 hover:bg-white"
-            search={{ id: highSafetyDriverIds } as any}
+            search={{} as any}
           >
             <div className="flex items-center justify-between">
               <div className="space-y-2">
                 <p className="text-sm font-semibold text-gray-600 uppercase tracking-wide">High Safety</p>
                 <p className="text-4xl font-bold text-purple-600 group-hover:text-purple-700 transition-colors">
-                  {getMetricValue("drivers_safety_rating")}
+                  {cards.high_safety_drivers}
                 </p>
                 <div className="flex items-center gap-1 text-sm text-gray-600">
                   <Star className="w-4 h-4 text-yellow-500" />
@@ -539,29 +460,26 @@ export default function Dashboard() {
                 Recent Jobs
               </h3>
               <div className="space-y-3">
-                {jobs
-                  .slice(-5)
-                  .reverse()
-                  .map((job) => (
-                    <div
-                      key={job.id}
-                      className="p-4 bg-gradient-to-r from-blue-50 to-indigo-50 rounded-xl border border-blue-100 hover:border-blue-200 transition-all duration-200 hover:shadow-md"
+                {(dashboard?.recent_jobs ?? []).map((job) => (
+                  <div
+                    key={job.id}
+                    className="p-4 bg-gradient-to-r from-blue-50 to-indigo-50 rounded-xl border border-blue-100 hover:border-blue-200 transition-all duration-200 hover:shadow-md"
+                  >
+                    <Link
+                      to="/jobs/$jobsId"
+                      params={{ jobsId: String(job.id) }}
+                      className="font-bold text-blue-700 hover:text-blue-800 hover:underline transition-colors"
                     >
-                      <Link
-                        to="/jobs/$jobsId"
-                        params={{ jobsId: String(job.id) }}
-                        className="font-bold text-blue-700 hover:text-blue-800 hover:underline transition-colors"
-                      >
-                        {job.job_number || `Job #${job.id}`}
-                      </Link>
-                      <div className="flex items-center justify-between mt-2">
-                        <span className="text-sm text-gray-600">
-                          Status: <span className="font-medium">{job.job_status}</span>
-                        </span>
-                        <ArrowUpRight className="w-4 h-4 text-blue-500" />
-                      </div>
+                      {job.job_number || `Job #${job.id}`}
+                    </Link>
+                    <div className="flex items-center justify-between mt-2">
+                      <span className="text-sm text-gray-600">
+                        Status: <span className="font-medium">{job.job_status}</span>
+                      </span>
+                      <ArrowUpRight className="w-4 h-4 text-blue-500" />
                     </div>
-                  ))}
+                  </div>
+                ))}
               </div>
             </div>
             <div className="space-y-4">
@@ -570,29 +488,26 @@ export default function Dashboard() {
                 Recent Drivers
               </h3>
               <div className="space-y-3">
-                {drivers
-                  .slice(-5)
-                  .reverse()
-                  .map((driver) => (
-                    <div
-                      key={driver.id}
-                      className="p-4 bg-gradient-to-r from-emerald-50 to-green-50 rounded-xl border border-emerald-100 hover:border-emerald-200 transition-all duration-200 hover:shadow-md"
+                {(dashboard?.recent_drivers ?? []).map((driver) => (
+                  <div
+                    key={driver.id}
+                    className="p-4 bg-gradient-to-r from-emerald-50 to-green-50 rounded-xl border border-emerald-100 hover:border-emerald-200 transition-all duration-200 hover:shadow-md"
+                  >
+                    <Link
+                      to="/drivers/$driverId"
+                      params={{ driverId: String(driver.id) }}
+                      className="font-bold text-emerald-700 hover:text-emerald-800 hover:underline transition-colors"
                     >
-                      <Link
-                        to="/drivers/$driverId"
-                        params={{ driverId: String(driver.id) }}
-                        className="font-bold text-emerald-700 hover:text-emerald-800 hover:underline transition-colors"
-                      >
-                        {driver.first_name} {driver.last_name}
-                      </Link>
-                      <div className="flex items-center justify-between mt-2">
-                        <span className="text-sm text-gray-600">
-                          Status: <span className="font-medium">{driver.employment?.status}</span>
-                        </span>
-                        <ArrowUpRight className="w-4 h-4 text-emerald-500" />
-                      </div>
+                      {driver.first_name} {driver.last_name}
+                    </Link>
+                    <div className="flex items-center justify-between mt-2">
+                      <span className="text-sm text-gray-600">
+                        Status: <span className="font-medium">{driver.employment_status}</span>
+                      </span>
+                      <ArrowUpRight className="w-4 h-4 text-emerald-500" />
                     </div>
-                  ))}
+                  </div>
+                ))}
               </div>
             </div>
           </div>
@@ -77,6 +77,18 @@ class ApiService {
     return this.request<T[]>(endpoint);
   }
 
+  /**
+   * Retrieves a single resource that is not a list, such as the dashboard summary.
+   * 
+   * @template T - The type of the resource.
+   * @param {string} endpoint - The API endpoint of the resource.
+   * @returns {Promise<T>} A promise that resolves to the resource.
+   * @throws {Error} If the API request fails.
+   */
+  async getOne<T>(endpoint: string): Promise<T> {
+    return this.request<T>(endpoint);
+  }
+
   async getById<T>(endpoint: string, id: number): Promise<T> {
     return this.request<T>(`${endpoint}/${id}`);
   }
@@ -118,6 +118,38 @@ export interface Metric {
   type: string;
   value: number;
   calculation_config: string;
+  breakdown?: Record<string, number> | null;
+  status?: 'ok' | 'failed' | 'timeout' | 'disabled' | null;
+  last_error?: string | null;
+  last_run_ms?: number | null;
+  failure_count?: number | null;
+}
+
+export interface DashboardDriver {
+  id: number;
+  first_name: string;
+  last_name: string;
+  employment_status: Driver["employment"]["status"] | null;
+  current_assignment: Driver["current_assignment"];
+  performance: Driver["performance"];
+}
+
+export interface Dashboard {
+  cards: {
+    total_drivers: number;
+    active_drivers: number;
+    inactive_drivers: number;
+    high_safety_drivers: number;
+    total_jobs: number;
+    in_progress_jobs: number;
+    fleet_size: number;
+  };
+  job_status: { name: string; value: number }[];
+  driver_status: { name: string; value: number }[];
+  alerts: { type: string; count: number; message: string; entity: string }[];
+  active_drivers: DashboardDriver[];
+  recent_jobs: Pick<Job, "id" | "job_number" | "job_status">[];
+  recent_drivers: DashboardDriver[];
 }
 
 export type EntityType =